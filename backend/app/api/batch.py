@@ -0,0 +1,40 @@
+"""
+Helpers for multi-get endpoints (`/posts/batch`, `/challenges/batch`, `/profiles/batch`).
+
+Routes dedupe the requested ids, resolve them with one batched service read,
+and return hits in request order plus the ids that came back empty. RLS
+makes "does not exist" and "not visible to you" indistinguishable, so both
+are reported as missing.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Hashable, Iterable, List, Tuple, TypeVar
+
+from fastapi import HTTPException, status
+
+from app.models import MAX_BATCH_IDS
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+def batch_ids(ids: Iterable[K]) -> List[K]:
+    """Dedupe ids keeping first-seen order; 400 when over MAX_BATCH_IDS."""
+    wanted = list(dict.fromkeys(ids))
+    if len(wanted) > MAX_BATCH_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {MAX_BATCH_IDS} ids per request",
+        )
+    return wanted
+
+
+def in_request_order(wanted: List[K], found: Dict[K, V]) -> Tuple[List[V], List[K]]:
+    """Split `wanted` into (found values in order, missing ids in order)."""
+    items = [found[k] for k in wanted if k in found]
+    missing = [k for k in wanted if k not in found]
+    return items, missing
+
+
+__all__ = ["batch_ids", "in_request_order"]
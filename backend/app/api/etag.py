@@ -0,0 +1,57 @@
+"""
+ETag / conditional GET helpers.
+
+Routes derive a strong ETag from row version data (updated_at, commitment
+count and latest commitment, counter values) or a content hash, and answer `If-None-Match` with 304 before
+validating or serializing the body.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Any, Dict, Optional
+
+from fastapi import Response, status
+
+# Polled resources: clients may store them but must revalidate every time.
+REVALIDATE = "private, no-cache"
+# Commitments never change once created.
+IMMUTABLE = "private, max-age=31536000, immutable"
+
+
+def make_etag(*parts: Any) -> str:
+    """Build a strong ETag from version parts (hashed so nothing internal leaks)."""
+    raw = json.dumps(parts, sort_keys=True, default=str, separators=(",", ":")).encode("utf-8")
+    return '"' + hashlib.blake2b(raw, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: Optional[str]) -> bool:
+    """Weak comparison as required for If-None-Match (RFC 9110 §13.1.2)."""
+    if not if_none_match or not etag:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = {c.strip().removeprefix("W/") for c in if_none_match.split(",")}
+    return etag in candidates
+
+
+def cache_headers(etag: Optional[str], cache_control: str = REVALIDATE) -> Dict[str, str]:
+    headers = {"Cache-Control": cache_control}
+    if etag:
+        headers["ETag"] = etag
+    return headers
+
+
+def not_modified(etag: str, cache_control: str = REVALIDATE) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers(etag, cache_control))
+
+
+__all__ = [
+    "IMMUTABLE",
+    "REVALIDATE",
+    "cache_headers",
+    "etag_matches",
+    "make_etag",
+    "not_modified",
+]
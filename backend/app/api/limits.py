@@ -0,0 +1,66 @@
+"""
+Per-user rate limit dependency for expensive routes.
+
+    @router.get("/challenges/search", dependencies=[Depends(rate_limit("search"))])
+
+Route-level dependencies run before the endpoint's own, so over-limit callers
+are rejected before their token is sent to Supabase Auth. Callers are keyed by:
+- the token's verified `sub` when SUPABASE_JWT_SECRET is set (a local HMAC check)
+- otherwise the client address alone: without the secret the token is only
+  verified later by the endpoint, and an unverified `sub` would let one client
+  rotate forged subs for a fresh bucket (and an Auth round trip) per request
+- the client address for anonymous callers and tokens that fail the check
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Callable
+
+from fastapi import Header, HTTPException, Request, status
+
+from app.core.admission import get_rate_limiter
+from app.core.config import settings
+from app.core.metrics import RATE_LIMITED
+from app.utils.auth import verify_access_token
+
+
+def _identity(request: Request, authorization: str | None) -> str:
+    address = f"ip:{request.client.host if request.client else 'unknown'}"
+    if not authorization or not authorization.lower().startswith("bearer "):
+        return address
+    if not settings.SUPABASE_JWT_SECRET:
+        # Verifying here would mean an Auth round trip per request, before the limit
+        return address
+    token = authorization.split(" ", 1)[1].strip()
+    try:
+        return f"user:{verify_access_token(token)['sub']}"
+    except HTTPException:
+        # Rejected again by the endpoint's own auth; counted against the address
+        return address
+
+
+def rate_limit(route_class: str) -> Callable[..., None]:
+    """Dependency enforcing the RATE_LIMITS bucket for `route_class`; 429 + Retry-After when empty.
+
+    A plain `def`, so FastAPI runs it in the threadpool: the SQLite backend can
+    wait on the file lock, which must not stall the event loop.
+    """
+
+    def dependency(request: Request, authorization: str | None = Header(None)) -> None:
+        limiter = get_rate_limiter()
+        if limiter is None:
+            return
+        retry_after = limiter.check(route_class, _identity(request, authorization))
+        if retry_after > 0:
+            RATE_LIMITED.inc(route_class)
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Rate limit exceeded",
+                headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+            )
+
+    return dependency
+
+
+__all__ = ["rate_limit"]
@@ -0,0 +1,54 @@
+"""
+Response helpers for routes that return service-validated models.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Mapping, Optional
+
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None  # type: ignore[assignment]
+
+
+class FastJSONResponse(JSONResponse):
+    """Default response class: orjson when installed, compact stdlib JSON otherwise.
+
+    Routes returning dicts or plain lists end up here after FastAPI's
+    jsonable_encoder pass; orjson renders those several times faster than json.dumps.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def model_response(
+    adapter: TypeAdapter[Any],
+    value: Any,
+    *,
+    status_code: int = 200,
+    headers: Optional[Mapping[str, str]] = None,
+) -> Response:
+    """Serialize an already-validated value straight to JSON bytes.
+
+    Services validate DB rows into models once; returning a Response here skips
+    FastAPI's second validation pass against `response_model`, which still drives
+    the OpenAPI schema.
+    """
+    return Response(
+        content=adapter.dump_json(value),
+        status_code=status_code,
+        headers=dict(headers) if headers else None,
+        media_type="application/json",
+    )
+
+
+__all__ = ["FastJSONResponse", "model_response"]
@@ -0,0 +1,43 @@
+"""
+Operator endpoints, enabled only when ADMIN_TOKEN is set.
+
+- GET /admin/profiles → recent profiler captures, newest first
+- GET /admin/profiles/{name} → one capture in collapsed-stack format
+"""
+
+from __future__ import annotations
+
+import hmac
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from fastapi.responses import FileResponse
+
+from app.core.config import settings
+from app.core.profiler import list_profiles, profile_path
+
+
+router = APIRouter()
+
+
+def _require_admin(x_admin_token: Optional[str] = Header(None)) -> None:
+    if not settings.ADMIN_TOKEN:
+        # Admin surface disabled: do not reveal that it exists
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, settings.ADMIN_TOKEN):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid admin token")
+
+
+@router.get("/admin/profiles", response_model=List[str], dependencies=[Depends(_require_admin)], include_in_schema=False)
+async def list_request_profiles(limit: int = 50):
+    """Names of captured request profiles; the name encodes time, reason, route, status and duration."""
+    return list_profiles(settings.PROFILER_DIR)[: max(1, min(limit, 500))]
+
+
+@router.get("/admin/profiles/{name}", dependencies=[Depends(_require_admin)], include_in_schema=False)
+async def get_request_profile(name: str):
+    """Download one profile; open it in speedscope or feed it to flamegraph.pl."""
+    path = profile_path(settings.PROFILER_DIR, name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="text/plain; charset=utf-8", filename=name)
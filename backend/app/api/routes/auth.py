@@ -2,83 +2,80 @@
 Authentication endpoints
 """
 
-import json
-import urllib.request
-from typing import Any, Dict, Optional
+import re
+from typing import List, Optional
 from uuid import UUID
-from fastapi import APIRouter, HTTPException, Header, status
+from fastapi import APIRouter, HTTPException, Header, Query, Response, status
 
-from app.core.config import settings
-from app.services.supabase import get_supabase_client
+from app.api.batch import batch_ids, in_request_order
+from app.api.etag import cache_headers, etag_matches, make_etag, not_modified
+from app.api.responses import model_response
 from app.models import (
+    ProfileBatch,
     ProfileOut,
     ProfileUpdate,
     MeSummary,
+    UsernameAvailability,
+    UsernameMatch,
+    UsernameSearch,
 )
+from app.models.adapters import ProfileBatchAdapter
 from app.services.aggregates import AggregatesService
+from app.services.profile_cache import profile_version
 from app.services.profile_service import ProfileService
+from app.services.username_index import UsernameIndex, get_username_index
+from app.utils.auth import (
+    extract_bearer_token as _extract_bearer_token,
+    get_supabase_user_from_token as _get_supabase_user_from_token,
+    verify_access_token,
+)
 
 
-def _extract_bearer_token(authorization: Optional[str]) -> str:
-    if not authorization or not authorization.lower().startswith("bearer "):
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing or invalid Authorization header")
-    return authorization.split(" ", 1)[1].strip()
-
-
-def _get_supabase_user_from_token(access_token: str) -> Dict[str, Any]:
-    if not settings.SUPABASE_URL:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="SUPABASE_URL not configured")
-    api_key = settings.SUPABASE_SERVICE_ROLE_KEY or settings.SUPABASE_KEY
-    if not api_key:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Supabase API key not configured")
-
-    url = f"{settings.SUPABASE_URL}/auth/v1/user"
-    req = urllib.request.Request(url)
-    req.add_header("Authorization", f"Bearer {access_token}")
-    req.add_header("apikey", api_key)
-    try:
-        with urllib.request.urlopen(req, timeout=10) as resp:
-            payload = json.loads(resp.read().decode("utf-8"))
-    except urllib.error.HTTPError as e:
-        if e.code == 401:
-            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid or expired token") from e
-        raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail="Auth verification failed") from e
-    except Exception as e:
-        raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail="Auth verification error") from e
+router = APIRouter()
 
-    if not isinstance(payload, dict) or "id" not in payload:
-        raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail="Unexpected auth response")
-    return payload
+# Same rule as the app's username screen
+USERNAME_RE = re.compile(r"^[A-Za-z0-9_]{3,}$")
 
 
-router = APIRouter()
+def _username_index() -> UsernameIndex:
+    index = get_username_index()
+    if index is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Username search is disabled")
+    if not index.ready:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Username index is loading",
+            headers={"Retry-After": "1"},
+        )
+    return index
 
 
 @router.get("/me")
-async def get_current_user_profile(authorization: Optional[str] = Header(None)) -> Optional[ProfileOut]:
+def get_current_user_profile(
+    response: Response,
+    authorization: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None),
+) -> Optional[ProfileOut]:
     """Return the current user's profile based on a Supabase JWT.
 
     Clients must send: Authorization: Bearer <access_token>
+    Supports `If-None-Match`; the ETag follows the profile's `updated_at`.
     """
     token = _extract_bearer_token(authorization)
     user_payload = _get_supabase_user_from_token(token)
-    user_id = user_payload["id"]
-
-    client = get_supabase_client()
-    # Fetch profile row; if none exists, return null profile rather than creating
-    profile_resp = client.table("profiles").select("*").eq("user_id", user_id).limit(1).execute()
-
-    try:
-        data = profile_resp.data  # type: ignore[attr-defined]
-    except Exception:
-        data = getattr(profile_resp, "data", None) or []
+    user_id = UUID(user_payload["id"])
 
-    profile: Optional[Dict[str, Any]] = data[0] if isinstance(data, list) and data else None
-    return profile  # type: ignore[return-value]
+    # Served from the profile cache when warm; null profile rather than creating one
+    profile = ProfileService().get_profile(user_id)
+    etag = make_etag("me", str(user_id), profile_version(profile) if profile else None)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)  # type: ignore[return-value]
+    response.headers.update(cache_headers(etag))
+    return profile
 
 
 @router.patch("/me")
-async def update_current_user_profile(body: ProfileUpdate, authorization: Optional[str] = Header(None)) -> ProfileOut:
+def update_current_user_profile(body: ProfileUpdate, authorization: Optional[str] = Header(None)) -> ProfileOut:
     """Update the current user's profile fields.
 
     Auth: same as GET /me; we use the Supabase JWT to derive user_id,
@@ -88,40 +85,26 @@ async def update_current_user_profile(body: ProfileUpdate, authorization: Option
     user_payload = _get_supabase_user_from_token(token)
     user_id = user_payload["id"]
 
-    # Only include provided fields
-    update_fields: Dict[str, Any] = {}
-    if body.username is not None:
-        update_fields["username"] = body.username
-    if body.full_name is not None:
-        update_fields["full_name"] = body.full_name
-    if body.avatar_url is not None:
-        update_fields["avatar_url"] = body.avatar_url
-
-    if not update_fields:
-        # Nothing to update; return current
-        client = get_supabase_client()
-        resp = client.table("profiles").select("*").eq("user_id", user_id).limit(1).execute()
-        data = getattr(resp, "data", None) or []
-        profile = data[0] if isinstance(data, list) and data else None
+    if body.username is None and body.full_name is None and body.avatar_url is None:
+        # Nothing to update; return current (own profile, so the cache may serve it)
+        profile = ProfileService().get_profile(UUID(user_id))
         if not profile:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
-        return profile  # type: ignore[return-value]
+        return profile
 
-    client = get_supabase_client()
-    # Upsert pattern to create the row if missing; relies on RLS allowing self-update
-    # If you prefer to require pre-existence, replace with update().
-    upsert_data = {"user_id": user_id, **update_fields}
-    result = client.table("profiles").upsert(upsert_data, on_conflict="user_id").select("*").eq("user_id", user_id).limit(1).execute()
-
-    data = getattr(result, "data", None) or []
-    profile = data[0] if isinstance(data, list) and data else None
-    if not profile:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to update profile")
-    return profile  # type: ignore[return-value]
+    # Upsert creates the row if missing; runs as the caller, so RLS allows only self-insert/update.
+    # The service reads the row back and writes it through to the profile cache.
+    svc = ProfileService(access_token=token)
+    return svc.upsert_profile(
+        user_id=UUID(user_id),
+        username=body.username,
+        full_name=body.full_name,
+        avatar_url=body.avatar_url,
+    )
 
 
 @router.get("/me/summary", response_model=MeSummary)
-async def get_me_summary(authorization: Optional[str] = Header(None)) -> MeSummary:
+def get_me_summary(authorization: Optional[str] = Header(None)) -> MeSummary:
     """Return aggregate summary for the current user (followers, following, counts, totals)."""
     token = _extract_bearer_token(authorization)
     user_payload = _get_supabase_user_from_token(token)
@@ -134,7 +117,7 @@ async def get_me_summary(authorization: Optional[str] = Header(None)) -> MeSumma
 
 
 @router.post("/profiles", response_model=ProfileOut, status_code=status.HTTP_201_CREATED)
-async def create_profile(body: ProfileUpdate, authorization: Optional[str] = Header(None)) -> ProfileOut:
+def create_profile(body: ProfileUpdate, authorization: Optional[str] = Header(None)) -> ProfileOut:
     """Create or upsert a user's profile using provided fields.
 
     The authenticated user is derived from the Supabase JWT. This endpoint intentionally
@@ -144,10 +127,58 @@ async def create_profile(body: ProfileUpdate, authorization: Optional[str] = Hea
     user_payload = _get_supabase_user_from_token(token)
     user_id = UUID(user_payload["id"])  # type: ignore[arg-type]
 
-    svc = ProfileService()
+    # Written as the caller (RLS); the read-back is written through to the profile cache
+    svc = ProfileService(access_token=token)
     return svc.upsert_profile(
         user_id=user_id,
         username=body.username,
         full_name=body.full_name,
         avatar_url=body.avatar_url,
     )
+
+
+@router.get("/profiles/batch", response_model=ProfileBatch)
+def get_profiles_batch(
+    ids: List[UUID] = Query(..., description="User ids (repeat the parameter); order is preserved"),
+    authorization: Optional[str] = Header(None),
+):
+    """Get many profiles in one read; unknown or hidden ids are listed in `missing`."""
+    token = _extract_bearer_token(authorization)
+    # 401 for a bad token instead of a PostgREST error from the scoped read
+    verify_access_token(token)
+    wanted = batch_ids(ids)
+    found = ProfileService(access_token=token).get_profiles_by_ids(wanted)
+    items, missing = in_request_order(wanted, found)
+    return model_response(ProfileBatchAdapter, ProfileBatch(items=items, missing=missing))
+
+
+@router.get("/profiles/search", response_model=UsernameSearch)
+def search_usernames(
+    q: str = Query(..., min_length=1, max_length=64, description="Username prefix, case-insensitive"),
+    limit: int = Query(10, ge=1, le=50),
+    authorization: Optional[str] = Header(None),
+) -> UsernameSearch:
+    """Username autocomplete, answered from the in-memory username index (no database read)."""
+    token = _extract_bearer_token(authorization)
+    verify_access_token(token)
+    matches = _username_index().search(q.strip(), limit)
+    return UsernameSearch(items=[UsernameMatch(user_id=UUID(uid), username=name) for name, uid in matches])
+
+
+@router.get("/usernames/availability", response_model=UsernameAvailability)
+def get_username_availability(
+    username: str = Query(..., min_length=1, max_length=64),
+    authorization: Optional[str] = Header(None),
+) -> UsernameAvailability:
+    """Whether `username` is free to take, from the in-memory username index.
+
+    The caller's own username counts as available. Advisory: the unique
+    constraint on `profiles.username` decides when the name is saved.
+    """
+    token = _extract_bearer_token(authorization)
+    claims = verify_access_token(token)
+    name = username.strip()
+    if not USERNAME_RE.match(name):
+        return UsernameAvailability(username=name, valid=False, available=False)
+    owner = _username_index().owner(name)
+    return UsernameAvailability(username=name, valid=True, available=owner is None or owner == claims["sub"])
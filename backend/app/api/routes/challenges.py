@@ -7,12 +7,15 @@ Phase 3: create, details, update, posts listing, and challenge listing with filt
 from __future__ import annotations
 
 from datetime import datetime
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 
 from app.models import (
+    ChallengeBatch,
     ChallengeCreate,
     ChallengeUpdate,
     ChallengeOut,
@@ -20,13 +23,37 @@ from app.models import (
     ChallengeStats,
     PostWithCounts,
 )
-from app.utils.auth import extract_bearer_token, get_supabase_user_from_token
+from app.api.batch import batch_ids, in_request_order
+from app.api.etag import cache_headers, etag_matches, make_etag, not_modified
+from app.api.responses import model_response
+from app.models.adapters import (
+    ChallengeBatchAdapter,
+    ChallengeDetailAdapter,
+    ChallengeOutListAdapter,
+    ChallengeStatsAdapter,
+    PostWithCountsListAdapter,
+)
+from app.utils.auth import extract_bearer_token, get_supabase_user_from_token, verify_access_token
 from app.services.challenges import ChallengeService
 from app.services.aggregates import AggregatesService
+from app.services.direct_reads import direct_reads_for
+from app.services.stats_broadcaster import get_stats_broadcaster
+from app.core.config import settings
+from app.core.resilience import UpstreamUnavailable
 
 
 router = APIRouter()
 
+# Upper bound on challenges a single stream may watch
+MAX_STREAM_CHALLENGES = 100
+
+
+def _challenge_etag(kind: str, row: Dict[str, Any]) -> Optional[str]:
+    """ETag from the challenge's version columns; None for rows read without them."""
+    if "commitment_count" not in row:
+        return None
+    return make_etag(kind, row["id"], row.get("updated_at"), row["commitment_count"], row["last_commitment_at"])
+
 
 def _current_user_id(authorization: str | None = Header(None)) -> UUID:
     token = extract_bearer_token(authorization)
@@ -35,27 +62,76 @@ def _current_user_id(authorization: str | None = Header(None)) -> UUID:
 
 
 @router.post("/challenges", response_model=ChallengeOut, status_code=status.HTTP_201_CREATED)
-async def create_challenge(body: ChallengeCreate, user_id: UUID = Depends(_current_user_id)):
+def create_challenge(body: ChallengeCreate, user_id: UUID = Depends(_current_user_id)):
     """Create a challenge owned by the authenticated user."""
     try:
         service = ChallengeService()
         return service.create(owner_id=user_id, payload=body)
+    except UpstreamUnavailable:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
+# Declared before /challenges/{challenge_id} so "batch" is not parsed as an id
+@router.get("/challenges/batch", response_model=ChallengeBatch)
+def get_challenges_batch(
+    ids: List[int] = Query(..., description="Challenge ids (repeat the parameter); order is preserved"),
+    authorization: str | None = Header(None),
+):
+    """Get many challenges with aggregate stats in two reads.
+
+    Ids that do not exist or are hidden by RLS are listed in `missing`.
+    """
+    token = extract_bearer_token(authorization)
+    # 401 for a bad token instead of a PostgREST error from the scoped reads
+    verify_access_token(token)
+    wanted = batch_ids(ids)
+    found = ChallengeService(access_token=token).get_details_by_ids(wanted)
+    items, missing = in_request_order(wanted, found)
+    return model_response(ChallengeBatchAdapter, ChallengeBatch(items=items, missing=missing))
+
+
 @router.get("/challenges/{challenge_id}", response_model=ChallengeDetail)
-async def get_challenge(challenge_id: int):
-    """Get challenge details with aggregate stats."""
+async def get_challenge(
+    challenge_id: int,
+    if_none_match: Optional[str] = Header(None),
+    authorization: str | None = Header(None),
+):
+    """Get challenge details with aggregate stats.
+
+    Requires a bearer token; challenges the caller cannot see under RLS are 404 on both
+    the direct and the PostgREST path. Supports `If-None-Match`: a matching ETag returns
+    304 before the stats aggregate is read.
+    """
+    token = extract_bearer_token(authorization)
+    async with direct_reads_for(authorization) as direct:
+        if direct is not None:
+            try:
+                row = await direct.get_challenge_row(challenge_id)
+            except ValueError:
+                raise HTTPException(status_code=404, detail="Challenge not found")
+            etag = _challenge_etag("challenge", row)
+            if etag_matches(if_none_match, etag):
+                return not_modified(etag)
+            detail = await direct.get_challenge_detail(row)
+            return model_response(ChallengeDetailAdapter, detail, headers=cache_headers(etag))
+    # 401 for a bad token instead of a PostgREST error from the scoped read
+    await run_in_threadpool(verify_access_token, token)
+    service = ChallengeService(access_token=token)
     try:
-        service = ChallengeService()
-        return service.get_detail(challenge_id=challenge_id)
+        row = await run_in_threadpool(service.get_row, challenge_id)
     except ValueError:
         raise HTTPException(status_code=404, detail="Challenge not found")
+    etag = _challenge_etag("challenge", row)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    detail = await run_in_threadpool(service.get_detail, challenge_id=challenge_id, row=row)
+    return model_response(ChallengeDetailAdapter, detail, headers=cache_headers(etag))
 
 
 @router.patch("/challenges/{challenge_id}", response_model=ChallengeOut)
-async def update_challenge(challenge_id: int, body: ChallengeUpdate, user_id: UUID = Depends(_current_user_id)):
+def update_challenge(challenge_id: int, body: ChallengeUpdate, user_id: UUID = Depends(_current_user_id)):
     """Update challenge metadata if not locked (no commitments) and owned by user."""
     service = ChallengeService()
     try:
@@ -70,18 +146,18 @@ async def update_challenge(challenge_id: int, body: ChallengeUpdate, user_id: UU
 
 
 @router.get("/challenges/{challenge_id}/posts", response_model=List[PostWithCounts])
-async def list_challenge_posts(
+def list_challenge_posts(
     challenge_id: int,
     cursor: Optional[datetime] = Query(default=None, description="Return items created before this timestamp"),
     limit: int = Query(default=20, ge=1, le=100),
 ):
     """Paginated posts for a challenge, newest first."""
     service = ChallengeService()
-    return service.list_posts(challenge_id=challenge_id, cursor=cursor, limit=limit)
+    return model_response(PostWithCountsListAdapter, service.list_posts(challenge_id=challenge_id, cursor=cursor, limit=limit))
 
 
 @router.get("/challenges", response_model=List[ChallengeOut])
-async def list_challenges(
+def list_challenges(
     creator_id: Optional[UUID] = Query(default=None, description="Filter by owner_id"),
     active: Optional[bool] = Query(default=None, description="Only active/inactive challenges"),
     cursor: Optional[datetime] = Query(default=None, description="Return items created before this timestamp"),
@@ -89,14 +165,83 @@ async def list_challenges(
 ):
     """List challenges with optional filters and cursor-based pagination by created_at."""
     service = ChallengeService()
-    return service.list_challenges(creator_id=creator_id, active=active, cursor=cursor, limit=limit)
+    return model_response(
+        ChallengeOutListAdapter,
+        service.list_challenges(creator_id=creator_id, active=active, cursor=cursor, limit=limit),
+    )
 
 
 @router.get("/challenges/{challenge_id}/stats", response_model=ChallengeStats)
-async def get_challenge_stats(challenge_id: int):
-    """Return aggregate stats for a single challenge."""
+def get_challenge_stats(challenge_id: int, if_none_match: Optional[str] = Header(None)):
+    """Return aggregate stats for a single challenge.
+
+    Supports `If-None-Match`: the ETag tracks the challenge's commitments, so polling
+    clients get 304 from a single row read without running the aggregate.
+    """
+    try:
+        row = ChallengeService().get_row(challenge_id)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Challenge not found")
+    etag = _challenge_etag("stats", row)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
     svc = AggregatesService()
     try:
-        return svc.challenge_stats(challenge_id)
+        stats = svc.challenge_stats(challenge_id)
     except ValueError:
         raise HTTPException(status_code=404, detail="Challenge not found")
+    return model_response(ChallengeStatsAdapter, stats, headers=cache_headers(etag))
+
+
+@router.get("/challenges/stats/stream")
+async def stream_challenge_stats(
+    request: Request,
+    ids: List[int] = Query(..., description="Challenge ids to watch (repeat the parameter)"),
+    authorization: str | None = Header(None),
+):
+    """Server-sent events with counter updates for a set of challenges.
+
+    Emits one `stats` event (a ChallengeStats object) per changed challenge, coalesced per
+    tick, starting with a snapshot. Ids the caller cannot see are dropped silently. All
+    watchers in this process share one upstream read per tick.
+    """
+    token = extract_bearer_token(authorization)
+    await run_in_threadpool(get_supabase_user_from_token, token)
+    wanted = list(dict.fromkeys(ids))[:MAX_STREAM_CHALLENGES]
+    visible = await run_in_threadpool(ChallengeService(access_token=token).get_details_by_ids, wanted)
+    if not visible:
+        raise HTTPException(status_code=404, detail="No visible challenges")
+
+    broadcaster = get_stats_broadcaster()
+    sub = broadcaster.subscribe(visible.keys())
+    # The visibility read already carries the counters; use it as the initial snapshot
+    for d in visible.values():
+        broadcaster.publish(
+            ChallengeStats(
+                challenge_id=d.id,
+                amount_cents=d.amount_cents,
+                for_count=d.for_count,
+                against_count=d.against_count,
+                for_amount_cents=d.for_amount_cents,
+                against_amount_cents=d.against_amount_cents,
+            )
+        )
+
+    async def events():
+        try:
+            yield "retry: 3000\n\n"
+            while not await request.is_disconnected():
+                batch = await sub.next_batch(timeout=settings.STATS_STREAM_HEARTBEAT_SECONDS)
+                if not batch:
+                    yield ": ping\n\n"
+                    continue
+                for stats in batch:
+                    yield f"event: stats\ndata: {stats.model_dump_json()}\n\n"
+        finally:
+            broadcaster.unsubscribe(sub)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
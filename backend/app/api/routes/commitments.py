@@ -4,8 +4,8 @@ Commitments endpoints.
 Includes:
 - POST /challenges/{challenge_id}/commitments → create (idempotent)
 - GET  /challenges/{challenge_id}/commitments/me → my commitment
-- GET  /challenges/{challenge_id}/commitments → list for challenge
-- GET  /commitments/me → list all my commitments
+- GET  /challenges/{challenge_id}/commitments → list for challenge (keyset-paginated)
+- GET  /commitments/me → list all my commitments (keyset-paginated)
 """
 
 from __future__ import annotations
@@ -15,14 +15,19 @@ from uuid import UUID
 
 from fastapi import APIRouter, Depends, Header, HTTPException, Path, Query, status
 
-from app.models import CommitmentOut, CommitmentRequest, CommitmentSide
+from app.models import CommitmentCreated, CommitmentExpand, CommitmentOut, CommitmentPage, CommitmentRequest, CommitmentSide
+from app.api.etag import IMMUTABLE, cache_headers, etag_matches, make_etag, not_modified
+from app.api.responses import model_response
+from app.core.resilience import UpstreamUnavailable
+from app.models.adapters import CommitmentOutAdapter, CommitmentPageAdapter
 from app.services.commitments import CommitmentService
+from app.services.idempotency import IdempotencyKeyInFlight, IdempotencyKeyReused
+from app.services.pagination import InvalidCursor
 from app.utils.auth import extract_bearer_token, get_supabase_user_from_token
 
 
 router = APIRouter()
 
-
 def _token(authorization: str | None = Header(None)) -> str:
     return extract_bearer_token(authorization)
 
@@ -33,8 +38,8 @@ def _current_user_id(authorization: str | None = Header(None)) -> UUID:
     return UUID(user_payload["id"])  # type: ignore[arg-type]
 
 
-@router.post("/challenges/{challenge_id}/commitments", response_model=CommitmentOut, status_code=status.HTTP_201_CREATED)
-async def create_commitment(
+@router.post("/challenges/{challenge_id}/commitments", response_model=CommitmentCreated, status_code=status.HTTP_201_CREATED)
+def create_commitment(
     challenge_id: int = Path(..., ge=1),
     body: CommitmentRequest | None = None,
     user_id: UUID = Depends(_current_user_id),
@@ -42,7 +47,9 @@ async def create_commitment(
 ):
     """Create a commitment for the current user.
 
-    Idempotent: if a commitment already exists, returns the existing row.
+    Idempotent: if a commitment already exists, returns the existing row (`created: false`).
+    Retries carrying the same `idempotency_key` replay the first response without touching
+    the database. `stats` holds the challenge counters after the write.
     """
     if not body or not body.direction:
         raise HTTPException(status_code=400, detail="direction is required")
@@ -51,40 +58,60 @@ async def create_commitment(
         return svc.create(user_id=user_id, challenge_id=challenge_id, side=body.direction, idempotency_key=body.idempotency_key)
     except PermissionError:
         raise HTTPException(status_code=403, detail="Not allowed")
+    except (IdempotencyKeyReused, IdempotencyKeyInFlight) as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except UpstreamUnavailable:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.get("/challenges/{challenge_id}/commitments/me", response_model=CommitmentOut)
-async def get_my_commitment(
+def get_my_commitment(
     challenge_id: int = Path(..., ge=1),
+    if_none_match: Optional[str] = Header(None),
     user_id: UUID = Depends(_current_user_id),
     token: str = Depends(_token),
 ):
+    """Return my commitment; commitments are immutable, so the response is cacheable for good."""
     svc = CommitmentService(token)
     c = svc.get_my(user_id=user_id, challenge_id=challenge_id)
     if not c:
         raise HTTPException(status_code=404, detail="Not found")
-    return c
+    etag = make_etag("commitment", c.id)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag, IMMUTABLE)
+    return model_response(CommitmentOutAdapter, c, headers=cache_headers(etag, IMMUTABLE))
 
 
-@router.get("/challenges/{challenge_id}/commitments", response_model=List[CommitmentOut])
-async def list_commitments(
+@router.get("/challenges/{challenge_id}/commitments", response_model=CommitmentPage)
+def list_commitments(
     challenge_id: int = Path(..., ge=1),
     limit: int = Query(default=50, ge=1, le=100),
+    cursor: Optional[str] = Query(default=None, description="`next_cursor` from the previous page"),
+    expand: List[CommitmentExpand] = Query(default=[], description="Embed `challenge` and/or `profile`"),
     token: str = Depends(_token),
 ):
     svc = CommitmentService(token)
-    return svc.list_for_challenge(challenge_id=challenge_id, limit=limit)
+    try:
+        page = svc.list_for_challenge(challenge_id=challenge_id, limit=limit, cursor=cursor, expand=[e.value for e in expand])
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return model_response(CommitmentPageAdapter, page)
 
 
-@router.get("/commitments/me", response_model=List[CommitmentOut])
-async def list_my_commitments(
-    limit: int = Query(default=100, ge=1, le=200),
+@router.get("/commitments/me", response_model=CommitmentPage)
+def list_my_commitments(
+    limit: int = Query(default=100, ge=1, le=100),
+    cursor: Optional[str] = Query(default=None, description="`next_cursor` from the previous page"),
+    expand: List[CommitmentExpand] = Query(default=[], description="Embed `challenge` and/or `profile`"),
     user_id: UUID = Depends(_current_user_id),
     token: str = Depends(_token),
 ):
-    """Get all commitments for the current user."""
+    """Get the current user's commitments, newest first, in pages of at most 100."""
     svc = CommitmentService(token)
-    return svc.list_my_commitments(user_id=user_id, limit=limit)
-
+    try:
+        page = svc.list_my_commitments(user_id=user_id, limit=limit, cursor=cursor, expand=[e.value for e in expand])
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return model_response(CommitmentPageAdapter, page)
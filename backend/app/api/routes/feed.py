@@ -15,8 +15,18 @@ from typing import List, Optional
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, Header, Query
+from fastapi.concurrency import run_in_threadpool
 
+from app.api.limits import rate_limit
+from app.api.responses import model_response
 from app.models import FeedResponse, PostWithCounts, ChallengeDetail, ChallengeOut
+from app.models.adapters import (
+    ChallengeDetailListAdapter,
+    ChallengeOutListAdapter,
+    FeedResponseAdapter,
+    PostWithCountsListAdapter,
+)
+from app.services.direct_reads import direct_reads_for
 from app.services.feed import FeedService
 from app.utils.auth import extract_bearer_token
 
@@ -32,38 +42,42 @@ def _access_token(authorization: str | None = Header(None)) -> str:
 async def get_feed(
     cursor: Optional[datetime] = Query(default=None, description="Return items created before this timestamp"),
     limit: int = Query(default=20, ge=1, le=100),
-    token: str = Depends(_access_token),
+    authorization: str | None = Header(None),
 ):
+    token = extract_bearer_token(authorization)
+    async with direct_reads_for(authorization) as direct:
+        if direct is not None:
+            return model_response(FeedResponseAdapter, await direct.get_feed(after=cursor, limit=limit))
     svc = FeedService(token)
-    return svc.get_feed(after=cursor, limit=limit)
+    return model_response(FeedResponseAdapter, await run_in_threadpool(svc.get_feed, after=cursor, limit=limit))
 
 
 @router.get("/feed/challenges/trending", response_model=List[ChallengeDetail])
-async def trending_challenges(
+def trending_challenges(
     limit: int = Query(default=10, ge=1, le=50),
     token: str = Depends(_access_token),
 ):
     svc = FeedService(token)
-    return svc.trending_challenges(limit=limit)
+    return model_response(ChallengeDetailListAdapter, svc.trending_challenges(limit=limit))
 
 
 @router.get("/users/{user_id}/posts", response_model=List[PostWithCounts])
-async def user_posts(
+def user_posts(
     user_id: UUID,
     cursor: Optional[datetime] = Query(default=None),
     limit: int = Query(default=20, ge=1, le=100),
     token: str = Depends(_access_token),
 ):
     svc = FeedService(token)
-    return svc.user_posts(user_id=user_id, cursor=cursor, limit=limit)
+    return model_response(PostWithCountsListAdapter, svc.user_posts(user_id=user_id, cursor=cursor, limit=limit))
 
 
-@router.get("/challenges/search", response_model=List[ChallengeOut])
-async def search_challenges(
+@router.get("/challenges/search", response_model=List[ChallengeOut], dependencies=[Depends(rate_limit("search"))])
+def search_challenges(
     q: str = Query(..., min_length=1),
     limit: int = Query(default=20, ge=1, le=100),
     token: str = Depends(_access_token),
 ):
     svc = FeedService(token)
-    return svc.search_challenges(query=q, limit=limit)
+    return model_response(ChallengeOutListAdapter, svc.search_challenges(query=q, limit=limit))
 
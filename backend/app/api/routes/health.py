@@ -3,8 +3,11 @@ Health check endpoints
 """
 
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse
 from datetime import datetime
 
+from app.services.readiness import get_readiness_monitor
+
 router = APIRouter()
 
 @router.get("/health")
@@ -20,3 +23,13 @@ async def health_check():
 async def ping():
     """Simple ping endpoint"""
     return {"message": "pong"}
+
+@router.get("/ready")
+async def readiness():
+    """Readiness for load balancers: 200 when ready, 503 otherwise.
+
+    Reports cached PostgREST and Auth probe results, event loop lag, in-flight requests
+    and thread pool occupancy. Never calls upstream itself.
+    """
+    report = get_readiness_monitor().report()
+    return JSONResponse(report, status_code=200 if report["ready"] else 503, headers={"Cache-Control": "no-store"})
@@ -0,0 +1,43 @@
+"""
+Home-screen bundle endpoint.
+
+- GET /home?sections=... → { me, summary, feed, commitments, network, partial, errors }
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import List
+from uuid import UUID
+
+from fastapi import APIRouter, Header, Query
+
+from app.api.responses import model_response
+from app.core.config import settings
+from app.models import HomeBundle, HomeSection
+from app.models.adapters import HomeBundleAdapter
+from app.services.home import HomeService
+from app.utils.auth import extract_bearer_token, get_supabase_user_from_token
+
+
+router = APIRouter()
+
+
+@router.get("/home", response_model=HomeBundle)
+async def get_home(
+    sections: List[HomeSection] = Query(default=[], description="Sections to load; all when omitted"),
+    authorization: str | None = Header(None),
+):
+    """Load the launch screen in one round trip.
+
+    Replaces sequential calls to /me, /me/summary, /feed, /commitments/me and /network:
+    the token is verified once and the reads run concurrently, each within
+    `HOME_SECTION_BUDGET_SECONDS`. Sections that miss the budget come back null with
+    `partial: true`; `Server-Timing` reports each section's duration.
+    """
+    token = extract_bearer_token(authorization)
+    user_payload = await asyncio.to_thread(get_supabase_user_from_token, token)
+    svc = HomeService(token, UUID(user_payload["id"]))
+    bundle, timings = await svc.bundle(sections, settings.HOME_SECTION_BUDGET_SECONDS)
+    server_timing = ", ".join(f"{name};dur={ms:.1f}" for name, ms in timings.items())
+    return model_response(HomeBundleAdapter, bundle, headers={"Cache-Control": "private, no-store", "Server-Timing": server_timing})
@@ -0,0 +1,18 @@
+"""
+Prometheus scrape endpoint.
+
+- GET /metrics → text exposition of app.core.metrics.registry
+"""
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.core.metrics import registry
+
+router = APIRouter()
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics() -> PlainTextResponse:
+    """Latency histograms, upstream call stats and event loop lag for this worker."""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
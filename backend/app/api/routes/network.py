@@ -10,6 +10,7 @@ from uuid import UUID
 
 from fastapi import APIRouter, Depends, Header, HTTPException, status
 
+from app.api.limits import rate_limit
 from app.models import (
     ImportContactsRequest,
     ImportContactsResponse,
@@ -23,15 +24,15 @@ from app.utils.auth import extract_bearer_token, get_supabase_user_from_token
 router = APIRouter()
 
 
-async def _current_user_id_from_header(authorization: str | None = Header(None)) -> UUID:
+def _current_user_id_from_header(authorization: str | None = Header(None)) -> UUID:
     """Derive current user_id from Supabase JWT (Authorization: Bearer <token>)."""
     token = extract_bearer_token(authorization)
     user_payload = get_supabase_user_from_token(token)
     return UUID(user_payload["id"])  # type: ignore[arg-type]
 
 
-@router.post("/network/import-contacts", response_model=ImportContactsResponse)
-async def import_contacts(
+@router.post("/network/import-contacts", response_model=ImportContactsResponse, dependencies=[Depends(rate_limit("contacts"))])
+def import_contacts(
     payload: ImportContactsRequest,
     user_id: UUID = Depends(_current_user_id_from_header),
 ):
@@ -42,7 +43,7 @@ async def import_contacts(
 
 
 @router.post("/network/follow", status_code=status.HTTP_201_CREATED)
-async def follow(
+def follow(
     request: FollowRequest,
     user_id: UUID = Depends(_current_user_id_from_header),
 ):
@@ -55,7 +56,7 @@ async def follow(
 
 
 @router.delete("/network/follow/{target_user_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def unfollow(
+def unfollow(
     target_user_id: UUID,
     user_id: UUID = Depends(_current_user_id_from_header),
 ):
@@ -68,14 +69,14 @@ async def unfollow(
 
 
 @router.get("/network", response_model=NetworkListResponse)
-async def list_network(user_id: UUID = Depends(_current_user_id_from_header)):
+def list_network(user_id: UUID = Depends(_current_user_id_from_header)):
     """List my network with followers, following, and counts."""
     service = NetworkService()
     return service.list_network(user_id=user_id)
 
 
-@router.post("/network/import-and-follow", response_model=ImportContactsResponse)
-async def import_and_follow(
+@router.post("/network/import-and-follow", response_model=ImportContactsResponse, dependencies=[Depends(rate_limit("contacts"))])
+def import_and_follow(
     payload: ImportContactsRequest,
     user_id: UUID = Depends(_current_user_id_from_header),
 ):
@@ -6,14 +6,22 @@ Phase 4: create (optionally create challenge atomically), get with aggregates +
 
 from __future__ import annotations
 
-from typing import Optional
+from typing import List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, Header, HTTPException, Path, status
-
-from app.models import CreatePostRequest, PostFull, PostWithCounts, PostMediaUpdate
+from fastapi import APIRouter, Depends, Header, HTTPException, Path, Query, status
+from fastapi.concurrency import run_in_threadpool
+
+from app.api.batch import batch_ids, in_request_order
+from app.api.etag import cache_headers, etag_matches, make_etag, not_modified
+from app.api.responses import model_response
+from app.core.resilience import UpstreamUnavailable
+from app.models import CreatePostRequest, PostBatch, PostFull, PostWithCounts, PostMediaUpdate
+from app.models.adapters import PostBatchAdapter, PostFullAdapter
+from app.services.direct_reads import direct_reads_for
+from app.services.idempotency import IdempotencyKeyInFlight, IdempotencyKeyReused
 from app.services.posts import PostService
-from app.utils.auth import extract_bearer_token, get_supabase_user_from_token
+from app.utils.auth import extract_bearer_token, get_supabase_user_from_token, verify_access_token
 
 
 router = APIRouter()
@@ -26,33 +34,88 @@ def _current_user_id(authorization: str | None = Header(None)) -> UUID:
 
 
 @router.post("/posts", response_model=PostWithCounts, status_code=status.HTTP_201_CREATED)
-async def create_post(body: CreatePostRequest, user_id: UUID = Depends(_current_user_id)):
+def create_post(body: CreatePostRequest, user_id: UUID = Depends(_current_user_id)):
     """Create a post.
 
     - Provide `challenge_id` to post under an existing challenge (must be owner).
     - Or provide `new_challenge` to create a challenge + post atomically (owner=caller).
     Note: Media uploads are not part of the DB transaction. Ensure you upload after receiving
     the created post, or pre-generate a key and pass it as `media_url`.
+    Retries carrying the same `idempotency_key` return the originally created post.
     """
     try:
         service = PostService()
         return service.create(author_id=user_id, body=body)
+    except (IdempotencyKeyReused, IdempotencyKeyInFlight) as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except UpstreamUnavailable:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
+# Declared before /posts/{post_id} so "batch" is not parsed as an id
+@router.get("/posts/batch", response_model=PostBatch)
+def get_posts_batch(
+    ids: List[int] = Query(..., description="Post ids (repeat the parameter); order is preserved"),
+    authorization: str | None = Header(None),
+):
+    """Get many posts (aggregates + author) with one read per entity type.
+
+    Ids that do not exist or are hidden by RLS are listed in `missing`.
+    """
+    token = extract_bearer_token(authorization)
+    # 401 for a bad token instead of a PostgREST error from the scoped reads
+    verify_access_token(token)
+    wanted = batch_ids(ids)
+    found = PostService(access_token=token).get_many(wanted)
+    items, missing = in_request_order(wanted, found)
+    return model_response(PostBatchAdapter, PostBatch(items=items, missing=missing))
+
+
 @router.get("/posts/{post_id}", response_model=PostFull)
-async def get_post(post_id: int = Path(..., ge=1)):
-    """Get post + aggregates + author profile."""
+async def get_post(
+    post_id: int = Path(..., ge=1),
+    if_none_match: Optional[str] = Header(None),
+    authorization: str | None = Header(None),
+):
+    """Get post + aggregates + author profile.
+
+    Requires a bearer token; posts the caller cannot see under RLS are 404 on both the
+    direct and the PostgREST path. Supports `If-None-Match` with an ETag over the post
+    row (counters included) and the author's profile version; a match returns 304
+    without serializing the body.
+    """
+    token = extract_bearer_token(authorization)
+    async with direct_reads_for(authorization) as direct:
+        if direct is not None:
+            try:
+                row = await direct.get_post_row(post_id)
+            except ValueError:
+                raise HTTPException(status_code=404, detail="Post not found")
+            post = await direct.get_post(row)
+            author = post.author_profile
+            etag = make_etag("post", row, author.updated_at if author else None)
+            if etag_matches(if_none_match, etag):
+                return not_modified(etag)
+            return model_response(PostFullAdapter, post, headers=cache_headers(etag))
+    # 401 for a bad token instead of a PostgREST error from the scoped reads
+    await run_in_threadpool(verify_access_token, token)
+    service = PostService(access_token=token)
     try:
-        service = PostService()
-        return service.get(post_id=post_id)
+        row = await run_in_threadpool(service.get_row, post_id)
+        post = await run_in_threadpool(service.get, post_id=post_id, row=row)
     except ValueError:
         raise HTTPException(status_code=404, detail="Post not found")
+    author = post.author_profile
+    etag = make_etag("post", row, author.updated_at if author else None)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    return model_response(PostFullAdapter, post, headers=cache_headers(etag))
 
 
 @router.delete("/posts/{post_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_post(post_id: int = Path(..., ge=1), user_id: UUID = Depends(_current_user_id)):
+def delete_post(post_id: int = Path(..., ge=1), user_id: UUID = Depends(_current_user_id)):
     """Delete a post (author-only; enforced by RLS)."""
     service = PostService()
     service.delete(author_id=user_id, post_id=post_id)
@@ -60,7 +123,7 @@ async def delete_post(post_id: int = Path(..., ge=1), user_id: UUID = Depends(_c
 
 
 @router.patch("/posts/{post_id}/media", response_model=PostWithCounts)
-async def update_post_media(
+def update_post_media(
     post_id: int = Path(..., ge=1),
     body: PostMediaUpdate | None = None,
     user_id: UUID = Depends(_current_user_id),
@@ -0,0 +1,50 @@
+"""
+Delta sync endpoint.
+
+- GET /sync?token=... → rows created, changed or deleted since the token, plus the next token
+"""
+
+from __future__ import annotations
+
+from typing import Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+
+from app.api.responses import model_response
+from app.models import SyncResponse
+from app.models.adapters import SyncResponseAdapter
+from app.services.sync import SyncService
+from app.utils.auth import extract_bearer_token, get_supabase_user_from_token
+
+
+router = APIRouter()
+
+
+def _token(authorization: str | None = Header(None)) -> str:
+    return extract_bearer_token(authorization)
+
+
+def _current_user_id(authorization: str | None = Header(None)) -> UUID:
+    token = extract_bearer_token(authorization)
+    user_payload = get_supabase_user_from_token(token)
+    return UUID(user_payload["id"])  # type: ignore[arg-type]
+
+
+@router.get("/sync", response_model=SyncResponse)
+def sync(
+    token: Optional[str] = Query(default=None, description="`next_token` from the previous sync; omit on first run"),
+    limit: int = Query(default=500, ge=1, le=1000),
+    user_id: UUID = Depends(_current_user_id),
+    access_token: str = Depends(_token),
+):
+    """Return feed posts, challenge counters, my commitments and my connections changed since `token`.
+
+    Refresh cost is proportional to churn: only changed rows are re-read. A response with
+    `reset: true` asks the client to reload in full once and keep the returned token.
+    """
+    svc = SyncService(access_token)
+    try:
+        return model_response(SyncResponseAdapter, svc.changes_since(user_id=user_id, token=token, limit=limit))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid sync token")
@@ -11,7 +11,10 @@ from __future__ import annotations
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, Header, File, Form, UploadFile
+from fastapi.concurrency import run_in_threadpool
 
+from app.api.limits import rate_limit
+from app.core.resilience import UpstreamUnavailable
 from app.models import PresignRequest, PresignResponse
 from app.services.uploads import UploadService
 from app.utils.auth import extract_bearer_token, get_supabase_user_from_token
@@ -26,8 +29,8 @@ def _current_user_id(authorization: str | None = Header(None)) -> UUID:
     return UUID(user_payload["id"])  # type: ignore[arg-type]
 
 
-@router.post("/uploads/presign", response_model=PresignResponse)
-async def presign_upload(body: PresignRequest, user_id: UUID = Depends(_current_user_id)):
+@router.post("/uploads/presign", response_model=PresignResponse, dependencies=[Depends(rate_limit("upload"))])
+def presign_upload(body: PresignRequest, user_id: UUID = Depends(_current_user_id)):
     """Return a signed upload URL for the authenticated user and a specific post.
 
     The response includes:
@@ -39,7 +42,7 @@ async def presign_upload(body: PresignRequest, user_id: UUID = Depends(_current_
     return svc.presign(user_id=user_id, req=body)
 
 
-@router.post("/uploads/direct")
+@router.post("/uploads/direct", dependencies=[Depends(rate_limit("upload"))])
 async def direct_upload(
     post_id: int = Form(..., ge=1),
     file: UploadFile = File(...),
@@ -52,7 +55,8 @@ async def direct_upload(
     svc = UploadService()
     try:
         content = await file.read()
-        path = svc.direct_upload(
+        path = await run_in_threadpool(
+            svc.direct_upload,
             user_id=user_id,
             post_id=post_id,
             content=content,
@@ -66,6 +70,8 @@ async def direct_upload(
     except ValueError as e:
         from fastapi import HTTPException
         raise HTTPException(status_code=404, detail=str(e))
+    except UpstreamUnavailable:
+        raise
     except Exception as e:
         from fastapi import HTTPException
         raise HTTPException(status_code=400, detail=str(e))
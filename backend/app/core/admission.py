@@ -0,0 +1,263 @@
+"""
+Admission control: per-user token buckets and per-upstream concurrency limits.
+
+- Rate limits: each route class ("search", "contacts", "upload", ...) has a
+  token bucket per caller, refilled at `rate` tokens per second up to `burst`.
+  Bucket state lives in a pluggable backend: in memory (per worker) or a local
+  SQLite file shared by every worker on the host.
+- Concurrency: each upstream admits at most `limit` calls at once from this
+  worker; up to `max_queue` more wait `queue_timeout` seconds for a slot and
+  anything beyond that is shed immediately.
+
+Rejections surface as 429 (rate limit) or 503 (upstream shed), both with
+Retry-After, so well-behaved clients back off instead of retrying in a loop.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, Optional, Protocol, Tuple
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+if TYPE_CHECKING:
+    import sqlite3
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Limit:
+    rate: float  # tokens per second
+    burst: float
+
+
+def parse_limits(spec: str) -> Dict[str, Limit]:
+    """Parse `class=rate:burst,...` (rate in requests per second)."""
+    limits: Dict[str, Limit] = {}
+    for item in spec.split(","):
+        if not item.strip():
+            continue
+        name, _, value = item.partition("=")
+        rate, _, burst = value.partition(":")
+        limits[name.strip()] = Limit(rate=float(rate), burst=float(burst or rate))
+    return limits
+
+
+class RateLimitBackend(Protocol):
+    """Token bucket storage keyed by `class:identity`."""
+
+    def take(self, key: str, limit: Limit, cost: float = 1.0) -> float:
+        """Take `cost` tokens; return 0 if allowed, else seconds until they are available."""
+        ...
+
+
+class InMemoryRateLimitBackend:
+    """Per-process buckets. Idle buckets expire once they would be full again."""
+
+    def __init__(self, max_keys: int) -> None:
+        # (tokens, updated_at); the TTL is the time until the bucket is full
+        self._buckets: TTLCache[Tuple[float, float]] = TTLCache(max_entries=max_keys, ttl_seconds=3600)
+        self._lock = threading.Lock()
+
+    def take(self, key: str, limit: Limit, cost: float = 1.0) -> float:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key) or (limit.burst, now)
+            tokens = min(limit.burst, tokens + (now - updated) * limit.rate)
+            if tokens < cost:
+                return (cost - tokens) / limit.rate
+            tokens -= cost
+            self._buckets.set(key, (tokens, now), ttl_seconds=(limit.burst - tokens) / limit.rate)
+            return 0.0
+
+
+class SqliteRateLimitBackend:
+    """Buckets in a local SQLite file, shared by all workers on the host.
+
+    Each take is one short `BEGIN IMMEDIATE` transaction. If the file is locked
+    for longer than `busy_timeout_ms` the request is let through: a briefly
+    unenforced limit is better than failing requests over the limiter itself.
+    """
+
+    def __init__(self, path: str, busy_timeout_ms: float = 50.0) -> None:
+        self.path = path
+        self.busy_timeout = busy_timeout_ms / 1000.0
+        self._local = threading.local()
+        self._takes = 0
+        conn = self._conn()
+        conn.execute("pragma journal_mode=wal")
+        conn.execute(
+            "create table if not exists rate_buckets ("
+            " key text primary key, tokens real not null, updated_at real not null, full_at real not null)"
+        )
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Imported here: only this opt-in backend needs sqlite3
+            import sqlite3
+
+            # One connection per thread; autocommit mode so transactions are explicit
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+    def take(self, key: str, limit: Limit, cost: float = 1.0) -> float:
+        import sqlite3
+
+        # Wall clock: monotonic time is not comparable across processes
+        now = time.time()
+        conn = self._conn()
+        try:
+            conn.execute("begin immediate")
+            try:
+                row = conn.execute("select tokens, updated_at from rate_buckets where key = ?", (key,)).fetchone()
+                tokens = limit.burst if row is None else min(limit.burst, row[0] + max(0.0, now - row[1]) * limit.rate)
+                if tokens < cost:
+                    conn.execute("rollback")
+                    return (cost - tokens) / limit.rate
+                tokens -= cost
+                conn.execute(
+                    "insert into rate_buckets (key, tokens, updated_at, full_at) values (?, ?, ?, ?)"
+                    " on conflict(key) do update set tokens = excluded.tokens,"
+                    " updated_at = excluded.updated_at, full_at = excluded.full_at",
+                    (key, tokens, now, now + (limit.burst - tokens) / limit.rate),
+                )
+                self._takes += 1
+                if self._takes % 1000 == 0:
+                    # A full bucket is the same as no row
+                    conn.execute("delete from rate_buckets where full_at < ?", (now,))
+                conn.execute("commit")
+            except BaseException:
+                if conn.in_transaction:
+                    conn.execute("rollback")
+                raise
+        except sqlite3.OperationalError as e:
+            logger.warning("rate limit backend unavailable, allowing request: %s", e)
+        return 0.0
+
+
+class RateLimiter:
+    """Checks callers against the configured limit of a route class."""
+
+    def __init__(self, backend: RateLimitBackend, limits: Dict[str, Limit]) -> None:
+        self.backend = backend
+        self.limits = limits
+
+    def check(self, route_class: str, identity: str, cost: float = 1.0) -> float:
+        """Return 0 if the call is admitted, else the seconds to wait (Retry-After)."""
+        limit = self.limits.get(route_class)
+        if limit is None or limit.rate <= 0:
+            return 0.0
+        return self.backend.take(f"{route_class}:{identity}", limit, cost)
+
+
+class ConcurrencyLimiter:
+    """Caps in-flight calls to one upstream, with a bounded wait queue.
+
+    Used from worker threads, so it is a plain threading primitive. `acquire()`
+    returns False when the call should be shed; with `wait=False` it never
+    blocks, for callers on the event loop thread.
+    """
+
+    def __init__(self, name: str, limit: int, max_queue: int, queue_timeout: float) -> None:
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._active = 0
+        self._waiting = 0
+        self._cond = threading.Condition()
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    @property
+    def waiting(self) -> int:
+        return self._waiting
+
+    def acquire(self, wait: bool = True) -> bool:
+        with self._cond:
+            # Queued callers go first; a newcomer only skips the queue when it is empty
+            if self._active < self.limit and not self._waiting:
+                self._active += 1
+                return True
+            if not wait or self._waiting >= self.max_queue:
+                return False
+            self._waiting += 1
+            try:
+                admitted = self._cond.wait_for(lambda: self._active < self.limit, timeout=self.queue_timeout)
+            finally:
+                self._waiting -= 1
+            if admitted:
+                self._active += 1
+            return admitted
+
+    def release(self) -> None:
+        with self._cond:
+            self._active -= 1
+            self._cond.notify()
+
+
+# Module-level singleton holders
+_rate_limiter: Optional[RateLimiter] = None
+_concurrency_limiters: Dict[str, ConcurrencyLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter() -> Optional[RateLimiter]:
+    """Return the process-wide RateLimiter, or None when rate limiting is disabled."""
+    global _rate_limiter
+    if not settings.RATE_LIMIT_ENABLED:
+        return None
+    with _limiters_lock:
+        if _rate_limiter is None:
+            backend: RateLimitBackend
+            if settings.RATE_LIMIT_BACKEND == "sqlite":
+                backend = SqliteRateLimitBackend(settings.RATE_LIMIT_SQLITE_PATH)
+            else:
+                backend = InMemoryRateLimitBackend(max_keys=settings.RATE_LIMIT_MAX_KEYS)
+            _rate_limiter = RateLimiter(backend, parse_limits(settings.RATE_LIMITS))
+        return _rate_limiter
+
+
+def set_rate_limit_backend(backend: RateLimitBackend) -> None:
+    """Swap the bucket storage (e.g. a shared store across hosts)."""
+    global _rate_limiter
+    _rate_limiter = RateLimiter(backend, parse_limits(settings.RATE_LIMITS))
+
+
+def get_concurrency_limiter(upstream: str) -> Optional[ConcurrencyLimiter]:
+    """Return the limiter for `upstream`, or None when UPSTREAM_MAX_CONCURRENCY is 0."""
+    if settings.UPSTREAM_MAX_CONCURRENCY <= 0:
+        return None
+    with _limiters_lock:
+        limiter = _concurrency_limiters.get(upstream)
+        if limiter is None:
+            limiter = _concurrency_limiters[upstream] = ConcurrencyLimiter(
+                upstream,
+                limit=settings.UPSTREAM_MAX_CONCURRENCY,
+                max_queue=settings.UPSTREAM_MAX_QUEUE,
+                queue_timeout=settings.UPSTREAM_QUEUE_TIMEOUT_SECONDS,
+            )
+        return limiter
+
+
+__all__ = [
+    "ConcurrencyLimiter",
+    "InMemoryRateLimitBackend",
+    "Limit",
+    "RateLimitBackend",
+    "RateLimiter",
+    "SqliteRateLimitBackend",
+    "get_concurrency_limiter",
+    "get_rate_limiter",
+    "parse_limits",
+    "set_rate_limit_backend",
+]
@@ -0,0 +1,340 @@
+"""
+Cache primitives shared by services.
+
+- TTLCache: bounded in-process LRU with expiry.
+- TieredCache: version-stamped entries in a per-worker TTLCache, in front of
+  an optional shared backend (SqliteCacheBackend: a local file every worker on
+  the host reads and writes), so one worker's miss fills the others' hits.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Callable, Dict, Generic, Hashable, Iterable, List, Optional, Protocol, Tuple, TypeVar
+
+from app.core.config import settings
+from app.core.metrics import CACHE_LOOKUPS
+
+if TYPE_CHECKING:
+    import sqlite3
+
+logger = logging.getLogger(__name__)
+
+V = TypeVar("V")
+
+_MISSING = object()
+
+
+class TTLCache(Generic[V]):
+    """Bounded LRU cache whose entries expire after `ttl_seconds`.
+
+    Thread-safe; services call it from the event loop and from worker threads.
+    Expired entries are dropped lazily on access; when the cache is full the
+    least recently used entry goes, so a set stays O(1) at any size.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float) -> None:
+        if max_entries <= 0:
+            raise ValueError("max_entries must be positive")
+        self._max_entries = max_entries
+        self._ttl = ttl_seconds
+        self._data: "OrderedDict[Hashable, Tuple[float, V]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Optional[V] = None) -> Optional[V]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                return default
+            expires_at, value = entry  # type: ignore[misc]
+            if expires_at <= now:
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: V, ttl_seconds: Optional[float] = None) -> None:
+        ttl = self._ttl if ttl_seconds is None else ttl_seconds
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            if len(self._data) > self._max_entries:
+                self._evict_locked()
+
+    def get_many(self, keys: Iterable[Hashable]) -> Dict[Hashable, V]:
+        out: Dict[Hashable, V] = {}
+        for key in keys:
+            value = self.get(key, _MISSING)  # type: ignore[arg-type]
+            if value is not _MISSING:
+                out[key] = value  # type: ignore[assignment]
+        return out
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def _evict_locked(self) -> None:
+        # No expiry scan here: expired entries that are never read again drift to
+        # the LRU end and are evicted first
+        while len(self._data) > self._max_entries:
+            self._data.popitem(last=False)
+
+
+# (version, encoded value)
+SharedEntry = Tuple[int, bytes]
+
+
+class SharedCacheBackend(Protocol):
+    """Cross-worker store behind a TieredCache. Failures must read as misses, never raise."""
+
+    def get_many(self, keys: List[str]) -> Dict[str, SharedEntry]:
+        ...
+
+    def set_many(self, entries: Dict[str, SharedEntry], ttl_seconds: float) -> None:
+        ...
+
+    def delete_many(self, keys: List[str]) -> None:
+        ...
+
+    def clear(self, prefix: str) -> None:
+        ...
+
+
+class SqliteCacheBackend:
+    """Entries in a local SQLite file, shared by all workers on the host.
+
+    A write only replaces an entry with an equal or newer version. If the file
+    is locked for longer than `busy_timeout_ms` the call is skipped: a read
+    becomes a miss and a write is dropped.
+    """
+
+    # Bound parameters per statement; SQLite's default limit is 999 on older builds
+    _CHUNK = 500
+
+    def __init__(self, path: str, busy_timeout_ms: float = 50.0) -> None:
+        self.path = path
+        self.busy_timeout = busy_timeout_ms / 1000.0
+        self._local = threading.local()
+        self._writes = 0
+        conn = self._conn()
+        conn.execute("pragma journal_mode=wal")
+        conn.execute(
+            "create table if not exists cache_entries ("
+            " key text primary key, version integer not null, value blob not null, expires_at real not null)"
+        )
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Imported here: only this opt-in backend needs sqlite3
+            import sqlite3
+
+            # One connection per thread; autocommit mode so transactions are explicit
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+    def get_many(self, keys: List[str]) -> Dict[str, SharedEntry]:
+        import sqlite3
+
+        out: Dict[str, SharedEntry] = {}
+        now = time.time()
+        try:
+            conn = self._conn()
+            for i in range(0, len(keys), self._CHUNK):
+                chunk = keys[i : i + self._CHUNK]
+                rows = conn.execute(
+                    f"select key, version, value from cache_entries where key in ({','.join('?' * len(chunk))})"
+                    " and expires_at > ?",
+                    (*chunk, now),
+                ).fetchall()
+                out.update((key, (version, value)) for key, version, value in rows)
+        except sqlite3.OperationalError as e:
+            logger.warning("shared cache unavailable, treating as miss: %s", e)
+        return out
+
+    def set_many(self, entries: Dict[str, SharedEntry], ttl_seconds: float) -> None:
+        import sqlite3
+
+        # Wall clock: monotonic time is not comparable across processes
+        expires_at = time.time() + ttl_seconds
+        try:
+            conn = self._conn()
+            conn.execute("begin immediate")
+            try:
+                conn.executemany(
+                    "insert into cache_entries (key, version, value, expires_at) values (?, ?, ?, ?)"
+                    " on conflict(key) do update set version = excluded.version, value = excluded.value,"
+                    " expires_at = excluded.expires_at where excluded.version >= cache_entries.version",
+                    [(key, version, value, expires_at) for key, (version, value) in entries.items()],
+                )
+                self._writes += 1
+                if self._writes % 1000 == 0:
+                    conn.execute("delete from cache_entries where expires_at < ?", (time.time(),))
+                conn.execute("commit")
+            except BaseException:
+                if conn.in_transaction:
+                    conn.execute("rollback")
+                raise
+        except sqlite3.OperationalError as e:
+            logger.warning("shared cache unavailable, write skipped: %s", e)
+
+    def delete_many(self, keys: List[str]) -> None:
+        import sqlite3
+
+        try:
+            conn = self._conn()
+            for i in range(0, len(keys), self._CHUNK):
+                chunk = keys[i : i + self._CHUNK]
+                conn.execute(f"delete from cache_entries where key in ({','.join('?' * len(chunk))})", chunk)
+        except sqlite3.OperationalError as e:
+            logger.warning("shared cache unavailable, delete skipped: %s", e)
+
+    def clear(self, prefix: str) -> None:
+        import sqlite3
+
+        try:
+            self._conn().execute("delete from cache_entries where substr(key, 1, ?) = ?", (len(prefix), prefix))
+        except sqlite3.OperationalError as e:
+            logger.warning("shared cache unavailable, clear skipped: %s", e)
+
+
+class TieredCache(Generic[V]):
+    """Version-stamped cache: a per-worker TTLCache in front of an optional shared backend.
+
+    Every entry carries a version (e.g. the row's `updated_at`), and a set never
+    replaces a newer version with an older one, so a slow read-through cannot
+    overwrite a write-through that finished first. Lookups try the local tier,
+    then fetch all local misses from the shared tier in one call and promote
+    the hits. Values cross the shared tier as bytes via `encode` / `decode`.
+
+    The local tier only learns about changes made elsewhere through `delete`
+    (e.g. from the invalidation bus) or expiry, so `local_ttl_seconds` bounds
+    how stale another worker's write can look here.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_entries: int,
+        local_ttl_seconds: float,
+        encode: Callable[[V], bytes],
+        decode: Callable[[bytes], V],
+        shared: Optional[SharedCacheBackend] = None,
+        shared_ttl_seconds: float = 600.0,
+    ) -> None:
+        self.name = name
+        self.encode = encode
+        self.decode = decode
+        self.shared = shared
+        self.shared_ttl_seconds = shared_ttl_seconds
+        self._local: TTLCache[Tuple[int, V]] = TTLCache(max_entries=max_entries, ttl_seconds=local_ttl_seconds)
+        self._prefix = f"{name}:"
+        # Serializes version check + set on the local tier
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[V]:
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, V]:
+        found: Dict[str, V] = {}
+        missing: List[str] = []
+        for key in keys:
+            entry = self._local.get(key)
+            if entry is None:
+                missing.append(key)
+            else:
+                found[key] = entry[1]
+        if found:
+            CACHE_LOOKUPS.inc(self.name, "local_hit", amount=len(found))
+        if missing and self.shared is not None:
+            shared = self.shared.get_many([self._prefix + key for key in missing])
+            promoted: Dict[str, Tuple[int, V]] = {}
+            for key in missing:
+                entry = shared.get(self._prefix + key)
+                if entry is None:
+                    continue
+                try:
+                    promoted[key] = (entry[0], self.decode(entry[1]))
+                except Exception:
+                    # Written by an older release with a different shape; refetch it
+                    continue
+                found[key] = promoted[key][1]
+            self._set_local(promoted)
+            if promoted:
+                CACHE_LOOKUPS.inc(self.name, "shared_hit", amount=len(promoted))
+            missing = [key for key in missing if key not in promoted]
+        if missing:
+            CACHE_LOOKUPS.inc(self.name, "miss", amount=len(missing))
+        return found
+
+    def set(self, key: str, version: int, value: V) -> None:
+        self.set_many({key: (version, value)})
+
+    def set_many(self, entries: Dict[str, Tuple[int, V]]) -> None:
+        """Store `{key: (version, value)}`; older versions than the cached ones are ignored."""
+        if not entries:
+            return
+        accepted = self._set_local(entries)
+        if self.shared is not None and accepted:
+            self.shared.set_many(
+                {self._prefix + key: (version, self.encode(value)) for key, (version, value) in accepted.items()},
+                self.shared_ttl_seconds,
+            )
+
+    def delete(self, key: Hashable) -> None:
+        self._local.delete(key)
+        if self.shared is not None:
+            self.shared.delete_many([f"{self._prefix}{key}"])
+
+    def clear(self) -> None:
+        self._local.clear()
+        if self.shared is not None:
+            self.shared.clear(self._prefix)
+
+    def _set_local(self, entries: Dict[str, Tuple[int, V]]) -> Dict[str, Tuple[int, V]]:
+        accepted: Dict[str, Tuple[int, V]] = {}
+        with self._lock:
+            for key, entry in entries.items():
+                current = self._local.get(key)
+                if current is not None and current[0] > entry[0]:
+                    continue
+                self._local.set(key, entry)
+                accepted[key] = entry
+        return accepted
+
+
+# Module-level singleton holder
+_shared_backend: Optional[SharedCacheBackend] = None
+_shared_backend_lock = threading.Lock()
+
+
+def get_shared_cache_backend() -> Optional[SharedCacheBackend]:
+    """Return the process-wide shared cache tier, or None when SHARED_CACHE_BACKEND is none."""
+    global _shared_backend
+    if settings.SHARED_CACHE_BACKEND != "sqlite":
+        return None
+    with _shared_backend_lock:
+        if _shared_backend is None:
+            _shared_backend = SqliteCacheBackend(settings.SHARED_CACHE_SQLITE_PATH)
+        return _shared_backend
+
+
+__all__ = [
+    "SharedCacheBackend",
+    "SqliteCacheBackend",
+    "TTLCache",
+    "TieredCache",
+    "get_shared_cache_backend",
+]
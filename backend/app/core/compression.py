@@ -0,0 +1,139 @@
+"""
+Response compression middleware with Accept-Encoding negotiation.
+
+Prefers brotli when the optional `brotli` package is installed and the client
+accepts it, otherwise gzip. Only complete (non-streaming) bodies above a size
+threshold are compressed; streamed responses such as SSE pass through untouched.
+
+Every JSON/text response (and every 304) carries `Vary: Accept-Encoding`, not
+just the compressed ones, so a shared cache never hands an identity body stored
+for one client to another that asked for gzip, or the reverse. A strong ETag on
+a body that is actually compressed becomes weak: the bytes differ from the
+identity body, while If-None-Match already uses weak comparison.
+"""
+
+from __future__ import annotations
+
+import gzip
+from typing import List, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None  # type: ignore[assignment]
+
+
+_COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "application/xml")
+
+
+def _parse_accept_encoding(value: str) -> List[Tuple[str, float]]:
+    out: List[Tuple[str, float]] = []
+    for part in value.split(","):
+        token, _, params = part.strip().partition(";")
+        if not token:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        out.append((token.strip().lower(), q))
+    return out
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick `br` or `gzip` from an Accept-Encoding header, or None for identity."""
+    accepted = {enc: q for enc, q in _parse_accept_encoding(accept_encoding)}
+    wildcard = accepted.get("*", 0.0)
+    candidates = ["br", "gzip"] if brotli is not None else ["gzip"]
+    best: Optional[str] = None
+    best_q = 0.0
+    for enc in candidates:
+        q = accepted.get(enc, wildcard)
+        if q > best_q:
+            best, best_q = enc, q
+    return best
+
+
+class CompressionMiddleware:
+    """Compress JSON/text responses of at least `minimum_size` bytes."""
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        responder = _CompressingResponder(send, encoding, self)
+        await self.app(scope, receive, responder)
+
+    def compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+
+
+def _weaken_etag(headers: MutableHeaders) -> None:
+    etag = headers.get("etag")
+    if etag and not etag.startswith("W/"):
+        headers["ETag"] = "W/" + etag
+
+
+class _CompressingResponder:
+    def __init__(self, send: Send, encoding: Optional[str], middleware: CompressionMiddleware) -> None:
+        self.send = send
+        self.encoding = encoding
+        self.middleware = middleware
+        self.start_message: Optional[Message] = None
+        self.passthrough = False
+
+    async def __call__(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            return
+        if message["type"] != "http.response.body" or self.passthrough or self.start_message is None:
+            await self.send(message)
+            return
+
+        start, self.start_message = self.start_message, None
+        body: bytes = message.get("body", b"")
+        headers = MutableHeaders(raw=start["headers"])
+        eligible = "content-encoding" not in headers and (
+            start["status"] == 304 or headers.get("content-type", "").startswith(_COMPRESSIBLE_TYPES)
+        )
+        if eligible:
+            # The representation depends on Accept-Encoding whether or not this
+            # particular body ends up compressed
+            headers.add_vary_header("Accept-Encoding")
+        if (
+            not eligible
+            or self.encoding is None
+            or start["status"] == 304
+            or message.get("more_body", False)
+            or len(body) < self.middleware.minimum_size
+        ):
+            # Identity requested, streaming, small, already encoded, or binary: send as-is
+            self.passthrough = True
+            await self.send(start)
+            await self.send(message)
+            return
+
+        compressed = self.middleware.compress(body, self.encoding)
+        headers["Content-Encoding"] = self.encoding
+        headers["Content-Length"] = str(len(compressed))
+        _weaken_etag(headers)
+        await self.send(start)
+        await self.send({"type": "http.response.body", "body": compressed})
+
+
+__all__ = ["CompressionMiddleware", "negotiate_encoding"]
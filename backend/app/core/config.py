@@ -20,16 +20,144 @@ class Settings:
     """Application settings"""
     
     # App settings
-    DEBUG: bool = True
+    # Enables /docs and auto-reload under `python -m app.main`; keep off in production
+    DEBUG: bool = os.getenv("DEBUG", "false").lower() in ("1", "true", "yes")
     SECRET_KEY: str = "your-secret-key-change-in-production"
     
     # Database settings
     SUPABASE_URL: str = os.getenv("SUPABASE_URL", "")
     SUPABASE_KEY: str = os.getenv("SUPABASE_KEY", "")
     SUPABASE_SERVICE_ROLE_KEY: str = os.getenv("SUPABASE_SERVICE_ROLE_KEY", "")
+    # Direct Postgres connection (session mode); used for LISTEN/NOTIFY and direct reads
+    DATABASE_URL: str = os.getenv("DATABASE_URL", "")
+    # HS256 secret the project signs access tokens with; lets direct reads verify them locally
+    SUPABASE_JWT_SECRET: str = os.getenv("SUPABASE_JWT_SECRET", "")
+    # Read replica API URLs (comma-separated) for @read_only service reads (app.core.replicas)
+    SUPABASE_READ_URLS: str = os.getenv("SUPABASE_READ_URLS", "")
+    # Reads stay on the primary this long after the same user writes (read-your-writes)
+    REPLICA_STICKY_SECONDS: float = float(os.getenv("REPLICA_STICKY_SECONDS", "10"))
+    REPLICA_STICKY_MAX_KEYS: int = int(os.getenv("REPLICA_STICKY_MAX_KEYS", "100000"))
     
     # CORS settings
     ALLOWED_ORIGINS: List[str] = ["*"]
+
+    # Response compression
+    COMPRESSION_ENABLED: bool = os.getenv("COMPRESSION_ENABLED", "true").lower() in ("1", "true", "yes")
+    COMPRESSION_MIN_SIZE: int = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+
+    # Challenge stats stream (SSE)
+    STATS_STREAM_TICK_SECONDS: float = float(os.getenv("STATS_STREAM_TICK_SECONDS", "1.0"))
+    STATS_STREAM_REFRESH_SECONDS: float = float(os.getenv("STATS_STREAM_REFRESH_SECONDS", "5.0"))
+    STATS_STREAM_HEARTBEAT_SECONDS: float = float(os.getenv("STATS_STREAM_HEARTBEAT_SECONDS", "15.0"))
+
+    # Home bundle: per-section time budget before a section is returned as missing
+    HOME_SECTION_BUDGET_SECONDS: float = float(os.getenv("HOME_SECTION_BUDGET_SECONDS", "2.0"))
+
+    # Metrics (/metrics, Prometheus text format)
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+    # Log requests that make more Supabase calls than this (N+1 smell)
+    METRICS_UPSTREAM_CALLS_WARN: int = int(os.getenv("METRICS_UPSTREAM_CALLS_WARN", "25"))
+    LOOP_LAG_SAMPLE_SECONDS: float = float(os.getenv("LOOP_LAG_SAMPLE_SECONDS", "0.5"))
+
+    # Upstream failure handling (app.core.resilience)
+    UPSTREAM_TIMEOUT_SECONDS: float = float(os.getenv("UPSTREAM_TIMEOUT_SECONDS", "5"))
+    AUTH_TIMEOUT_SECONDS: float = float(os.getenv("AUTH_TIMEOUT_SECONDS", "3"))
+    UPSTREAM_READ_RETRIES: int = int(os.getenv("UPSTREAM_READ_RETRIES", "2"))
+    UPSTREAM_READ_RPCS: str = os.getenv("UPSTREAM_READ_RPCS", "get_feed,changes_since")
+    BREAKER_FAILURE_THRESHOLD: int = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5"))
+    BREAKER_RESET_SECONDS: float = float(os.getenv("BREAKER_RESET_SECONDS", "10"))
+    # Hedged reads: 0 disables; otherwise fire a second attempt after this many ms
+    UPSTREAM_HEDGE_AFTER_MS: float = float(os.getenv("UPSTREAM_HEDGE_AFTER_MS", "0"))
+    UPSTREAM_HEDGED_TARGETS: str = os.getenv("UPSTREAM_HEDGED_TARGETS", "get_feed")
+    UPSTREAM_HEDGE_WORKERS: int = int(os.getenv("UPSTREAM_HEDGE_WORKERS", "8"))
+
+    # Admission control (app.core.admission)
+    RATE_LIMIT_ENABLED: bool = os.getenv("RATE_LIMIT_ENABLED", "true").lower() in ("1", "true", "yes")
+    # Per-user token buckets by route class: class=requests_per_second:burst
+    RATE_LIMITS: str = os.getenv("RATE_LIMITS", "search=2:20,contacts=0.05:5,upload=0.5:10")
+    # memory (per worker) or sqlite (shared by the workers on one host)
+    RATE_LIMIT_BACKEND: str = os.getenv("RATE_LIMIT_BACKEND", "memory")
+    RATE_LIMIT_SQLITE_PATH: str = os.getenv("RATE_LIMIT_SQLITE_PATH", "/tmp/bealive-ratelimit.sqlite3")
+    RATE_LIMIT_MAX_KEYS: int = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+    # Concurrent calls per upstream per worker (0 disables); beyond the queue calls get 503
+    UPSTREAM_MAX_CONCURRENCY: int = int(os.getenv("UPSTREAM_MAX_CONCURRENCY", "32"))
+    UPSTREAM_MAX_QUEUE: int = int(os.getenv("UPSTREAM_MAX_QUEUE", "64"))
+    UPSTREAM_QUEUE_TIMEOUT_SECONDS: float = float(os.getenv("UPSTREAM_QUEUE_TIMEOUT_SECONDS", "2"))
+
+    # Readiness (/ready): cached upstream probes plus local saturation thresholds
+    READY_PROBE_INTERVAL_SECONDS: float = float(os.getenv("READY_PROBE_INTERVAL_SECONDS", "5"))
+    READY_PROBE_TIMEOUT_SECONDS: float = float(os.getenv("READY_PROBE_TIMEOUT_SECONDS", "2"))
+    READY_PROBE_FAILURES: int = int(os.getenv("READY_PROBE_FAILURES", "2"))
+    READY_MAX_PROBE_AGE_SECONDS: float = float(os.getenv("READY_MAX_PROBE_AGE_SECONDS", "30"))
+    READY_MAX_LOOP_LAG_MS: float = float(os.getenv("READY_MAX_LOOP_LAG_MS", "250"))
+    READY_MAX_IN_FLIGHT: int = int(os.getenv("READY_MAX_IN_FLIGHT", "200"))
+    READY_MAX_POOL_QUEUE: int = int(os.getenv("READY_MAX_POOL_QUEUE", "32"))
+
+    # Slow-request profiler (collapsed stacks under PROFILER_DIR, served at /admin/profiles)
+    PROFILER_ENABLED: bool = os.getenv("PROFILER_ENABLED", "false").lower() in ("1", "true", "yes")
+    PROFILER_SLOW_MS: float = float(os.getenv("PROFILER_SLOW_MS", "500"))
+    # Also profile 1 in N requests from the start (0 disables)
+    PROFILER_SAMPLE_EVERY: int = int(os.getenv("PROFILER_SAMPLE_EVERY", "0"))
+    PROFILER_INTERVAL_MS: float = float(os.getenv("PROFILER_INTERVAL_MS", "5"))
+    PROFILER_DIR: str = os.getenv("PROFILER_DIR", "/tmp/bealive-profiles")
+    PROFILER_MAX_FILES: int = int(os.getenv("PROFILER_MAX_FILES", "200"))
+    # Samples kept per profile (2000 x 5 ms = 10 s); a longer request stops being sampled
+    PROFILER_MAX_SAMPLES: int = int(os.getenv("PROFILER_MAX_SAMPLES", "2000"))
+    # Concurrent captures per worker, and slow-request captures per minute (0: unlimited)
+    PROFILER_MAX_ACTIVE: int = int(os.getenv("PROFILER_MAX_ACTIVE", "2"))
+    PROFILER_SLOW_PER_MINUTE: float = float(os.getenv("PROFILER_SLOW_PER_MINUTE", "6"))
+
+    # Shared secret for /admin routes (X-Admin-Token); admin routes 404 when unset
+    ADMIN_TOKEN: str = os.getenv("ADMIN_TOKEN", "")
+
+    # Idempotent create requests (commitments, posts)
+    IDEMPOTENCY_TTL_SECONDS: int = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+    IDEMPOTENCY_MAX_ENTRIES: int = int(os.getenv("IDEMPOTENCY_MAX_ENTRIES", "10000"))
+
+    # Direct asyncpg reads for /feed, /challenges/{id}, /posts/{id} (app.core.db; needs DATABASE_URL)
+    DIRECT_READS_ENABLED: bool = os.getenv("DIRECT_READS_ENABLED", "false").lower() in ("1", "true", "yes")
+    DIRECT_READS_POOL_MIN: int = int(os.getenv("DIRECT_READS_POOL_MIN", "1"))
+    DIRECT_READS_POOL_MAX: int = int(os.getenv("DIRECT_READS_POOL_MAX", "10"))
+    DIRECT_READS_ACQUIRE_TIMEOUT_SECONDS: float = float(os.getenv("DIRECT_READS_ACQUIRE_TIMEOUT_SECONDS", "2"))
+    DIRECT_READS_STATEMENT_TIMEOUT_MS: int = int(os.getenv("DIRECT_READS_STATEMENT_TIMEOUT_MS", "3000"))
+
+    # Production server (gunicorn.conf.py); WEB_CONCURRENCY=0 runs one worker per available CPU
+    WEB_CONCURRENCY: int = int(os.getenv("WEB_CONCURRENCY", "0"))
+    SERVER_BIND: str = os.getenv("SERVER_BIND", "0.0.0.0:8000")
+    SERVER_BACKLOG: int = int(os.getenv("SERVER_BACKLOG", "2048"))
+    # Longer than the load balancer's idle timeout, so it never reuses a connection the worker just closed
+    SERVER_KEEPALIVE_SECONDS: int = int(os.getenv("SERVER_KEEPALIVE_SECONDS", "75"))
+    # Per-worker cap on open connections + tasks before new requests get 503 (0 = no cap)
+    SERVER_LIMIT_CONCURRENCY: int = int(os.getenv("SERVER_LIMIT_CONCURRENCY", "0"))
+    # Recycle a worker after this many requests, +/- jitter (0 = never)
+    SERVER_MAX_REQUESTS: int = int(os.getenv("SERVER_MAX_REQUESTS", "0"))
+    SERVER_MAX_REQUESTS_JITTER: int = int(os.getenv("SERVER_MAX_REQUESTS_JITTER", "0"))
+    # In-flight requests get this long to finish on reload/shutdown
+    SERVER_GRACEFUL_TIMEOUT_SECONDS: int = int(os.getenv("SERVER_GRACEFUL_TIMEOUT_SECONDS", "30"))
+    # A worker whose event loop does not check in for this long is killed and replaced
+    SERVER_WORKER_TIMEOUT_SECONDS: int = int(os.getenv("SERVER_WORKER_TIMEOUT_SECONDS", "60"))
+    SERVER_PRELOAD: bool = os.getenv("SERVER_PRELOAD", "true").lower() in ("1", "true", "yes")
+    FORWARDED_ALLOW_IPS: str = os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1")
+    # Startup warm-up (app.services.warmup): first-request work done before the worker takes traffic
+    WARMUP_ENABLED: bool = os.getenv("WARMUP_ENABLED", "true").lower() in ("1", "true", "yes")
+    # Past this the worker starts serving anyway and the remaining steps finish in the background
+    WARMUP_TIMEOUT_SECONDS: float = float(os.getenv("WARMUP_TIMEOUT_SECONDS", "10"))
+
+    # Cross-worker cache invalidation (LISTEN cache_invalidation; needs DATABASE_URL)
+    CACHE_INVALIDATION_ENABLED: bool = os.getenv("CACHE_INVALIDATION_ENABLED", "true").lower() in ("1", "true", "yes")
+    # Shared cache tier: none, or sqlite (a local file shared by the workers on one host)
+    SHARED_CACHE_BACKEND: str = os.getenv("SHARED_CACHE_BACKEND", "none")
+    SHARED_CACHE_SQLITE_PATH: str = os.getenv("SHARED_CACHE_SQLITE_PATH", "/tmp/bealive-cache.sqlite3")
+    # Profile cache (app.services.profile_cache); without DATABASE_URL other workers' edits show after the local TTL
+    PROFILE_CACHE_ENABLED: bool = os.getenv("PROFILE_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+    PROFILE_CACHE_MAX_ENTRIES: int = int(os.getenv("PROFILE_CACHE_MAX_ENTRIES", "50000"))
+    PROFILE_CACHE_TTL_SECONDS: float = float(os.getenv("PROFILE_CACHE_TTL_SECONDS", "60"))
+    PROFILE_CACHE_SHARED_TTL_SECONDS: float = float(os.getenv("PROFILE_CACHE_SHARED_TTL_SECONDS", "600"))
+    # Username index (app.services.username_index): loaded at startup, reloaded every REFRESH_SECONDS;
+    # needs the service role key, since RLS hides other users' profiles
+    USERNAME_INDEX_ENABLED: bool = os.getenv("USERNAME_INDEX_ENABLED", "true").lower() in ("1", "true", "yes")
+    USERNAME_INDEX_REFRESH_SECONDS: float = float(os.getenv("USERNAME_INDEX_REFRESH_SECONDS", "300"))
+    USERNAME_INDEX_PAGE_SIZE: int = int(os.getenv("USERNAME_INDEX_PAGE_SIZE", "1000"))
     
     # Auth via Supabase; no local JWT settings needed
 
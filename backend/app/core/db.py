@@ -1,5 +1,148 @@
 """
-Database helpers placeholder
+Pooled asyncpg connections for direct, RLS-scoped reads.
+
+PostgREST is skipped for the hottest reads (see app.services.direct_reads).
+Policies still apply because every borrowed connection runs inside a read-only
+transaction that plays the caller's part, as PostgREST does:
+
+    begin read only;
+    select set_config('role', 'authenticated', true),
+           set_config('request.jwt.claims', '<verified claims>', true), ...;
+
+Both statements go in one round trip; the settings are transaction-local and
+vanish on rollback, so a connection never leaks one user's identity to the
+next. asyncpg prepares and caches each query per connection, so repeated reads
+skip parsing and planning overhead.
+
+DATABASE_URL must be a session connection (direct or session pooler), whose
+login role can SET ROLE authenticated (true for `postgres` on Supabase).
+Connection failures, pool exhaustion and statement timeouts surface as
+`UpstreamUnavailable("postgres")`, i.e. 503 + Retry-After.
 """
 
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional, Tuple, Type
+
+from app.core.config import settings
+from app.core.resilience import UpstreamUnavailable
+
+logger = logging.getLogger(__name__)
+
+
+def _unavailable_errors() -> Tuple[Type[BaseException], ...]:
+    """Errors meaning "Postgres cannot serve this now" (mapped to 503), as opposed to query bugs."""
+    import asyncpg
+
+    return (
+        OSError,
+        asyncio.TimeoutError,
+        asyncpg.InterfaceError,
+        asyncpg.PostgresConnectionError,
+        asyncpg.CannotConnectNowError,
+        asyncpg.TooManyConnectionsError,
+        asyncpg.QueryCanceledError,
+    )
+
+
+def _literal(value: str) -> str:
+    """Quote a string as an SQL literal (standard_conforming_strings is on since 9.1)."""
+    if "\x00" in value:
+        raise ValueError("NUL in SQL literal")
+    return "'" + value.replace("'", "''") + "'"
+
+
+class DirectReadPool:
+    """An asyncpg pool whose connections are lent out under a user's RLS context."""
+
+    def __init__(
+        self,
+        dsn: str,
+        min_size: int,
+        max_size: int,
+        acquire_timeout: float,
+        statement_timeout_ms: int,
+    ) -> None:
+        self.dsn = dsn
+        self.min_size = min_size
+        self.max_size = max_size
+        self.acquire_timeout = acquire_timeout
+        self.statement_timeout_ms = statement_timeout_ms
+        self._pool: Any = None
+        self._lock = asyncio.Lock()
+
+    async def start(self) -> None:
+        """Open the pool (idempotent); called from the lifespan and lazily on first use."""
+        import asyncpg
+
+        async with self._lock:
+            if self._pool is None:
+                self._pool = await asyncpg.create_pool(
+                    self.dsn,
+                    min_size=self.min_size,
+                    max_size=self.max_size,
+                    server_settings={
+                        "application_name": "bealive-direct-reads",
+                        "statement_timeout": str(self.statement_timeout_ms),
+                    },
+                )
+
+    async def stop(self) -> None:
+        async with self._lock:
+            if self._pool is not None:
+                await self._pool.close()
+                self._pool = None
+
+    @asynccontextmanager
+    async def as_user(self, claims: Dict[str, Any]) -> AsyncIterator[Any]:
+        """Borrow a connection inside a read-only transaction scoped to `claims` (verified JWT claims)."""
+        unavailable = _unavailable_errors()
+        try:
+            if self._pool is None:
+                await self.start()
+            conn = await self._pool.acquire(timeout=self.acquire_timeout)
+        except unavailable as e:
+            logger.warning("direct read pool unavailable: %s", e)
+            raise UpstreamUnavailable("postgres", 1.0) from e
+        try:
+            # Simple-protocol script: BEGIN and the claims in one round trip
+            await conn.execute(
+                "begin read only; select set_config('role', 'authenticated', true), "
+                f"set_config('request.jwt.claims', {_literal(json.dumps(claims))}, true), "
+                f"set_config('request.jwt.claim.sub', {_literal(str(claims['sub']))}, true)"
+            )
+            try:
+                yield conn
+            finally:
+                if not conn.is_closed():
+                    await conn.execute("rollback")
+        except unavailable as e:
+            logger.warning("direct read failed: %s", e)
+            raise UpstreamUnavailable("postgres", 1.0) from e
+        finally:
+            await self._pool.release(conn)
+
+
+# Module-level singleton holder
+_pool: Optional[DirectReadPool] = None
+
+
+def get_direct_read_pool() -> Optional[DirectReadPool]:
+    """Return the process-wide pool, or None unless DIRECT_READS_ENABLED and DATABASE_URL are set."""
+    global _pool
+    if _pool is None and settings.DIRECT_READS_ENABLED and settings.DATABASE_URL:
+        _pool = DirectReadPool(
+            settings.DATABASE_URL,
+            min_size=settings.DIRECT_READS_POOL_MIN,
+            max_size=settings.DIRECT_READS_POOL_MAX,
+            acquire_timeout=settings.DIRECT_READS_ACQUIRE_TIMEOUT_SECONDS,
+            statement_timeout_ms=settings.DIRECT_READS_STATEMENT_TIMEOUT_MS,
+        )
+    return _pool
+
 
+__all__ = ["DirectReadPool", "get_direct_read_pool"]
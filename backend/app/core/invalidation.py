@@ -0,0 +1,204 @@
+"""
+Cross-worker cache invalidation.
+
+Row triggers (see `202510060500_cache_invalidation_notify.sql`) NOTIFY the
+`cache_invalidation` channel with compact JSON payloads:
+
+    {"t": "posts", "op": "U", "id": 42, "c": 7, "u": ["<author uuid>"]}
+
+Each worker runs one `PostgresInvalidationListener` that feeds payloads into
+the process-wide `InvalidationBus`; caches subscribe per table and evict the
+keys they derive from the payload. While the listener is disconnected
+notifications are lost, so every (re)connect dispatches a flush (`{"t": "*"}`).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import random
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "cache_invalidation"
+FLUSH = "*"
+
+Payload = Dict[str, Any]
+Handler = Callable[[Payload], None]
+
+
+class InvalidationBus:
+    """Routes invalidation payloads to the handlers subscribed for their table.
+
+    Handlers subscribed to `"*"` receive every payload. A flush payload
+    (`{"t": "*"}`) is delivered to every handler; handlers must treat it as
+    "drop everything".
+    """
+
+    def __init__(self) -> None:
+        self._handlers: Dict[str, List[Handler]] = {}
+
+    def subscribe(self, table: str, handler: Handler) -> None:
+        self._handlers.setdefault(table, []).append(handler)
+
+    def unsubscribe(self, table: str, handler: Handler) -> None:
+        handlers = self._handlers.get(table)
+        if handlers and handler in handlers:
+            handlers.remove(handler)
+
+    def dispatch(self, payload: Payload) -> None:
+        table = payload.get("t")
+        if table == FLUSH:
+            targets = [h for hs in self._handlers.values() for h in hs]
+        else:
+            targets = list(self._handlers.get(table, ())) + list(self._handlers.get(FLUSH, ()))
+        for handler in targets:
+            try:
+                handler(payload)
+            except Exception:
+                logger.exception("cache invalidation handler failed for %s", table)
+
+    def dispatch_raw(self, raw: str) -> None:
+        try:
+            payload = json.loads(raw)
+        except ValueError:
+            logger.warning("ignoring malformed invalidation payload: %r", raw[:200])
+            return
+        if isinstance(payload, dict):
+            self.dispatch(payload)
+
+    def flush(self) -> None:
+        self.dispatch({"t": FLUSH})
+
+    def evict_on(self, table: str, cache: Any, keys: Callable[[Payload], Iterable[Hashable]]) -> None:
+        """Evict `keys(payload)` from `cache` on changes to `table`; clear it on flush.
+
+        `cache` is anything with `delete(key)` and `clear()`, e.g. `TTLCache`.
+        """
+
+        def _handler(payload: Payload) -> None:
+            if payload.get("t") == FLUSH:
+                cache.clear()
+                return
+            for key in keys(payload):
+                if key is not None:
+                    cache.delete(key)
+
+        self.subscribe(table, _handler)
+
+
+def payload_user_ids(payload: Payload) -> List[str]:
+    return [u for u in payload.get("u") or () if u]
+
+
+class PostgresInvalidationListener:
+    """Holds a dedicated asyncpg connection LISTENing on `channel`.
+
+    Reconnects with jittered exponential backoff. asyncpg is imported lazily so
+    workers without `DATABASE_URL` never need it.
+    """
+
+    def __init__(
+        self,
+        dsn: str,
+        bus: InvalidationBus,
+        channel: str = CHANNEL,
+        keepalive_seconds: float = 30.0,
+        max_backoff_seconds: float = 30.0,
+    ) -> None:
+        self.dsn = dsn
+        self.bus = bus
+        self.channel = channel
+        self.keepalive_seconds = keepalive_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.connected = False
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def _on_notify(self, _conn: Any, _pid: int, _channel: str, raw: str) -> None:
+        self.bus.dispatch_raw(raw)
+
+    async def _run(self) -> None:
+        import asyncpg
+
+        backoff = 0.5
+        while True:
+            conn = None
+            try:
+                conn = await asyncpg.connect(self.dsn)
+                lost = asyncio.Event()
+                conn.add_termination_listener(lambda _c: lost.set())
+                await conn.add_listener(self.channel, self._on_notify)
+                self.connected = True
+                backoff = 0.5
+                logger.info("listening for cache invalidations on %s", self.channel)
+                # Anything cached before this point may have missed notifications
+                self.bus.flush()
+                while not lost.is_set():
+                    try:
+                        await asyncio.wait_for(lost.wait(), self.keepalive_seconds)
+                    except asyncio.TimeoutError:
+                        await conn.execute("select 1")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("cache invalidation listener disconnected: %s", e)
+            finally:
+                self.connected = False
+                if conn is not None and not conn.is_closed():
+                    try:
+                        await conn.close(timeout=5)
+                    except Exception:
+                        conn.terminate()
+            await asyncio.sleep(backoff * (0.5 + random.random()))
+            backoff = min(backoff * 2, self.max_backoff_seconds)
+
+
+# Module-level singleton holders
+_bus: Optional[InvalidationBus] = None
+_listener: Optional[PostgresInvalidationListener] = None
+
+
+def get_invalidation_bus() -> InvalidationBus:
+    """Return the process-wide InvalidationBus."""
+    global _bus
+    if _bus is None:
+        _bus = InvalidationBus()
+    return _bus
+
+
+def get_invalidation_listener() -> Optional[PostgresInvalidationListener]:
+    """Return the process-wide listener, or None when invalidation is disabled."""
+    global _listener
+    if _listener is None and settings.CACHE_INVALIDATION_ENABLED and settings.DATABASE_URL:
+        _listener = PostgresInvalidationListener(settings.DATABASE_URL, get_invalidation_bus())
+    return _listener
+
+
+__all__ = [
+    "CHANNEL",
+    "FLUSH",
+    "InvalidationBus",
+    "PostgresInvalidationListener",
+    "get_invalidation_bus",
+    "get_invalidation_listener",
+    "payload_user_ids",
+]
+
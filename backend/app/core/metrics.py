@@ -0,0 +1,349 @@
+"""
+In-process metrics with Prometheus text exposition.
+
+Deliberately small: counters, gauges and fixed-bucket histograms keyed by a
+label tuple, guarded by one lock each. Recording is a dict lookup plus a
+bisect, cheap enough for every request and every upstream call.
+
+Collected here:
+- `http_request_duration_seconds{method,route,status}`: route is the path template
+- `http_requests_in_flight`
+- `supabase_call_duration_seconds{target,operation,status}` and
+  `supabase_call_rows{target,operation}` (recorded by the instrumented client)
+- `supabase_calls_per_request{route}`: N+1 regressions show up as a fat tail
+- `event_loop_lag_seconds`: how late a periodic sleep wakes up
+- `rate_limited_total{class}` and `upstream_shed_total{upstream}` (app.core.admission)
+- `replica_reads_total{replica,outcome}` (app.core.replicas)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple, TypeVar
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+ROW_BUCKETS = (0, 1, 5, 10, 25, 50, 100, 250, 500, 1000)
+CALL_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55)
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf"
+    if value == int(value):
+        return str(int(value))
+    return repr(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _label_str(self, values: LabelValues, extra: str = "") -> str:
+        parts = [f'{k}="{_escape(v)}"' for k, v in zip(self.labels, values)]
+        if extra:
+            parts.append(extra)
+        return "{" + ",".join(parts) + "}" if parts else ""
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()) -> None:
+        super().__init__(name, help, labels)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            items = list(self._values.items())
+        lines.extend(f"{self.name}{self._label_str(k)} {_fmt(v)}" for k, v in items)
+        return lines
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()) -> None:
+        super().__init__(name, help, labels)
+        self._values: Dict[LabelValues, float] = {}
+
+    def set(self, value: float, *label_values: str) -> None:
+        with self._lock:
+            self._values[label_values] = value
+
+    def inc(self, *label_values: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def dec(self, *label_values: str, amount: float = 1.0) -> None:
+        self.inc(*label_values, amount=-amount)
+
+    def value(self, *label_values: str) -> float:
+        with self._lock:
+            return self._values.get(label_values, 0.0)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            items = list(self._values.items())
+        lines.extend(f"{self.name}{self._label_str(k)} {_fmt(v)}" for k, v in items)
+        return lines
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS) -> None:
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket (+Inf last)], sum
+        self._values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        idx = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(label_values)
+            if entry is None:
+                entry = self._values[label_values] = ([0] * (len(self.buckets) + 1), [0.0])
+            entry[0][idx] += 1
+            entry[1][0] += value
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            items = [(k, list(counts), total[0]) for k, (counts, total) in self._values.items()]
+        bounds = list(self.buckets) + [math.inf]
+        for key, counts, total in items:
+            running = 0
+            for bound, n in zip(bounds, counts):
+                running += n
+                le = 'le="' + _fmt(bound) + '"'
+                lines.append(f"{self.name}_bucket{self._label_str(key, le)} {running}")
+            lines.append(f"{self.name}_sum{self._label_str(key)} {_fmt(total)}")
+            lines.append(f"{self.name}_count{self._label_str(key)} {running}")
+        return lines
+
+
+M = TypeVar("M", bound=_Metric)
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: M) -> M:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for m in self._metrics:
+            lines.extend(m.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+HTTP_LATENCY = registry.register(
+    Histogram("http_request_duration_seconds", "HTTP request latency by route template", ("method", "route", "status"))
+)
+HTTP_IN_FLIGHT = registry.register(
+    Gauge("http_requests_in_flight", "HTTP requests currently being served")
+)
+HTTP_STREAMS_OPEN = registry.register(
+    Gauge("http_streams_open", "Streaming (text/event-stream) responses currently open, also counted in flight")
+)
+UPSTREAM_LATENCY = registry.register(
+    Histogram("supabase_call_duration_seconds", "Supabase PostgREST call latency", ("target", "operation", "status"))
+)
+UPSTREAM_ROWS = registry.register(
+    Histogram("supabase_call_rows", "Rows returned per Supabase call", ("target", "operation"), buckets=ROW_BUCKETS)
+)
+UPSTREAM_CALLS_PER_REQUEST = registry.register(
+    Histogram("supabase_calls_per_request", "Supabase calls made while serving one request", ("route",), buckets=CALL_BUCKETS)
+)
+LOOP_LAG = registry.register(
+    Histogram("event_loop_lag_seconds", "Delay between a scheduled wake-up and the loop running it", buckets=LAG_BUCKETS)
+)
+LOOP_LAG_LAST = registry.register(
+    Gauge("event_loop_lag_last_seconds", "Most recent event loop lag sample")
+)
+RATE_LIMITED = registry.register(
+    Counter("rate_limited_total", "Requests rejected with 429 by per-user rate limits", ("class",))
+)
+UPSTREAM_SHED = registry.register(
+    Counter("upstream_shed_total", "Upstream calls shed because the concurrency queue was full", ("upstream",))
+)
+REPLICA_READS = registry.register(
+    Counter("replica_reads_total", "Reads sent to a read replica, by outcome (ok, fallback to primary)", ("replica", "outcome"))
+)
+CACHE_LOOKUPS = registry.register(
+    Counter("cache_lookups_total", "Tiered cache key lookups by result (local_hit, shared_hit, miss)", ("cache", "result"))
+)
+USERNAME_INDEX_ENTRIES = registry.register(
+    Gauge("username_index_entries", "Usernames held in this worker's username index")
+)
+
+
+# ---- per-request upstream accounting ----
+@dataclass
+class RequestStats:
+    upstream_calls: int = 0
+    upstream_seconds: float = 0.0
+
+
+# A mutable holder so increments made in worker threads (to_thread copies the context) are visible
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def current_request_stats() -> Optional[RequestStats]:
+    return _request_stats.get()
+
+
+def record_upstream_call(target: str, operation: str, status: str, seconds: float, rows: Optional[int]) -> None:
+    UPSTREAM_LATENCY.observe(seconds, target, operation, status)
+    if rows is not None:
+        UPSTREAM_ROWS.observe(rows, target, operation)
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.upstream_calls += 1
+        stats.upstream_seconds += seconds
+
+
+class MetricsMiddleware:
+    """Times each HTTP request and counts the upstream calls it made."""
+
+    def __init__(self, app: ASGIApp, upstream_calls_warn: int = 25) -> None:
+        self.app = app
+        self.upstream_calls_warn = upstream_calls_warn
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        status_code = 500
+        streaming = False
+        started = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, streaming
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                content_type = dict(message.get("headers") or ()).get(b"content-type", b"")
+                if content_type.startswith(b"text/event-stream"):
+                    streaming = True
+                    HTTP_STREAMS_OPEN.inc()
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            if streaming:
+                HTTP_STREAMS_OPEN.dec()
+            _request_stats.reset(token)
+            elapsed = time.perf_counter() - started
+            # The router stores the matched route in scope; unmatched paths share one label
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            HTTP_LATENCY.observe(elapsed, scope["method"], route, str(status_code))
+            UPSTREAM_CALLS_PER_REQUEST.observe(stats.upstream_calls, route)
+            if stats.upstream_calls > self.upstream_calls_warn:
+                logger.warning(
+                    "%s %s made %d upstream calls (%.1f ms upstream)",
+                    scope["method"], route, stats.upstream_calls, stats.upstream_seconds * 1000,
+                )
+
+
+# ---- event loop lag ----
+class LoopLagSampler:
+    """Sleeps `interval` seconds in a loop and records how late each wake-up is."""
+
+    def __init__(self, interval: float = 0.5) -> None:
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - expected)
+            LOOP_LAG.observe(lag)
+            LOOP_LAG_LAST.set(lag)
+
+
+# Module-level singleton holder
+_lag_sampler: Optional[LoopLagSampler] = None
+
+
+def get_loop_lag_sampler() -> LoopLagSampler:
+    """Return the process-wide LoopLagSampler."""
+    global _lag_sampler
+    if _lag_sampler is None:
+        _lag_sampler = LoopLagSampler(settings.LOOP_LAG_SAMPLE_SECONDS)
+    return _lag_sampler
+
+
+__all__ = [
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "LoopLagSampler",
+    "MetricsMiddleware",
+    "MetricsRegistry",
+    "RequestStats",
+    "current_request_stats",
+    "get_loop_lag_sampler",
+    "record_upstream_call",
+    "registry",
+]
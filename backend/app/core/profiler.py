@@ -0,0 +1,256 @@
+"""
+Opt-in sampling profiler for slow requests.
+
+A request is profiled when it is picked 1-in-N (`sample_every`), from its
+first byte, or when it is still running after `slow_ms`, from that point on.
+Fast requests therefore cost one timer handle and nothing else. While at least
+one capture is active, a daemon thread snapshots every thread's stack with
+`sys._current_frames()` every `interval_ms`; samples are process-wide, so
+concurrent requests appear in each other's profiles. A capture stops sampling
+after `max_samples`, and streaming responses (`text/event-stream`) are never
+profiled: they are meant to stay open.
+
+In a brownout every request passes `slow_ms`, so the cost is bounded there too:
+at most `max_active` captures run at once per worker, and slow captures are
+limited to `slow_per_minute` (a token bucket). A request over either budget is
+not profiled.
+
+Profiles are written in collapsed-stack format (`frame;frame;frame count`),
+which speedscope, flamegraph.pl and inferno read directly. The event loop
+thread is rooted at `loop`, worker threads (to_thread / threadpool) at `worker`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+MAX_STACK_DEPTH = 64
+_SAFE_NAME = re.compile(r"[^A-Za-z0-9_.-]+")
+
+
+class _Capture:
+    __slots__ = ("stacks", "samples", "max_samples")
+
+    def __init__(self, max_samples: int = 0) -> None:
+        self.stacks: Counter[str] = Counter()
+        self.samples = 0
+        self.max_samples = max_samples  # 0: no cap
+
+    @property
+    def full(self) -> bool:
+        return 0 < self.max_samples <= self.samples
+
+
+class StackSampler:
+    """Background thread that samples all thread stacks while captures are active."""
+
+    def __init__(self, interval_ms: float = 5.0, max_active: int = 0) -> None:
+        self.interval = interval_ms / 1000.0
+        self.max_active = max_active  # 0: no cap
+        self._captures: Dict[int, _Capture] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._next_id = 0
+        self.loop_thread_id: Optional[int] = None
+
+    def begin(self, max_samples: int = 0) -> Optional[int]:
+        """Register a capture and return its id, or None when `max_active` are running."""
+        with self._lock:
+            if 0 < self.max_active <= len(self._captures):
+                return None
+            self._next_id += 1
+            cid = self._next_id
+            self._captures[cid] = _Capture(max_samples)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+                self._thread.start()
+        self._wake.set()
+        return cid
+
+    def end(self, cid: int) -> _Capture:
+        with self._lock:
+            return self._captures.pop(cid, None) or _Capture()
+
+    def _run(self) -> None:
+        me = threading.get_ident()
+        while True:
+            with self._lock:
+                # Full captures stay registered until end(), but are no longer sampled
+                active = [cap for cap in self._captures.values() if not cap.full]
+                if not active:
+                    # Cleared under the lock so a concurrent begin() cannot be missed
+                    self._wake.clear()
+            if not active:
+                # Idle until the next capture begins
+                self._wake.wait()
+                continue
+            stacks = [self._collapse(tid, frame) for tid, frame in sys._current_frames().items() if tid != me]
+            with self._lock:
+                for cap in active:
+                    cap.samples += 1
+                    cap.stacks.update(stacks)
+            time.sleep(self.interval)
+
+    def _collapse(self, thread_id: int, frame) -> str:
+        names: List[str] = []
+        while frame is not None and len(names) < MAX_STACK_DEPTH:
+            names.append(f"{frame.f_globals.get('__name__', '?')}:{frame.f_code.co_name}")
+            frame = frame.f_back
+        names.append("loop" if thread_id == self.loop_thread_id else "worker")
+        names.reverse()
+        return ";".join(names)
+
+
+class ProfilerMiddleware:
+    """Profiles 1-in-`sample_every` requests and any request running past `slow_ms`."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        output_dir: str,
+        slow_ms: float = 500.0,
+        sample_every: int = 0,
+        interval_ms: float = 5.0,
+        max_files: int = 200,
+        max_samples: int = 2000,
+        max_active: int = 2,
+        slow_per_minute: float = 6.0,
+    ) -> None:
+        self.app = app
+        self.output_dir = output_dir
+        self.slow_seconds = slow_ms / 1000.0
+        self.sample_every = sample_every
+        self.max_files = max_files
+        self.max_samples = max_samples
+        self.slow_per_minute = slow_per_minute  # 0: no limit
+        self.sampler = StackSampler(interval_ms, max_active=max_active)
+        # Token bucket for slow captures; only used on the event loop thread
+        self._slow_tokens = slow_per_minute
+        self._slow_refilled = time.monotonic()
+
+    def _take_slow_token(self) -> bool:
+        if self.slow_per_minute <= 0:
+            return True
+        now = time.monotonic()
+        refill = (now - self._slow_refilled) * self.slow_per_minute / 60.0
+        self._slow_tokens = min(self.slow_per_minute, self._slow_tokens + refill)
+        self._slow_refilled = now
+        if self._slow_tokens < 1.0:
+            return False
+        self._slow_tokens -= 1.0
+        return True
+
+    def _start(self, capture: List[int], slow: bool) -> None:
+        """Begin a capture into `capture` unless a budget is used up (then the request is not profiled)."""
+        if slow and not self._take_slow_token():
+            return
+        cid = self.sampler.begin(self.max_samples)
+        if cid is not None:
+            capture.append(cid)
+        elif slow:
+            # Refused for max_active; the rate budget was not spent
+            self._slow_tokens += 1.0
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        loop = asyncio.get_running_loop()
+        if self.sampler.loop_thread_id is None:
+            self.sampler.loop_thread_id = threading.get_ident()
+        started = time.perf_counter()
+        capture: List[int] = []
+        if self.sample_every > 0 and random.randrange(self.sample_every) == 0:
+            self._start(capture, slow=False)
+        sampled = bool(capture)
+        timer = None
+        if not sampled and self.slow_seconds > 0:
+            timer = loop.call_later(self.slow_seconds, self._start, capture, True)
+
+        status_code = 500
+        streaming = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, streaming, timer
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                content_type = dict(message.get("headers") or ()).get(b"content-type", b"")
+                if content_type.startswith(b"text/event-stream"):
+                    # A stream's lifetime is not latency: drop it before it becomes a capture
+                    streaming = True
+                    if timer is not None:
+                        timer.cancel()
+                        timer = None
+                    if capture:
+                        self.sampler.end(capture.pop())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if timer is not None:
+                timer.cancel()
+            if capture and not streaming:
+                result = self.sampler.end(capture[0])
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                if result.samples:
+                    route = getattr(scope.get("route"), "path", None) or scope["path"]
+                    reason = "sampled" if sampled else "slow"
+                    await asyncio.to_thread(self._write, scope["method"], route, status_code, elapsed_ms, reason, result)
+
+    def _write(self, method: str, route: str, status_code: int, elapsed_ms: float, reason: str, result: _Capture) -> None:
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            stamp = time.strftime("%Y%m%dT%H%M%S", time.gmtime())
+            slug = _SAFE_NAME.sub("_", route).strip("_") or "root"
+            name = f"{stamp}_{int(time.time_ns() % 1_000_000):06d}_{reason}_{method}_{slug}_{status_code}_{int(elapsed_ms)}ms.collapsed"
+            path = os.path.join(self.output_dir, name)
+            with open(path, "w", encoding="utf-8") as f:
+                for stack, count in result.stacks.most_common():
+                    f.write(f"{stack} {count}\n")
+            self._prune()
+        except OSError:
+            logger.exception("failed to write profile")
+
+    def _prune(self) -> None:
+        files = list_profiles(self.output_dir)
+        for name in files[self.max_files:]:
+            try:
+                os.remove(os.path.join(self.output_dir, name))
+            except OSError:
+                pass
+
+
+def list_profiles(output_dir: str) -> List[str]:
+    """Profile file names in `output_dir`, newest first."""
+    try:
+        names = [n for n in os.listdir(output_dir) if n.endswith(".collapsed")]
+    except FileNotFoundError:
+        return []
+    return sorted(names, reverse=True)
+
+
+def profile_path(output_dir: str, name: str) -> Optional[str]:
+    """Resolve a profile name from `list_profiles`; None for anything else (no path traversal)."""
+    if os.path.basename(name) != name or not name.endswith(".collapsed"):
+        return None
+    path = os.path.join(output_dir, name)
+    return path if os.path.isfile(path) else None
+
+
+__all__ = ["ProfilerMiddleware", "StackSampler", "list_profiles", "profile_path"]
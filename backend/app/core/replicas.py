@@ -0,0 +1,168 @@
+"""
+Read-replica routing for PostgREST reads.
+
+Only reads made inside a method marked `@read_only` may go to a replica;
+everything else, including reads inside write flows (ownership checks,
+read-backs), stays on the primary. A marked read goes to the primary instead
+when:
+
+- the caller wrote within the last `REPLICA_STICKY_SECONDS` (read-your-writes),
+- or every replica's circuit is open.
+
+A replica call that fails is retried once on the primary. Each replica has its
+own policy (`postgrest-replica-<n>`), so a failing replica opens its own breaker
+and is skipped until its half-open trial succeeds.
+
+Callers are identified by the bearer token's unverified `sub`, captured per
+request by ReadRoutingMiddleware. A forged `sub` can only change where that
+request's reads are served from. Recent writers are kept per worker and, with
+SHARED_CACHE_BACKEND set, in the host-shared store too, so a write on one
+worker pins the caller's reads on every worker of the host. Without it, a read
+that lands on another worker may see the replica's lag.
+"""
+
+from __future__ import annotations
+
+import functools
+import inspect
+import itertools
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, List, Optional, TypeVar
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.cache import SharedCacheBackend, TTLCache, get_shared_cache_backend
+from app.core.config import settings
+from app.core.resilience import get_upstream_policy
+from app.utils.auth import unverified_subject
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+_read_only: ContextVar[bool] = ContextVar("replica_read_only", default=False)
+_caller: ContextVar[Optional[str]] = ContextVar("replica_caller", default=None)
+
+
+def read_only(fn: F) -> F:
+    """Mark a service method whose PostgREST reads may be served by a replica."""
+    if inspect.iscoroutinefunction(fn):
+
+        @functools.wraps(fn)
+        async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+            token = _read_only.set(True)
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                _read_only.reset(token)
+
+        return async_wrapper  # type: ignore[return-value]
+
+    @functools.wraps(fn)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        token = _read_only.set(True)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _read_only.reset(token)
+
+    return wrapper  # type: ignore[return-value]
+
+
+class ReadRoutingMiddleware:
+    """Records the caller's (unverified) `sub` for the request, for read-your-writes stickiness."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        caller: Optional[str] = None
+        for name, value in scope.get("headers", ()):
+            if name == b"authorization":
+                auth = value.decode("latin-1")
+                if auth.lower().startswith("bearer "):
+                    caller = unverified_subject(auth.split(" ", 1)[1].strip())
+                break
+        token = _caller.set(caller)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _caller.reset(token)
+
+
+class ReplicaRouter:
+    """Picks a healthy replica for eligible reads and remembers recent writers."""
+
+    def __init__(
+        self,
+        urls: List[str],
+        sticky_seconds: float,
+        max_sticky_keys: int,
+        shared: Optional[SharedCacheBackend] = None,
+    ) -> None:
+        self.urls = urls
+        self.names = [f"postgrest-replica-{i}" for i in range(len(urls))]
+        self.sticky_seconds = sticky_seconds
+        self._recent_writers: TTLCache[bool] = TTLCache(max_entries=max_sticky_keys, ttl_seconds=sticky_seconds)
+        self._shared = shared
+        self._next = itertools.count()
+        self._lock = threading.Lock()
+
+    def note_write(self) -> None:
+        """Pin the current caller's reads to the primary for `sticky_seconds`."""
+        caller = _caller.get()
+        if caller is not None and self.sticky_seconds > 0:
+            self._recent_writers.set(caller, True)
+            if self._shared is not None:
+                # Newer writes extend the pin; the shared store keeps the highest version
+                self._shared.set_many({f"writers:{caller}": (time.time_ns(), b"")}, self.sticky_seconds)
+
+    def _recent_writer(self, caller: str) -> bool:
+        if self._recent_writers.get(caller):
+            return True
+        return self._shared is not None and bool(self._shared.get_many([f"writers:{caller}"]))
+
+    def pick(self) -> Optional[int]:
+        """Index of the replica for a read in the current context, or None for the primary."""
+        if not _read_only.get():
+            return None
+        caller = _caller.get()
+        if caller is not None and self._recent_writer(caller):
+            return None
+        with self._lock:
+            start = next(self._next)
+        for offset in range(len(self.names)):
+            i = (start + offset) % len(self.names)
+            if get_upstream_policy(self.names[i]).breaker.state != "open":
+                return i
+        return None
+
+
+# Module-level singleton holder
+_router: Optional[ReplicaRouter] = None
+
+
+def get_replica_router() -> Optional[ReplicaRouter]:
+    """Return the process-wide router, or None when SUPABASE_READ_URLS is empty."""
+    global _router
+    if _router is None:
+        urls = [u.strip().rstrip("/") for u in settings.SUPABASE_READ_URLS.split(",") if u.strip()]
+        if urls:
+            _router = ReplicaRouter(
+                urls,
+                settings.REPLICA_STICKY_SECONDS,
+                settings.REPLICA_STICKY_MAX_KEYS,
+                shared=get_shared_cache_backend(),
+            )
+    return _router
+
+
+__all__ = [
+    "ReadRoutingMiddleware",
+    "ReplicaRouter",
+    "get_replica_router",
+    "read_only",
+]
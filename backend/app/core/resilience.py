@@ -0,0 +1,263 @@
+"""
+Failure handling for upstream (Supabase) calls.
+
+- Deadlines: the PostgREST client timeout and the Auth request timeout come from
+  settings instead of library defaults (120 s / 10 s).
+- Retries: idempotent reads are retried on transient failures with full-jitter
+  backoff, within the call's deadline.
+- Circuit breaker: per upstream. After `failure_threshold` consecutive transient
+  failures the breaker opens and calls fail fast with `UpstreamUnavailable`
+  (served as 503 + Retry-After) until `reset_seconds` pass; then one trial
+  call decides whether it closes again.
+- Hedging: selected reads fire a second attempt if the first has not answered
+  within `hedge_after` seconds and take whichever finishes first.
+- Concurrency: each attempt holds a slot of the upstream's ConcurrencyLimiter
+  (app.core.admission); when its queue is full the call is shed with
+  `UpstreamUnavailable` without touching the breaker.
+
+Only transient failures (transport errors, timeouts, PostgREST connection
+errors, 5xx) trip the breaker or trigger retries; 4xx and RLS errors are
+the caller's problem and pass through untouched.
+
+Backoff sleeps, hedge waits and queueing for a slot block the calling thread,
+so routes run policy-wrapped calls in the threadpool. A call made on the event
+loop thread anyway gets a single attempt without hedging and is shed instead
+of queued, so the policy itself never stalls the loop.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import logging
+import random
+import threading
+import time
+import urllib.error
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Optional, TypeVar
+
+import httpx
+from postgrest.exceptions import APIError
+
+from app.core.admission import ConcurrencyLimiter, get_concurrency_limiter
+from app.core.config import settings
+from app.core.metrics import UPSTREAM_SHED
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# PostgREST codes for "could not reach / get a connection to the database"
+_TRANSIENT_PGRST = ("PGRST000", "PGRST001", "PGRST002", "PGRST003")
+
+
+class UpstreamUnavailable(Exception):
+    """An upstream is failing or its circuit is open; callers should back off."""
+
+    def __init__(self, upstream: str, retry_after: float, reason: str = "temporarily unavailable") -> None:
+        super().__init__(f"{upstream} {reason}")
+        self.upstream = upstream
+        self.retry_after = retry_after
+
+
+def is_transient(exc: BaseException) -> bool:
+    if isinstance(exc, (httpx.TransportError, TimeoutError)):
+        return True
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code >= 500
+    # urllib (auth): HTTPError is a URLError subclass carrying a status
+    if isinstance(exc, urllib.error.HTTPError):
+        return exc.code >= 500
+    if isinstance(exc, urllib.error.URLError):
+        return True
+    if isinstance(exc, APIError):
+        code = str(exc.code or "")
+        # No code means PostgREST did not produce the body (gateway error page, 5xx)
+        return not code or code.startswith(_TRANSIENT_PGRST)
+    return False
+
+
+def _on_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker with a single half-open trial call."""
+
+    def __init__(self, name: str, failure_threshold: int, reset_seconds: float) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at >= self.reset_seconds:
+                return "half_open"
+            return "open"
+
+    def before_call(self) -> None:
+        """Raise UpstreamUnavailable unless a call may proceed."""
+        with self._lock:
+            if self._opened_at is None:
+                return
+            remaining = self.reset_seconds - (time.monotonic() - self._opened_at)
+            if remaining > 0 or self._trial_in_flight:
+                raise UpstreamUnavailable(self.name, max(remaining, 1.0))
+            self._trial_in_flight = True
+
+    def on_success(self) -> None:
+        with self._lock:
+            if self._opened_at is not None:
+                logger.info("circuit %s closed", self.name)
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def on_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            was_trial = self._trial_in_flight
+            self._trial_in_flight = False
+            if was_trial or self._failures >= self.failure_threshold:
+                if self._opened_at is None:
+                    logger.warning("circuit %s opened after %d failures", self.name, self._failures)
+                self._opened_at = time.monotonic()
+
+    def on_neutral(self) -> None:
+        """A non-transient error: the upstream answered, so it is reachable."""
+        self.on_success()
+
+
+class UpstreamPolicy:
+    """Applies breaker, retries and optional hedging to one upstream's calls."""
+
+    def __init__(
+        self,
+        breaker: CircuitBreaker,
+        max_attempts: int,
+        backoff_base: float,
+        backoff_cap: float,
+        deadline: float,
+        hedge_after: float = 0.0,
+        hedge_pool: Optional[ThreadPoolExecutor] = None,
+        limiter: Optional[ConcurrencyLimiter] = None,
+    ) -> None:
+        self.breaker = breaker
+        self.max_attempts = max(1, max_attempts)
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.deadline = deadline
+        self.hedge_after = hedge_after
+        self._hedge_pool = hedge_pool
+        self.limiter = limiter
+
+    def call(self, fn: Callable[[], T], *, idempotent: bool, hedge: bool = False) -> T:
+        blocking_ok = not _on_event_loop()
+        attempts = self.max_attempts if idempotent and blocking_ok else 1
+        give_up_at = time.monotonic() + self.deadline
+        for attempt in range(1, attempts + 1):
+            # The slot is held per attempt, so backoff sleeps do not occupy it. It is
+            # taken before the breaker check: a half-open trial, once granted, must
+            # reach on_success/on_failure, and shedding it would leave the breaker open
+            if self.limiter is not None and not self.limiter.acquire(wait=blocking_ok):
+                UPSTREAM_SHED.inc(self.breaker.name)
+                raise UpstreamUnavailable(self.breaker.name, max(1.0, self.limiter.queue_timeout), "overloaded")
+            try:
+                self.breaker.before_call()
+            except UpstreamUnavailable:
+                if self.limiter is not None:
+                    self.limiter.release()
+                raise
+            hedged = hedge and idempotent and blocking_ok and self.hedge_after > 0 and self._hedge_pool is not None
+            try:
+                result = self._admitted(fn, hedged)
+            except Exception as e:
+                if not is_transient(e):
+                    self.breaker.on_neutral()
+                    raise
+                self.breaker.on_failure()
+                # Full jitter, but never sleep past the call's overall deadline
+                delay = random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** (attempt - 1)))
+                if attempt == attempts or time.monotonic() + delay >= give_up_at:
+                    raise UpstreamUnavailable(self.breaker.name, self.breaker.reset_seconds) from e
+                time.sleep(delay)
+                continue
+            self.breaker.on_success()
+            return result
+        raise AssertionError("unreachable")
+
+    def _admitted(self, fn: Callable[[], T], hedged: bool) -> T:
+        try:
+            return self._hedged(fn) if hedged else fn()
+        finally:
+            if self.limiter is not None:
+                self.limiter.release()
+
+    def _hedged(self, fn: Callable[[], T]) -> T:
+        assert self._hedge_pool is not None
+        # Each attempt runs in a copy of the caller's context (request metrics, etc.)
+        first = self._hedge_pool.submit(contextvars.copy_context().run, fn)
+        done, _ = wait([first], timeout=self.hedge_after)
+        if done:
+            return first.result()
+        second = self._hedge_pool.submit(contextvars.copy_context().run, fn)
+        pending = {first, second}
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for f in done:
+                if f.exception() is None:
+                    # The loser keeps running to completion in the pool; its result is dropped
+                    return f.result()
+                error = f.exception()
+        assert error is not None
+        raise error
+
+
+# Module-level singleton holders
+_policies: Dict[str, UpstreamPolicy] = {}
+_policies_lock = threading.Lock()
+_hedge_pool: Optional[ThreadPoolExecutor] = None
+
+
+def get_upstream_policy(upstream: str) -> UpstreamPolicy:
+    """Return the process-wide policy for `upstream` ("postgrest" or "auth")."""
+    global _hedge_pool
+    with _policies_lock:
+        policy = _policies.get(upstream)
+        if policy is None:
+            if _hedge_pool is None and settings.UPSTREAM_HEDGE_AFTER_MS > 0:
+                _hedge_pool = ThreadPoolExecutor(max_workers=settings.UPSTREAM_HEDGE_WORKERS, thread_name_prefix="hedge")
+            deadline = settings.AUTH_TIMEOUT_SECONDS if upstream == "auth" else settings.UPSTREAM_TIMEOUT_SECONDS
+            policy = _policies[upstream] = UpstreamPolicy(
+                breaker=CircuitBreaker(upstream, settings.BREAKER_FAILURE_THRESHOLD, settings.BREAKER_RESET_SECONDS),
+                max_attempts=settings.UPSTREAM_READ_RETRIES + 1,
+                backoff_base=0.05,
+                backoff_cap=0.5,
+                deadline=deadline,
+                hedge_after=settings.UPSTREAM_HEDGE_AFTER_MS / 1000.0,
+                hedge_pool=_hedge_pool,
+                limiter=get_concurrency_limiter(upstream),
+            )
+        return policy
+
+
+__all__ = [
+    "CircuitBreaker",
+    "UpstreamPolicy",
+    "UpstreamUnavailable",
+    "get_upstream_policy",
+    "is_transient",
+]
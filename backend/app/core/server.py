@@ -0,0 +1,46 @@
+"""
+Gunicorn worker class for production (see gunicorn.conf.py).
+
+Gunicorn supervises the processes: it starts and restarts workers, reloads
+gracefully on HUP and upgrades in place on USR2. Each worker runs the app
+under uvicorn with uvloop and httptools.
+
+Only gunicorn imports this module; gunicorn and uvicorn-worker are production
+dependencies that the app itself never needs.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict
+
+from uvicorn_worker import UvicornWorker
+
+from app.core.config import settings
+
+
+def _uvicorn_kwargs() -> Dict[str, Any]:
+    kwargs: Dict[str, Any] = {
+        "loop": "uvloop",
+        "http": "httptools",
+        "lifespan": "on",
+        # Leave a second for lifespan shutdown before gunicorn's graceful_timeout kills the worker
+        "timeout_graceful_shutdown": max(1, settings.SERVER_GRACEFUL_TIMEOUT_SECONDS - 1),
+        "server_header": False,
+    }
+    if settings.SERVER_LIMIT_CONCURRENCY > 0:
+        kwargs["limit_concurrency"] = settings.SERVER_LIMIT_CONCURRENCY
+    return kwargs
+
+
+class ProductionWorker(UvicornWorker):
+    """UvicornWorker pinned to uvloop + httptools, with the SERVER_* tunables applied.
+
+    Gunicorn's own settings are passed through by UvicornWorker: bind, backlog,
+    keepalive (uvicorn's timeout_keep_alive), max_requests and
+    forwarded_allow_ips.
+    """
+
+    CONFIG_KWARGS = _uvicorn_kwargs()
+
+
+__all__ = ["ProductionWorker"]
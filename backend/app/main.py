@@ -2,10 +2,67 @@
 BeAlive Backend - FastAPI + Supabase
 """
 
-from fastapi import FastAPI
+import logging
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from app.core.compression import CompressionMiddleware
 from app.core.config import settings
-from app.api.routes import health, auth, feed, challenges, posts, commitments, network, uploads
+from app.core.db import get_direct_read_pool
+from app.core.invalidation import get_invalidation_listener
+from app.core.metrics import MetricsMiddleware, get_loop_lag_sampler
+from app.core.profiler import ProfilerMiddleware
+from app.core.replicas import ReadRoutingMiddleware, get_replica_router
+from app.core.resilience import UpstreamUnavailable
+from app.api.responses import FastJSONResponse
+from app.services.readiness import get_readiness_monitor
+from app.services.username_index import get_username_index
+from app.services.warmup import get_startup_warmup
+from app.api.routes import health, auth, feed, challenges, posts, commitments, network, uploads, sync, home, metrics, admin
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    listener = get_invalidation_listener()
+    if listener is not None:
+        listener.start()
+    # Loop lag feeds both /metrics and /ready
+    lag_sampler = get_loop_lag_sampler()
+    lag_sampler.start()
+    readiness = get_readiness_monitor()
+    readiness.start()
+    usernames = get_username_index()
+    if usernames is not None:
+        usernames.start()
+    direct_reads = get_direct_read_pool()
+    if direct_reads is not None:
+        # Opened lazily if Postgres is down now; reads then 503 instead of blocking startup
+        try:
+            await direct_reads.start()
+        except Exception as e:
+            logger.warning("direct read pool not started: %s", e)
+    # Last, so the worker only takes traffic once first-request costs are paid
+    warmup = get_startup_warmup()
+    if warmup is not None:
+        await warmup.run(app)
+    try:
+        yield
+    finally:
+        if warmup is not None:
+            await warmup.stop()
+        if direct_reads is not None:
+            await direct_reads.stop()
+        if usernames is not None:
+            await usernames.stop()
+        await readiness.stop()
+        await lag_sampler.stop()
+        if listener is not None:
+            await listener.stop()
+
 
 app = FastAPI(
     title="BeAlive API",
@@ -13,8 +70,20 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs" if settings.DEBUG else None,
     redoc_url="/redoc" if settings.DEBUG else None,
+    default_response_class=FastJSONResponse,
+    lifespan=lifespan,
 )
 
+@app.exception_handler(UpstreamUnavailable)
+async def upstream_unavailable_handler(request: Request, exc: UpstreamUnavailable):
+    """Upstream brownout or open circuit: tell clients to back off instead of waiting on timeouts."""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(max(1, int(exc.retry_after)))},
+    )
+
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -24,6 +93,32 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Response compression (brotli when installed, else gzip) for larger JSON bodies
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware, minimum_size=settings.COMPRESSION_MIN_SIZE)
+
+# Caller identity for read-your-writes when reads are routed to replicas
+if get_replica_router() is not None:
+    app.add_middleware(ReadRoutingMiddleware)
+
+# Opt-in stack sampling for slow (and 1-in-N) requests
+if settings.PROFILER_ENABLED:
+    app.add_middleware(
+        ProfilerMiddleware,
+        output_dir=settings.PROFILER_DIR,
+        slow_ms=settings.PROFILER_SLOW_MS,
+        sample_every=settings.PROFILER_SAMPLE_EVERY,
+        interval_ms=settings.PROFILER_INTERVAL_MS,
+        max_files=settings.PROFILER_MAX_FILES,
+        max_samples=settings.PROFILER_MAX_SAMPLES,
+        max_active=settings.PROFILER_MAX_ACTIVE,
+        slow_per_minute=settings.PROFILER_SLOW_PER_MINUTE,
+    )
+
+# Outermost: request latency and upstream call counts, served on /metrics
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware, upstream_calls_warn=settings.METRICS_UPSTREAM_CALLS_WARN)
+
 # Include API routes
 app.include_router(health.router, prefix="/api/v1", tags=["health"])
 app.include_router(auth.router, prefix="/api/v1", tags=["auth"])
@@ -33,6 +128,11 @@ app.include_router(posts.router, prefix="/api/v1", tags=["posts"])
 app.include_router(commitments.router, prefix="/api/v1", tags=["commitments"])
 app.include_router(network.router, prefix="/api/v1", tags=["network"])
 app.include_router(uploads.router, prefix="/api/v1", tags=["uploads"])
+app.include_router(sync.router, prefix="/api/v1", tags=["sync"])
+app.include_router(home.router, prefix="/api/v1", tags=["home"])
+if settings.METRICS_ENABLED:
+    app.include_router(metrics.router, tags=["metrics"])
+app.include_router(admin.router, tags=["admin"])
 
 @app.get("/")
 async def root():
@@ -40,6 +140,7 @@ async def root():
     return {"message": "BeAlive API is running", "version": "1.0.0"}
 
 if __name__ == "__main__":
+    # Development server; production runs `gunicorn -c gunicorn.conf.py` (multi-worker, preloaded)
     import uvicorn
     uvicorn.run(
         "app.main:app",
@@ -5,6 +5,9 @@ from .common import (
     ProfileBase,
     ProfileUpdate,
     ProfileOut,
+    UsernameMatch,
+    UsernameSearch,
+    UsernameAvailability,
     ConnectionCreate,
     ConnectionUpdate,
     ConnectionOut,
@@ -32,6 +35,10 @@ from .post import (
 from .commitment import (
     CommitmentCreate,
     CommitmentOut,
+    CommitmentCreated,
+    CommitmentExpand,
+    CommitmentItem,
+    CommitmentPage,
     CommitmentRequest,
 )
 from .network import (
@@ -45,6 +52,19 @@ from .network import (
 from .summary import (
     MeSummary,
 )
+from .sync import (
+    SyncResponse,
+)
+from .batch import (
+    MAX_BATCH_IDS,
+    PostBatch,
+    ChallengeBatch,
+    ProfileBatch,
+)
+from .home import (
+    HomeBundle,
+    HomeSection,
+)
 from .uploads import (
     PresignRequest,
     PresignResponse,
@@ -58,6 +78,9 @@ __all__ = [
     "ProfileBase",
     "ProfileUpdate",
     "ProfileOut",
+    "UsernameMatch",
+    "UsernameSearch",
+    "UsernameAvailability",
     "ConnectionCreate",
     "ConnectionUpdate",
     "ConnectionOut",
@@ -82,6 +105,10 @@ __all__ = [
     # commitment
     "CommitmentCreate",
     "CommitmentOut",
+    "CommitmentCreated",
+    "CommitmentExpand",
+    "CommitmentItem",
+    "CommitmentPage",
     "CommitmentRequest",
     # network
     "ImportContactsRequest",
@@ -92,6 +119,16 @@ __all__ = [
     "NetworkListResponse",
     # summary
     "MeSummary",
+    # sync
+    "SyncResponse",
+    # batch
+    "MAX_BATCH_IDS",
+    "PostBatch",
+    "ChallengeBatch",
+    "ProfileBatch",
+    # home
+    "HomeBundle",
+    "HomeSection",
     # uploads
     "PresignRequest",
     "PresignResponse",
@@ -0,0 +1,75 @@
+"""
+Prebuilt TypeAdapters for the models services validate on every request.
+
+Building a TypeAdapter compiles a pydantic-core validator/serializer; doing it
+once at import keeps that cost off the request path.
+"""
+
+from __future__ import annotations
+
+from typing import List
+
+from pydantic import TypeAdapter
+
+from .batch import ChallengeBatch, PostBatch, ProfileBatch
+from .challenge import ChallengeDetail, ChallengeOut, ChallengeStats
+from .commitment import CommitmentCreated, CommitmentItem, CommitmentOut, CommitmentPage
+from .common import ConnectionOut, ProfileOut
+from .post import FeedResponse, PostFull, PostWithCounts
+from .home import HomeBundle
+from .sync import SyncResponse
+
+ChallengeOutAdapter = TypeAdapter(ChallengeOut)
+ChallengeOutListAdapter = TypeAdapter(List[ChallengeOut])
+ChallengeDetailAdapter = TypeAdapter(ChallengeDetail)
+ChallengeDetailListAdapter = TypeAdapter(List[ChallengeDetail])
+ChallengeStatsAdapter = TypeAdapter(ChallengeStats)
+ChallengeStatsListAdapter = TypeAdapter(List[ChallengeStats])
+
+PostWithCountsAdapter = TypeAdapter(PostWithCounts)
+PostWithCountsListAdapter = TypeAdapter(List[PostWithCounts])
+PostFullAdapter = TypeAdapter(PostFull)
+FeedResponseAdapter = TypeAdapter(FeedResponse)
+
+ProfileOutAdapter = TypeAdapter(ProfileOut)
+ProfileOutListAdapter = TypeAdapter(List[ProfileOut])
+
+CommitmentOutAdapter = TypeAdapter(CommitmentOut)
+CommitmentOutListAdapter = TypeAdapter(List[CommitmentOut])
+CommitmentCreatedAdapter = TypeAdapter(CommitmentCreated)
+CommitmentItemListAdapter = TypeAdapter(List[CommitmentItem])
+CommitmentPageAdapter = TypeAdapter(CommitmentPage)
+
+ConnectionOutListAdapter = TypeAdapter(List[ConnectionOut])
+SyncResponseAdapter = TypeAdapter(SyncResponse)
+HomeBundleAdapter = TypeAdapter(HomeBundle)
+
+PostBatchAdapter = TypeAdapter(PostBatch)
+ChallengeBatchAdapter = TypeAdapter(ChallengeBatch)
+ProfileBatchAdapter = TypeAdapter(ProfileBatch)
+
+__all__ = [
+    "ChallengeOutAdapter",
+    "ChallengeOutListAdapter",
+    "ChallengeDetailAdapter",
+    "ChallengeDetailListAdapter",
+    "ChallengeStatsAdapter",
+    "ChallengeStatsListAdapter",
+    "PostWithCountsAdapter",
+    "PostWithCountsListAdapter",
+    "PostFullAdapter",
+    "FeedResponseAdapter",
+    "ProfileOutAdapter",
+    "ProfileOutListAdapter",
+    "CommitmentOutAdapter",
+    "CommitmentOutListAdapter",
+    "CommitmentCreatedAdapter",
+    "CommitmentItemListAdapter",
+    "CommitmentPageAdapter",
+    "ConnectionOutListAdapter",
+    "SyncResponseAdapter",
+    "HomeBundleAdapter",
+    "PostBatchAdapter",
+    "ChallengeBatchAdapter",
+    "ProfileBatchAdapter",
+]
@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from typing import List
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+from .challenge import ChallengeDetail
+from .common import ProfileOut
+from .post import PostFull
+
+# Upper bound on ids accepted by one batch read
+MAX_BATCH_IDS = 100
+
+
+class PostBatch(BaseModel):
+    """Posts in the order requested; `missing` lists ids that do not exist or are not visible."""
+
+    items: List[PostFull]
+    missing: List[int] = Field(default_factory=list)
+
+
+class ChallengeBatch(BaseModel):
+    """Challenges (with stats) in the order requested; `missing` as in PostBatch."""
+
+    items: List[ChallengeDetail]
+    missing: List[int] = Field(default_factory=list)
+
+
+class ProfileBatch(BaseModel):
+    """Profiles in the order requested; `missing` as in PostBatch."""
+
+    items: List[ProfileOut]
+    missing: List[UUID] = Field(default_factory=list)
@@ -1,11 +1,14 @@
 from __future__ import annotations
 
 from datetime import datetime
+from enum import Enum
+from typing import List, Optional
 from uuid import UUID
 
 from pydantic import BaseModel, ConfigDict
 
-from .common import CommitmentSide
+from .challenge import ChallengeDetail, ChallengeStats
+from .common import CommitmentSide, ProfileOut
 
 
 class CommitmentCreate(BaseModel):
@@ -23,6 +26,29 @@ class CommitmentOut(BaseModel):
     created_at: datetime
 
 
+class CommitmentCreated(CommitmentOut):
+    """Commitment plus the challenge counters as of the write."""
+    created: bool = True
+    stats: Optional[ChallengeStats] = None
+
+
+class CommitmentExpand(str, Enum):
+    """Related entities a commitment listing can embed."""
+    CHALLENGE = "challenge"
+    PROFILE = "profile"
+
+
+class CommitmentItem(CommitmentOut):
+    """Commitment listing entry; `challenge` and `profile` are filled when requested via `expand`."""
+    challenge: Optional[ChallengeDetail] = None
+    profile: Optional[ProfileOut] = None
+
+
+class CommitmentPage(BaseModel):
+    items: List[CommitmentItem]
+    next_cursor: Optional[str] = None
+
+
 class CommitmentRequest(BaseModel):
     """Request to create a commitment for a challenge."""
     direction: CommitmentSide
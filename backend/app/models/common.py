@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from datetime import datetime
 from enum import Enum
-from typing import Optional
+from typing import List, Optional
 from uuid import UUID
 
 from pydantic import BaseModel, ConfigDict
@@ -49,6 +49,25 @@ class ProfileOut(ProfileBase):
     updated_at: datetime
 
 
+class UsernameMatch(BaseModel):
+    user_id: UUID
+    username: str
+
+
+class UsernameSearch(BaseModel):
+    """Usernames starting with the query, case-insensitively, in alphabetical order."""
+
+    items: List[UsernameMatch]
+
+
+class UsernameAvailability(BaseModel):
+    """`valid`: matches the username rules; `available`: valid and not held by another user."""
+
+    username: str
+    valid: bool
+    available: bool
+
+
 # ========= Connections =========
 
 
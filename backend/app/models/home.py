@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from enum import Enum
+from typing import Dict, Optional
+
+from pydantic import BaseModel, Field
+
+from .commitment import CommitmentPage
+from .common import ProfileOut
+from .network import NetworkListResponse
+from .post import FeedResponse
+from .summary import MeSummary
+
+
+class HomeSection(str, Enum):
+    ME = "me"
+    SUMMARY = "summary"
+    FEED = "feed"
+    COMMITMENTS = "commitments"
+    NETWORK = "network"
+
+
+class HomeBundle(BaseModel):
+    """Everything the home screen renders on launch, read concurrently.
+
+    A section is null when it was not requested, ran past its time budget, or
+    failed; `errors` maps each missing requested section to "timeout" or "error"
+    so the client can fetch it from its own endpoint.
+    """
+
+    me: Optional[ProfileOut] = None
+    summary: Optional[MeSummary] = None
+    feed: Optional[FeedResponse] = None
+    commitments: Optional[CommitmentPage] = None
+    network: Optional[NetworkListResponse] = None
+    partial: bool = False
+    errors: Dict[str, str] = Field(default_factory=dict)
+
@@ -55,6 +55,7 @@ class CreatePostRequest(BaseModel):
     new_challenge: Optional[ChallengeCreate] = None
     caption: Optional[str] = None
     media_url: Optional[str] = None
+    idempotency_key: Optional[str] = None
 
 
 class PostFull(PostWithCounts):
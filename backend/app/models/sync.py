@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+from typing import List
+
+from pydantic import BaseModel, Field
+
+from .challenge import ChallengeStats
+from .commitment import CommitmentOut
+from .common import ConnectionOut
+from .post import PostWithCounts
+
+
+class SyncResponse(BaseModel):
+    """Rows created, changed or deleted since the caller's sync token.
+
+    `reset` means the token was missing or too old: reload /feed, /commitments/me and
+    /network in full, then continue from `next_token`. `has_more` means call again
+    with `next_token` right away.
+    """
+
+    next_token: str
+    reset: bool = False
+    has_more: bool = False
+    posts: List[PostWithCounts] = Field(default_factory=list)
+    deleted_post_ids: List[int] = Field(default_factory=list)
+    challenge_stats: List[ChallengeStats] = Field(default_factory=list)
+    commitments: List[CommitmentOut] = Field(default_factory=list)
+    deleted_commitment_ids: List[int] = Field(default_factory=list)
+    connections: List[ConnectionOut] = Field(default_factory=list)
+    deleted_connection_ids: List[int] = Field(default_factory=list)
@@ -3,9 +3,9 @@ from __future__ import annotations
 from typing import Any, Dict, Iterable, List, Optional, Tuple
 from uuid import UUID
 
-from pydantic import TypeAdapter
-
+from app.core.replicas import read_only
 from app.models import ChallengeStats, MeSummary
+from app.models.adapters import ChallengeStatsAdapter
 from .supabase import get_supabase_client
 
 
@@ -23,6 +23,7 @@ class AggregatesService:
     def __init__(self) -> None:
         self.client = get_supabase_client()
 
+    @read_only
     def challenge_stats(self, challenge_id: int) -> ChallengeStats:
         resp = (
             self.client.table("challenge_stats").select("*").eq("challenge_id", challenge_id).limit(1).execute()
@@ -44,8 +45,9 @@ class AggregatesService:
                 "for_amount_cents": 0,
                 "against_amount_cents": 0,
             }
-        return TypeAdapter(ChallengeStats).validate_python(row)
+        return ChallengeStatsAdapter.validate_python(row)
 
+    @read_only
     def me_summary(self, user_id: UUID) -> MeSummary:
         # Followers: others -> me
         followers_resp = (
@@ -1,11 +1,10 @@
 from __future__ import annotations
 
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional
 from uuid import UUID
 
-from pydantic import TypeAdapter
-
+from app.core.replicas import read_only
 from app.models import (
     ChallengeCreate,
     ChallengeOut,
@@ -13,6 +12,13 @@ from app.models import (
     ChallengeDetail,
     PostWithCounts,
 )
+from app.models.adapters import (
+    ChallengeDetailAdapter,
+    ChallengeDetailListAdapter,
+    ChallengeOutAdapter,
+    ChallengeOutListAdapter,
+    PostWithCountsListAdapter,
+)
 from .supabase import get_supabase_client
 
 
@@ -20,6 +26,19 @@ def _now_utc() -> datetime:
     return datetime.now(timezone.utc)
 
 
+def _merge_stats(ch: Dict[str, Any], st_row: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Merge a `challenge_stats` row into a challenge row for ChallengeDetail."""
+    # `challenge_stats` should always have a row; fall back to zeros if not.
+    st_row = st_row or {}
+    return {
+        **ch,
+        "for_count": st_row.get("for_count", 0),
+        "against_count": st_row.get("against_count", 0),
+        "for_amount_cents": st_row.get("for_amount_cents", 0),
+        "against_amount_cents": st_row.get("against_amount_cents", 0),
+    }
+
+
 class ChallengeService:
     """Encapsulates challenge CRUD and queries via Supabase.
 
@@ -27,8 +46,9 @@ class ChallengeService:
     and the `public.challenge_stats` view for aggregates.
     """
 
-    def __init__(self) -> None:
-        self.client = get_supabase_client()
+    def __init__(self, access_token: Optional[str] = None) -> None:
+        # Scoped to the caller for RLS (e.g. visibility checks) when a token is given
+        self.client = get_supabase_client(access_token)
 
     # -------- Create --------
     def create(self, owner_id: UUID, payload: ChallengeCreate) -> ChallengeOut:
@@ -43,40 +63,47 @@ class ChallengeService:
         }
         resp = self.client.table("challenges").insert(data).select("*").execute()
         row = (resp.data or [])[0]
-        return TypeAdapter(ChallengeOut).validate_python(row)
+        return ChallengeOutAdapter.validate_python(row)
 
     # -------- Read (detail + stats) --------
-    def get_detail(self, challenge_id: int) -> ChallengeDetail:
-        """Return challenge row with aggregated stats."""
+    def get_row(self, challenge_id: int) -> Dict[str, Any]:
+        """Return the raw challenge row with its version columns (`updated_at`, `commitment_count`,
+        `last_commitment_at`), read from the `challenge_versions` view."""
         ch_resp = (
-            self.client.table("challenges").select("*").eq("id", challenge_id).limit(1).execute()
+            self.client.table("challenge_versions").select("*").eq("id", challenge_id).limit(1).execute()
         )
         ch = ((ch_resp.data or []) or [None])[0]
         if not ch:
             raise ValueError("Challenge not found")
+        return ch
+
+    def get_detail(self, challenge_id: int, row: Optional[Dict[str, Any]] = None) -> ChallengeDetail:
+        """Return challenge row with aggregated stats; pass `row` to reuse an already fetched row."""
+        ch = row if row is not None else self.get_row(challenge_id)
 
         st_resp = (
             self.client.table("challenge_stats").select("*").eq("challenge_id", challenge_id).limit(1).execute()
         )
         st_row = ((st_resp.data or []) or [None])[0]
-        # `challenge_stats` should always have a row; fall back to zeros if not.
-        if not st_row:
-            st_row = {
-                "challenge_id": challenge_id,
-                "amount_cents": ch.get("amount_cents"),
-                "for_count": 0,
-                "against_count": 0,
-                "for_amount_cents": 0,
-                "against_amount_cents": 0,
-            }
-        detail = {
-            **ch,
-            "for_count": st_row["for_count"],
-            "against_count": st_row["against_count"],
-            "for_amount_cents": st_row["for_amount_cents"],
-            "against_amount_cents": st_row["against_amount_cents"],
-        }
-        return TypeAdapter(ChallengeDetail).validate_python(detail)
+        return ChallengeDetailAdapter.validate_python(_merge_stats(ch, st_row))
+
+    @read_only
+    def get_details_by_ids(self, challenge_ids: Iterable[int]) -> Dict[int, ChallengeDetail]:
+        """Batch variant of `get_detail`: two `in_()` queries regardless of how many ids."""
+        ids = sorted(set(challenge_ids))
+        if not ids:
+            return {}
+        chs = self.client.table("challenges").select("*").in_("id", ids).execute().data or []
+        if not chs:
+            return {}
+        visible = [c["id"] for c in chs]
+        stats = (
+            self.client.table("challenge_stats").select("*").in_("challenge_id", visible).execute().data or []
+        )
+        st_map = {r["challenge_id"]: r for r in stats}
+        merged = [_merge_stats(c, st_map.get(c["id"])) for c in chs]
+        details = ChallengeDetailListAdapter.validate_python(merged)
+        return {d.id: d for d in details}
 
     # -------- Update (metadata) --------
     def update(self, owner_id: UUID, challenge_id: int, patch: ChallengeUpdate) -> ChallengeOut:
@@ -119,15 +146,16 @@ class ChallengeService:
         if not update_fields:
             existing = self.client.table("challenges").select("*").eq("id", challenge_id).limit(1).execute()
             row = ((existing.data or []) or [None])[0]
-            return TypeAdapter(ChallengeOut).validate_python(row)
+            return ChallengeOutAdapter.validate_python(row)
 
         resp = (
             self.client.table("challenges").update(update_fields).eq("id", challenge_id).select("*").limit(1).execute()
         )
         row = ((resp.data or []) or [None])[0]
-        return TypeAdapter(ChallengeOut).validate_python(row)
+        return ChallengeOutAdapter.validate_python(row)
 
     # -------- Posts listing for a challenge --------
+    @read_only
     def list_posts(
         self,
         challenge_id: int,
@@ -145,9 +173,10 @@ class ChallengeService:
         q = q.limit(max(1, min(limit, 100)))
         resp = q.execute()
         rows = resp.data or []
-        return TypeAdapter(List[PostWithCounts]).validate_python(rows)
+        return PostWithCountsListAdapter.validate_python(rows)
 
     # -------- Challenge listing with filters --------
+    @read_only
     def list_challenges(
         self,
         creator_id: Optional[UUID] = None,
@@ -188,5 +217,5 @@ class ChallengeService:
 
             rows = [r for r in rows if (is_active(r) if active else not is_active(r))]
 
-        return TypeAdapter(List[ChallengeOut]).validate_python(rows)
+        return ChallengeOutListAdapter.validate_python(rows)
 
@@ -1,11 +1,22 @@
 from __future__ import annotations
 
-from typing import List, Optional
+from typing import Iterable, List, Optional, Set
 from uuid import UUID
 
-from pydantic import TypeAdapter
+from postgrest.exceptions import APIError
 
-from app.models import CommitmentOut, CommitmentSide
+from app.core.replicas import read_only
+from app.models import CommitmentCreated, CommitmentItem, CommitmentOut, CommitmentPage, CommitmentSide
+from app.models.adapters import (
+    CommitmentCreatedAdapter,
+    CommitmentItemListAdapter,
+    CommitmentOutAdapter,
+)
+from .challenges import ChallengeService
+from .idempotency import get_idempotency_store
+from .pagination import decode_cursor, encode_cursor, keyset_before
+from .profile_service import ProfileService
+from .stats_broadcaster import get_stats_broadcaster
 from .supabase import get_supabase_client
 
 
@@ -13,11 +24,7 @@ class CommitmentService:
     """Commitment operations using the caller's token for RLS enforcement."""
 
     def __init__(self, access_token: str) -> None:
-        self.client = get_supabase_client()
-        try:
-            self.client.postgrest.auth(access_token)
-        except Exception:
-            pass
+        self.client = get_supabase_client(access_token)
 
     def get_my(self, user_id: UUID, challenge_id: int) -> Optional[CommitmentOut]:
         resp = (
@@ -29,57 +36,90 @@ class CommitmentService:
             .execute()
         )
         row = ((resp.data or []) or [None])[0]
-        return TypeAdapter(CommitmentOut).validate_python(row) if row else None
+        return CommitmentOutAdapter.validate_python(row) if row else None
+
+    def create(self, user_id: UUID, challenge_id: int, side: CommitmentSide, idempotency_key: str | None = None) -> CommitmentCreated:
+        """Insert the commitment (or return the existing one) in a single RPC.
 
-    def create(self, user_id: UUID, challenge_id: int, side: CommitmentSide, idempotency_key: str | None = None) -> CommitmentOut:
-        # Idempotency is best-effort: if existing, return it.
-        existing = self.get_my(user_id, challenge_id)
-        if existing:
-            return existing
+        The reply includes the challenge counters after the write. A retry with the same
+        idempotency key replays the stored result.
+        """
         payload = {
             "user_id": str(user_id),
             "challenge_id": challenge_id,
             "side": side.value,
         }
+        return get_idempotency_store().run(
+            user_id=user_id,
+            scope=f"commitment:{challenge_id}",
+            idempotency_key=idempotency_key,
+            payload=payload,
+            fn=lambda: self._commit(challenge_id, side),
+        )
+
+    def _commit(self, challenge_id: int, side: CommitmentSide) -> CommitmentCreated:
+        params = {"p_challenge_id": challenge_id, "p_side": side.value}
         try:
-            # Insert and then fetch - some supabase-py versions don't support chaining select after insert
-            resp = self.client.table("commitments").insert(payload).execute()
-            
-            # Fetch the newly created commitment
-            created = self.get_my(user_id, challenge_id)
-            if not created:
-                raise RuntimeError("Failed to create commitment")
-            return created
-        except Exception as e:
-            # Handle unique violation race: return existing
-            again = self.get_my(user_id, challenge_id)
-            if again:
-                return again
+            resp = self.client.rpc("commit_to_challenge", params).execute()
+        except APIError as e:
+            # 42501: RLS rejected the insert (challenge not visible to the caller)
+            if e.code == "42501":
+                raise PermissionError(e.message or "Not allowed") from e
             raise
+        row = (resp.data or [None])[0] if isinstance(resp.data, list) else resp.data
+        if not row:
+            raise RuntimeError("Failed to create commitment")
+        created = CommitmentCreatedAdapter.validate_python(row)
+        if created.stats is not None:
+            # Stream watchers get the new counters without another upstream read
+            get_stats_broadcaster().publish(created.stats)
+        return created
 
-    def list_for_challenge(self, challenge_id: int, limit: int = 100, cursor: int | None = None) -> List[CommitmentOut]:
-        # Simple listing; ordered by created_at desc. Cursor is not implemented (not requested).
-        resp = (
-            self.client.table("commitments")
-            .select("*")
-            .eq("challenge_id", challenge_id)
-            .order("created_at", desc=True)
-            .limit(max(1, min(limit, 100)))
-            .execute()
-        )
-        rows = resp.data or []
-        return TypeAdapter(List[CommitmentOut]).validate_python(rows)
-    
-    def list_my_commitments(self, user_id: UUID, limit: int = 100) -> List[CommitmentOut]:
-        """List all commitments for a specific user."""
-        resp = (
-            self.client.table("commitments")
-            .select("*")
-            .eq("user_id", str(user_id))
-            .order("created_at", desc=True)
-            .limit(max(1, min(limit, 100)))
-            .execute()
-        )
+    @read_only
+    def list_for_challenge(
+        self,
+        challenge_id: int,
+        limit: int = 100,
+        cursor: str | None = None,
+        expand: Iterable[str] = (),
+    ) -> CommitmentPage:
+        """Page through a challenge's commitments, newest first, keyed by (created_at, id)."""
+        q = self.client.table("commitments").select("*").eq("challenge_id", challenge_id)
+        return self._page(q, limit=limit, cursor=cursor, expand=expand)
+
+    @read_only
+    def list_my_commitments(
+        self,
+        user_id: UUID,
+        limit: int = 100,
+        cursor: str | None = None,
+        expand: Iterable[str] = (),
+    ) -> CommitmentPage:
+        """Page through all commitments for a specific user, newest first."""
+        q = self.client.table("commitments").select("*").eq("user_id", str(user_id))
+        return self._page(q, limit=limit, cursor=cursor, expand=expand)
+
+    def _page(self, q, *, limit: int, cursor: str | None, expand: Iterable[str]) -> CommitmentPage:
+        page_size = max(1, min(limit, 100))
+        if cursor:
+            q = q.or_(keyset_before(*decode_cursor(cursor)))
+        # Fetch one extra row to learn whether another page exists
+        resp = q.order("created_at", desc=True).order("id", desc=True).limit(page_size + 1).execute()
         rows = resp.data or []
-        return TypeAdapter(List[CommitmentOut]).validate_python(rows)
+        items = CommitmentItemListAdapter.validate_python(rows[:page_size])
+        next_cursor = encode_cursor(items[-1].created_at, items[-1].id) if len(rows) > page_size else None
+        self._hydrate(items, set(expand))
+        return CommitmentPage(items=items, next_cursor=next_cursor)
 
+    def _hydrate(self, items: List[CommitmentItem], expand: Set[str]) -> None:
+        """Embed challenge details and committer profiles with one batched read per entity."""
+        if not items:
+            return
+        if "challenge" in expand:
+            details = ChallengeService().get_details_by_ids(c.challenge_id for c in items)
+            for c in items:
+                c.challenge = details.get(c.challenge_id)
+        if "profile" in expand:
+            profiles = ProfileService().get_profiles_by_ids({c.user_id for c in items})
+            for c in items:
+                c.profile = profiles.get(c.user_id)
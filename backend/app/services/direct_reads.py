@@ -0,0 +1,164 @@
+"""
+Direct Postgres reads for the hottest endpoints (/feed, /challenges/{id}, /posts/{id}).
+
+Same queries as the PostgREST services, sent over a pooled asyncpg connection
+running as the caller (see app.core.db), so RLS still applies. Rows are
+validated straight into the response models, skipping PostgREST's JSON
+encoding and supabase-py's decoding.
+
+Rows that feed an ETag are converted to PostgREST's JSON shape first (datetimes
+in Postgres's ISO form, string UUIDs), so both paths send the same ETag for the same data
+and clients keep their 304s when a deployment switches paths.
+"""
+
+from __future__ import annotations
+
+import time
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.db import get_direct_read_pool
+from app.core.metrics import record_upstream_call
+from app.models import ChallengeDetail, FeedResponse, PostFull
+from app.models.adapters import (
+    ChallengeDetailAdapter,
+    PostWithCountsAdapter,
+    PostWithCountsListAdapter,
+    ProfileOutListAdapter,
+)
+from app.utils.auth import verify_access_token
+from .challenges import _merge_stats
+from .profile_cache import get_profile_cache, profile_version
+
+
+def _pg_json_datetime(value: datetime) -> str:
+    """ISO 8601 as Postgres writes it in JSON: fractional seconds without trailing zeros."""
+    text = value.isoformat()
+    if not value.microsecond:
+        return text
+    # isoformat always writes six digits (".120000"); Postgres writes ".12"
+    head, _, rest = text.partition(".")
+    return f"{head}.{rest[:6].rstrip('0')}{rest[6:]}"
+
+
+def _postgrest_row(record: Any) -> Dict[str, Any]:
+    """Render a record the way PostgREST's JSON would decode (for ETag parity)."""
+    row: Dict[str, Any] = {}
+    for key, value in record.items():
+        if isinstance(value, datetime):
+            value = _pg_json_datetime(value)
+        elif isinstance(value, uuid.UUID):
+            value = str(value)
+        row[key] = value
+    return row
+
+
+class DirectReadService:
+    """Hot reads over one RLS-scoped connection; use as `async with DirectReadService(claims) as svc`."""
+
+    def __init__(self, claims: Dict[str, Any]) -> None:
+        self.claims = claims
+        self._conn: Any = None
+
+    async def __aenter__(self) -> "DirectReadService":
+        pool = get_direct_read_pool()
+        if pool is None:
+            raise RuntimeError("direct reads are not configured")
+        self._cm = pool.as_user(self.claims)
+        self._conn = await self._cm.__aenter__()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> Optional[bool]:
+        self._conn = None
+        return await self._cm.__aexit__(*exc_info)
+
+    async def _fetch(self, target: str, sql: str, *args: Any) -> List[Any]:
+        if not settings.METRICS_ENABLED:
+            return await self._conn.fetch(sql, *args)
+        started = time.perf_counter()
+        status = "ok"
+        rows: Optional[int] = None
+        try:
+            records = await self._conn.fetch(sql, *args)
+            rows = len(records)
+            return records
+        except Exception:
+            status = "error"
+            raise
+        finally:
+            record_upstream_call(target, "direct", status, time.perf_counter() - started, rows)
+
+    # ---- /feed ----
+    async def get_feed(self, after: Optional[datetime], limit: int) -> FeedResponse:
+        records = await self._fetch("get_feed", "select * from public.get_feed($1, $2)", after, limit)
+        items = PostWithCountsListAdapter.validate_python([dict(r) for r in records])
+        next_cursor = items[-1].created_at if items else None
+        return FeedResponse(items=items, next_cursor=next_cursor)
+
+    # ---- /challenges/{id} ----
+    async def get_challenge_row(self, challenge_id: int) -> Dict[str, Any]:
+        """Challenge row in PostgREST shape; raises ValueError when missing or hidden."""
+        records = await self._fetch(
+            "challenge_versions", "select * from public.challenge_versions where id = $1", challenge_id
+        )
+        if not records:
+            raise ValueError("Challenge not found")
+        return _postgrest_row(records[0])
+
+    async def get_challenge_detail(self, row: Dict[str, Any]) -> ChallengeDetail:
+        records = await self._fetch(
+            "challenge_stats", "select * from public.challenge_stats where challenge_id = $1", row["id"]
+        )
+        st_row = dict(records[0]) if records else None
+        return ChallengeDetailAdapter.validate_python(_merge_stats(row, st_row))
+
+    # ---- /posts/{id} ----
+    async def get_post_row(self, post_id: int) -> Dict[str, Any]:
+        """`posts_with_counts` row in PostgREST shape; raises ValueError when missing or hidden."""
+        # The view is not security_invoker; the join on posts applies its RLS, as PostService.get_row does
+        records = await self._fetch(
+            "posts_with_counts",
+            "select p.* from public.posts_with_counts p join public.posts v on v.id = p.id where p.id = $1",
+            post_id,
+        )
+        if not records:
+            raise ValueError("Post not found")
+        return _postgrest_row(records[0])
+
+    async def get_post(self, row: Dict[str, Any]) -> PostFull:
+        post = PostWithCountsAdapter.validate_python(row)
+        # The post passed RLS, so its author's cached profile may be served (as on the PostgREST path)
+        cache = get_profile_cache()
+        author = cache.get(str(post.author_id)) if cache is not None else None
+        if author is None:
+            records = await self._fetch("profiles", "select * from public.profiles where user_id = $1", post.author_id)
+            profiles = ProfileOutListAdapter.validate_python([dict(r) for r in records])
+            author = profiles[0] if profiles else None
+            if author is not None and cache is not None:
+                cache.set(str(author.user_id), profile_version(author), author)
+        return PostFull(**post.model_dump(), author_profile=author)
+
+
+@asynccontextmanager
+async def direct_reads_for(authorization: Optional[str]) -> AsyncIterator[Optional[DirectReadService]]:
+    """Yield a DirectReadService for the caller, or None to use the PostgREST path.
+
+    None when direct reads are off or the request carries no bearer token; the
+    PostgREST path then reads with the caller's token, so both paths apply the
+    same RLS. A bad token is 401.
+    """
+    if get_direct_read_pool() is None or not authorization or not authorization.lower().startswith("bearer "):
+        yield None
+        return
+    # Off the loop: without SUPABASE_JWT_SECRET the check is a round trip to Supabase Auth
+    claims = await run_in_threadpool(verify_access_token, authorization.split(" ", 1)[1].strip())
+    async with DirectReadService(claims) as svc:
+        yield svc
+
+
+__all__ = ["DirectReadService", "direct_reads_for"]
@@ -4,14 +4,18 @@ from datetime import datetime
 from typing import List, Optional
 from uuid import UUID
 
-from pydantic import TypeAdapter
-
+from app.core.replicas import read_only
 from app.models import (
     FeedResponse,
     PostWithCounts,
     ChallengeDetail,
     ChallengeOut,
 )
+from app.models.adapters import (
+    ChallengeDetailListAdapter,
+    ChallengeOutListAdapter,
+    PostWithCountsListAdapter,
+)
 from .supabase import get_supabase_client
 
 
@@ -19,24 +23,21 @@ class FeedService:
     """Feed and discovery operations using Supabase, with per-request user token for RLS."""
 
     def __init__(self, access_token: str) -> None:
-        self.client = get_supabase_client()
-        # Ensure RLS/auth.uid() context is set for this request
-        try:
-            self.client.postgrest.auth(access_token)
-        except Exception:
-            # Older supabase-py versions may differ; if auth() is unavailable, requests will run without RLS context.
-            pass
+        # Queries carry the caller's token, so RLS/auth.uid() apply to this request
+        self.client = get_supabase_client(access_token)
 
     # ---- /feed ----
+    @read_only
     def get_feed(self, after: Optional[datetime], limit: int) -> FeedResponse:
         params = {"p_after": after.isoformat() if after else None, "p_limit": limit}
         resp = self.client.rpc("get_feed", params).execute()
         rows = resp.data or []
-        items = TypeAdapter(List[PostWithCounts]).validate_python(rows)
+        items = PostWithCountsListAdapter.validate_python(rows)
         next_cursor = items[-1].created_at if items else None
         return FeedResponse(items=items, next_cursor=next_cursor)
 
     # ---- /feed/challenges/trending ---- #Not in use/need atm
+    @read_only
     def trending_challenges(self, limit: int = 20) -> List[ChallengeDetail]:
         # Get top challenge ids by total commitments count
         stats = (
@@ -54,22 +55,23 @@ class FeedService:
         # Fetch challenge rows (RLS applies)
         chs = self.client.table("challenges").select("*").in_("id", ids).execute().data or []
         ch_map = {c["id"]: c for c in chs}
-        out: List[ChallengeDetail] = []
+        merged: List[dict] = []
         for r in rows:
             ch = ch_map.get(r["challenge_id"]) or None
             if not ch:
                 continue
-            merged = {
+            merged.append({
                 **ch,
                 "for_count": r.get("for_count", 0),
                 "against_count": r.get("against_count", 0),
                 "for_amount_cents": r.get("for_amount_cents", 0),
                 "against_amount_cents": r.get("against_amount_cents", 0),
-            }
-            out.append(TypeAdapter(ChallengeDetail).validate_python(merged))
-        return out
+            })
+        # Validate the whole page in one call instead of per row
+        return ChallengeDetailListAdapter.validate_python(merged)
 
     # ---- /users/{user_id}/posts ----
+    @read_only
     def user_posts(self, user_id: UUID, cursor: Optional[datetime], limit: int) -> List[PostWithCounts]:
         q = (
             self.client.table("posts_with_counts")
@@ -82,9 +84,10 @@ class FeedService:
         q = q.limit(max(1, min(limit, 100)))
         resp = q.execute()
         rows = resp.data or []
-        return TypeAdapter(List[PostWithCounts]).validate_python(rows)
+        return PostWithCountsListAdapter.validate_python(rows)
 
     # ---- /challenges/search ----
+    @read_only
     def search_challenges(self, query: str, limit: int = 20) -> List[ChallengeOut]:
         # Simple ILIKE on title + description, ordered by recency
         # PostgREST supports `or` filter with `ilike` expressions
@@ -98,5 +101,5 @@ class FeedService:
             .execute()
         )
         rows = resp.data or []
-        return TypeAdapter(List[ChallengeOut]).validate_python(rows)
+        return ChallengeOutListAdapter.validate_python(rows)
 
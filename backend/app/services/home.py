@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, Iterable, Tuple
+from uuid import UUID
+
+from app.models import HomeBundle, HomeSection
+from .aggregates import AggregatesService
+from .commitments import CommitmentService
+from .feed import FeedService
+from .network_service import NetworkService
+from .profile_service import ProfileService
+
+logger = logging.getLogger(__name__)
+
+FEED_LIMIT = 20
+COMMITMENTS_LIMIT = 50
+
+
+class HomeService:
+    """Builds the home-screen bundle by running each section's read concurrently.
+
+    Services are synchronous, so each section runs in the default thread pool;
+    the bundle takes as long as its slowest section, capped by `budget_seconds`.
+    Scoped services carry the caller's token on their own queries
+    (`get_supabase_client(token)`), so concurrent sections and requests never
+    share one.
+    A section that overruns or raises is left out and reported in `errors`.
+    """
+
+    def __init__(self, access_token: str, user_id: UUID) -> None:
+        self.access_token = access_token
+        self.user_id = user_id
+
+    def _loaders(self) -> Dict[HomeSection, Callable[[], Any]]:
+        token, uid = self.access_token, self.user_id
+        return {
+            HomeSection.ME: lambda: ProfileService().get_profiles_by_ids([uid]).get(uid),
+            HomeSection.SUMMARY: lambda: AggregatesService().me_summary(uid),
+            HomeSection.FEED: lambda: FeedService(token).get_feed(after=None, limit=FEED_LIMIT),
+            HomeSection.COMMITMENTS: lambda: CommitmentService(token).list_my_commitments(
+                user_id=uid, limit=COMMITMENTS_LIMIT, expand=["challenge"]
+            ),
+            HomeSection.NETWORK: lambda: NetworkService().list_network(user_id=uid),
+        }
+
+    async def bundle(self, sections: Iterable[HomeSection], budget_seconds: float) -> Tuple[HomeBundle, Dict[str, float]]:
+        """Return the bundle and per-section wall time in milliseconds."""
+        loaders = self._loaders()
+        wanted = list(dict.fromkeys(sections)) or list(HomeSection)
+        timings: Dict[str, float] = {}
+
+        async def run(section: HomeSection) -> Tuple[HomeSection, Any, str | None]:
+            started = time.perf_counter()
+            try:
+                value = await asyncio.wait_for(asyncio.to_thread(loaders[section]), budget_seconds)
+                return section, value, None
+            except asyncio.TimeoutError:
+                # The worker thread finishes in the background; its result is discarded
+                return section, None, "timeout"
+            except Exception:
+                logger.exception("home section %s failed", section.value)
+                return section, None, "error"
+            finally:
+                timings[section.value] = (time.perf_counter() - started) * 1000
+
+        out = HomeBundle()
+        for section, value, error in await asyncio.gather(*(run(s) for s in wanted)):
+            if error is not None:
+                out.errors[section.value] = error
+            else:
+                setattr(out, section.value, value)
+        out.partial = bool(out.errors)
+        return out, timings
@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from typing import Any, Callable, Optional, Protocol, Tuple, TypeVar
+from uuid import UUID
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+T = TypeVar("T")
+
+# (fingerprint, stored response)
+StoredResponse = Tuple[str, Any]
+
+# How long an in-flight marker outlives a request that never releases it;
+# longer than any create call's upstream deadline
+_PENDING_TTL_SECONDS = 60.0
+
+
+class IdempotencyKeyReused(Exception):
+    """Raised when an idempotency key is replayed with a different request payload."""
+
+
+class IdempotencyKeyInFlight(Exception):
+    """Raised when a request with the same idempotency key is still being processed."""
+
+
+class IdempotencyBackend(Protocol):
+    """Storage for idempotent responses keyed by (user, scope, key)."""
+
+    def get(self, key: str) -> Optional[StoredResponse]:
+        ...
+
+    def set(self, key: str, value: StoredResponse, ttl_seconds: float) -> None:
+        ...
+
+    def claim(self, key: str, ttl_seconds: float) -> bool:
+        """Atomically mark `key` in flight; False when another request already holds it."""
+        ...
+
+    def release(self, key: str) -> None:
+        """Drop the in-flight marker set by `claim`."""
+        ...
+
+
+class InMemoryIdempotencyBackend:
+    """Bounded per-process backend.
+
+    Responses and in-flight markers live in this worker only, so with several
+    workers a retry that lands on another worker runs again. Deployments with
+    more than one worker need a shared backend (`set_idempotency_backend`).
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float) -> None:
+        self._cache: TTLCache[StoredResponse] = TTLCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self._pending: TTLCache[bool] = TTLCache(max_entries=max_entries, ttl_seconds=_PENDING_TTL_SECONDS)
+        # Serializes the check + set in claim
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[StoredResponse]:
+        return self._cache.get(key)
+
+    def set(self, key: str, value: StoredResponse, ttl_seconds: float) -> None:
+        self._cache.set(key, value, ttl_seconds=ttl_seconds)
+
+    def claim(self, key: str, ttl_seconds: float) -> bool:
+        with self._lock:
+            if self._pending.get(key) is not None:
+                return False
+            self._pending.set(key, True, ttl_seconds=ttl_seconds)
+            return True
+
+    def release(self, key: str) -> None:
+        self._pending.delete(key)
+
+
+def _fingerprint(payload: Any) -> str:
+    raw = json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(raw).hexdigest()
+
+
+class IdempotencyStore:
+    """Replays stored responses for retried create requests without touching the database."""
+
+    def __init__(self, backend: IdempotencyBackend, ttl_seconds: float) -> None:
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+
+    @staticmethod
+    def _key(user_id: UUID, scope: str, idempotency_key: str) -> str:
+        return f"{user_id}:{scope}:{idempotency_key}"
+
+    def run(
+        self,
+        *,
+        user_id: UUID,
+        scope: str,
+        idempotency_key: Optional[str],
+        payload: Any,
+        fn: Callable[[], T],
+    ) -> T:
+        """Return the stored response for this key, or call `fn` and store its result.
+
+        `payload` is fingerprinted so a key reused for a different request is rejected
+        instead of silently returning an unrelated response. While one request with
+        a key runs `fn`, concurrent duplicates raise IdempotencyKeyInFlight instead
+        of running it a second time.
+        """
+        if not idempotency_key:
+            return fn()
+        key = self._key(user_id, scope, idempotency_key)
+        fingerprint = _fingerprint(payload)
+        stored = self.backend.get(key)
+        if stored is not None:
+            return self._replay(stored, fingerprint)
+        if not self.backend.claim(key, _PENDING_TTL_SECONDS):
+            # The holder may have stored its response since our first look
+            stored = self.backend.get(key)
+            if stored is not None:
+                return self._replay(stored, fingerprint)
+            raise IdempotencyKeyInFlight("A request with this idempotency key is still in progress")
+        try:
+            # A holder that finished between our get and claim has stored its response
+            stored = self.backend.get(key)
+            if stored is not None:
+                return self._replay(stored, fingerprint)
+            result = fn()
+            self.backend.set(key, (fingerprint, result), self.ttl_seconds)
+            return result
+        finally:
+            self.backend.release(key)
+
+    @staticmethod
+    def _replay(stored: StoredResponse, fingerprint: str) -> Any:
+        stored_fingerprint, response = stored
+        if stored_fingerprint != fingerprint:
+            raise IdempotencyKeyReused("Idempotency key was already used with a different request")
+        return response
+
+
+# Module-level singleton holder
+_idempotency_store: Optional[IdempotencyStore] = None
+
+
+def get_idempotency_store() -> IdempotencyStore:
+    """Return the process-wide IdempotencyStore, backed in memory unless replaced."""
+    global _idempotency_store
+    if _idempotency_store is None:
+        backend = InMemoryIdempotencyBackend(
+            max_entries=settings.IDEMPOTENCY_MAX_ENTRIES,
+            ttl_seconds=settings.IDEMPOTENCY_TTL_SECONDS,
+        )
+        _idempotency_store = IdempotencyStore(backend, ttl_seconds=settings.IDEMPOTENCY_TTL_SECONDS)
+    return _idempotency_store
+
+
+def set_idempotency_backend(backend: IdempotencyBackend) -> None:
+    """Swap the storage backend; several workers need one they all share."""
+    global _idempotency_store
+    _idempotency_store = IdempotencyStore(backend, ttl_seconds=settings.IDEMPOTENCY_TTL_SECONDS)
+
+
+__all__ = [
+    "IdempotencyBackend",
+    "IdempotencyKeyInFlight",
+    "IdempotencyKeyReused",
+    "IdempotencyStore",
+    "InMemoryIdempotencyBackend",
+    "get_idempotency_store",
+    "set_idempotency_backend",
+]
@@ -3,6 +3,9 @@ from __future__ import annotations
 from typing import List, Dict, Any
 from uuid import UUID
 import re
+from app.core.replicas import read_only
+from app.models import NetworkCounts, NetworkListResponse
+from .profile_service import ProfileService
 from .supabase import get_supabase_client
 
 class NetworkService:
@@ -114,6 +117,28 @@ class NetworkService:
         data = getattr(sel, "data", None) or []
         return (data[0] if data else payload)
 
+    @read_only
+    def list_network(self, user_id: UUID) -> NetworkListResponse:
+        """Accepted followers and following with profiles, from one connections read."""
+        me = str(user_id)
+        rows = (
+            self.client.table("connections")
+            .select("requester_id,addressee_id")
+            .eq("status", "accepted")
+            .or_(f"requester_id.eq.{me},addressee_id.eq.{me}")
+            .execute()
+        ).data or []
+        follower_ids = [UUID(r["requester_id"]) for r in rows if r["addressee_id"] == me]
+        following_ids = [UUID(r["addressee_id"]) for r in rows if r["requester_id"] == me]
+        profiles = ProfileService().get_profiles_by_ids(set(follower_ids) | set(following_ids))
+        followers = [profiles[u] for u in follower_ids if u in profiles]
+        following = [profiles[u] for u in following_ids if u in profiles]
+        return NetworkListResponse(
+            followers=followers,
+            following=following,
+            counts=NetworkCounts(followers=len(follower_ids), following=len(following_ids)),
+        )
+
     def import_and_follow(self, requester_id: UUID, emails: List[str], phones: List[str]) -> Dict[str, Any]:
         result = self.import_contacts(emails, phones)
         matched = result.get("matches", [])
@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import base64
+from datetime import datetime
+from typing import Tuple
+
+
+class InvalidCursor(ValueError):
+    """A pagination cursor that `decode_cursor` cannot read."""
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """Encode a (created_at, id) keyset position as an opaque URL-safe token."""
+    raw = f"{created_at.isoformat()}|{row_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Decode a token from `encode_cursor`; raises InvalidCursor when malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8")
+        ts, row_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(ts), int(row_id)
+    except Exception as e:
+        raise InvalidCursor("Invalid cursor") from e
+
+
+def keyset_before(created_at: datetime, row_id: int) -> str:
+    """PostgREST `or` filter selecting rows strictly after the cursor in (created_at, id) desc order."""
+    ts = created_at.isoformat()
+    # Quote the timestamp: it contains reserved characters (':' and '.') in PostgREST filters
+    return f'created_at.lt."{ts}",and(created_at.eq."{ts}",id.lt.{row_id})'
+
+
+__all__ = ["InvalidCursor", "encode_cursor", "decode_cursor", "keyset_before"]
@@ -1,10 +1,9 @@
 from __future__ import annotations
 
-from typing import List, Optional
+from typing import Any, Dict, Iterable, List, Optional
 from uuid import UUID
 
-from pydantic import TypeAdapter
-
+from app.core.replicas import read_only
 from app.models import (
     CreatePostRequest,
     PostOut,
@@ -13,6 +12,8 @@ from app.models import (
     ProfileOut,
     PostMediaUpdate,
 )
+from app.models.adapters import PostWithCountsAdapter, PostWithCountsListAdapter
+from .idempotency import get_idempotency_store
 from .supabase import get_supabase_client
 from .profile_service import ProfileService
 
@@ -20,9 +21,10 @@ from .profile_service import ProfileService
 class PostService:
     """Post-related operations with optional atomic challenge creation via RPC."""
 
-    def __init__(self) -> None:
-        self.client = get_supabase_client()
-        self.profiles = ProfileService()
+    def __init__(self, access_token: Optional[str] = None) -> None:
+        # Scoped to the caller for RLS when a token is given
+        self.client = get_supabase_client(access_token)
+        self.profiles = ProfileService(access_token)
 
     def create(self, author_id: UUID, body: CreatePostRequest) -> PostWithCounts:
         """Create a post; optionally create a new challenge atomically using RPC."""
@@ -40,23 +42,71 @@ class PostService:
             # Do not allow setting media on initial create; require presign + upload + PATCH
             "p_media_url": None,
         }
+        return get_idempotency_store().run(
+            user_id=author_id,
+            scope="post",
+            idempotency_key=body.idempotency_key,
+            payload=params,
+            fn=lambda: self._create_rpc(params),
+        )
+
+    def _create_rpc(self, params: dict) -> PostWithCounts:
         resp = self.client.rpc("create_post_with_optional_challenge", params).execute()
         row = (resp.data or [])[0] if isinstance(resp.data, list) else resp.data
-        return TypeAdapter(PostWithCounts).validate_python(row)
+        return PostWithCountsAdapter.validate_python(row)
 
-    def get(self, post_id: int) -> PostFull:
-        """Get a single post with aggregates and author profile."""
+    def get_row(self, post_id: int) -> Dict[str, Any]:
+        """Return the raw `posts_with_counts` row for a post the client may read."""
+        # posts_with_counts is not security_invoker, so visibility is decided on posts first
+        visible = self.client.table("posts").select("id").eq("id", post_id).limit(1).execute()
+        if not (visible.data or []):
+            raise ValueError("Post not found")
         resp = (
             self.client.table("posts_with_counts").select("*").eq("id", post_id).limit(1).execute()
         )
         row = ((resp.data or []) or [None])[0]
         if not row:
             raise ValueError("Post not found")
-        post = TypeAdapter(PostWithCounts).validate_python(row)
+        return row
+
+    def get(self, post_id: int, row: Optional[Dict[str, Any]] = None) -> PostFull:
+        """Get a single post with aggregates and author profile; pass `row` to reuse a fetched row."""
+        if row is None:
+            row = self.get_row(post_id)
+        post = PostWithCountsAdapter.validate_python(row)
         # Hydrate author profile
         profiles = self.profiles.get_profiles_by_ids([post.author_id])
         return PostFull(**post.model_dump(), author_profile=profiles.get(post.author_id))
 
+    @read_only
+    def get_many(self, post_ids: Iterable[int]) -> Dict[int, PostFull]:
+        """Batch variant of `get`: a fixed number of reads regardless of how many ids.
+
+        Only posts the client may read through RLS on `posts` are returned; authors
+        are hydrated through the same client.
+        """
+        ids = sorted(set(post_ids))
+        if not ids:
+            return {}
+        # posts_with_counts is not security_invoker, so visibility is decided on posts first
+        visible = self.client.table("posts").select("id").in_("id", ids).execute().data or []
+        if not visible:
+            return {}
+        rows = (
+            self.client.table("posts_with_counts")
+            .select("*")
+            .in_("id", [r["id"] for r in visible])
+            .execute()
+            .data
+            or []
+        )
+        posts = PostWithCountsListAdapter.validate_python(rows)
+        profiles = self.profiles.get_profiles_by_ids({p.author_id for p in posts})
+        return {
+            p.id: PostFull(**p.model_dump(), author_profile=profiles.get(p.author_id))
+            for p in posts
+        }
+
     def delete(self, author_id: UUID, post_id: int) -> None:
         """Author-only delete (RLS enforces)."""
         # RLS policy posts_author_delete ensures only author can delete.
@@ -75,4 +125,4 @@ class PostService:
             self.client.table("posts_with_counts").select("*").eq("id", post_id).limit(1).execute()
         )
         prow = ((pwc.data or []) or [None])[0]
-        return TypeAdapter(PostWithCounts).validate_python(prow)
+        return PostWithCountsAdapter.validate_python(prow)
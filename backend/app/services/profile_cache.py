@@ -0,0 +1,60 @@
+"""
+Profile cache: ProfileOut by user id, in a TieredCache (app.core.cache).
+
+Profiles are read on most requests (/me, post author and committer hydration,
+network lists) and rarely change. Entries are stamped with the row's
+`updated_at`:
+- API writes (PATCH /me, POST /profiles, `upsert_profile`) store the row they
+  read back.
+- Changes made anywhere else arrive as `profiles` NOTIFY payloads and evict the
+  user's entry (app.core.invalidation).
+
+Cached rows are only served where the caller may see the row: their own
+profile, and hydration of rows that already passed RLS. RLS-scoped reads made
+with the caller's token (e.g. /profiles/batch) skip the lookup; they still
+store the rows they fetch.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Optional
+
+from app.core.cache import TieredCache, get_shared_cache_backend
+from app.core.config import settings
+from app.core.invalidation import get_invalidation_bus, payload_user_ids
+from app.models import ProfileOut
+from app.models.adapters import ProfileOutAdapter
+
+
+def profile_version(profile: ProfileOut) -> int:
+    """Version stamp of a profile: `updated_at` in microseconds."""
+    return int(profile.updated_at.timestamp() * 1_000_000)
+
+
+# Module-level singleton holder
+_cache: Optional[TieredCache[ProfileOut]] = None
+_cache_lock = threading.Lock()
+
+
+def get_profile_cache() -> Optional[TieredCache[ProfileOut]]:
+    """Return the process-wide profile cache, or None when PROFILE_CACHE_ENABLED is off."""
+    global _cache
+    if not settings.PROFILE_CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = TieredCache(
+                "profiles",
+                max_entries=settings.PROFILE_CACHE_MAX_ENTRIES,
+                local_ttl_seconds=settings.PROFILE_CACHE_TTL_SECONDS,
+                encode=ProfileOutAdapter.dump_json,
+                decode=ProfileOutAdapter.validate_json,
+                shared=get_shared_cache_backend(),
+                shared_ttl_seconds=settings.PROFILE_CACHE_SHARED_TTL_SECONDS,
+            )
+            get_invalidation_bus().evict_on("profiles", _cache, payload_user_ids)
+        return _cache
+
+
+__all__ = ["get_profile_cache", "profile_version"]
@@ -3,36 +3,59 @@ from __future__ import annotations
 from typing import Dict, Iterable, List, Optional
 from uuid import UUID
 
-from pydantic import TypeAdapter
-
 from app.models import ProfileOut
+from app.models.adapters import (
+    ProfileOutAdapter,
+    ProfileOutListAdapter,
+)
+from .profile_cache import get_profile_cache, profile_version
 from .supabase import get_supabase_client
+from .username_index import get_username_index
 
 
 class ProfileService:
     """Profile-related helpers using Supabase.
 
     This service reads from public.profiles and parses into Pydantic models.
+    Reads go through the profile cache unless the service is scoped to a
+    caller's token (see app.services.profile_cache).
     """
 
-    def __init__(self) -> None:
-        self.client = get_supabase_client()
+    def __init__(self, access_token: Optional[str] = None) -> None:
+        # Scoped to the caller for RLS when a token is given
+        self.client = get_supabase_client(access_token)
+        self.cache = get_profile_cache()
+        self.usernames = get_username_index()
+        # RLS decides what a scoped caller sees, so cached rows are not served to it
+        self._scoped = bool(access_token)
 
     def get_profiles_by_ids(self, user_ids: Iterable[UUID]) -> Dict[UUID, ProfileOut]:
         """Fetch profiles for a set of user IDs and return a dict keyed by user_id."""
-        ids: List[str] = [str(uid) for uid in user_ids]
+        ids: List[str] = list(dict.fromkeys(str(uid) for uid in user_ids))
         if not ids:
             return {}
+        cached = self.cache.get_many(ids) if self.cache is not None and not self._scoped else {}
+        found = {p.user_id: p for p in cached.values()}
+        missing = [uid for uid in ids if uid not in cached]
+        if not missing:
+            return found
         resp = (
             self.client.table("profiles")
             .select("*")
-            .in_("user_id", ids)
+            .in_("user_id", missing)
             .execute()
         )
         rows = resp.data or []
-        adapter = TypeAdapter(list[ProfileOut])
+        adapter = ProfileOutListAdapter
         profiles = adapter.validate_python(rows)
-        return {p.user_id: p for p in profiles}
+        if self.cache is not None:
+            self.cache.set_many({str(p.user_id): (profile_version(p), p) for p in profiles})
+        found.update((p.user_id, p) for p in profiles)
+        return found
+
+    def get_profile(self, user_id: UUID) -> Optional[ProfileOut]:
+        """One profile by user ID, or None when it does not exist (or is hidden)."""
+        return self.get_profiles_by_ids([user_id]).get(user_id)
 
     def upsert_profile(
         self,
@@ -75,6 +98,12 @@ class ProfileService:
         )
         rows = getattr(fetch, "data", None) or []
         row = rows[0] if isinstance(rows, list) and rows else None
-        adapter = TypeAdapter(ProfileOut)
-        return adapter.validate_python(row)
+        adapter = ProfileOutAdapter
+        profile = adapter.validate_python(row)
+        # Write-through; the version stamp keeps a concurrent stale read from replacing it
+        if self.cache is not None:
+            self.cache.set(str(profile.user_id), profile_version(profile), profile)
+        if self.usernames is not None:
+            self.usernames.put(str(profile.user_id), profile.username)
+        return profile
 
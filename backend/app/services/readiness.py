@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+import urllib.request
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional
+
+import anyio.to_thread
+
+from app.core.config import settings
+from app.core.metrics import HTTP_IN_FLIGHT, HTTP_STREAMS_OPEN, LOOP_LAG_LAST
+from .supabase import get_supabase_client
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ProbeResult:
+    ok: bool = False
+    latency_ms: Optional[float] = None
+    checked_at: Optional[float] = None
+    consecutive_failures: int = 0
+    error: Optional[str] = None
+
+
+class ReadinessMonitor:
+    """Periodically probes PostgREST and Supabase Auth and caches the outcome.
+
+    `/ready` only reads the cached results plus in-process gauges, so health
+    checks never trigger upstream calls. The probes run in the default thread
+    pool; if that pool is saturated they go stale, which also reads as unready.
+    """
+
+    def __init__(self, interval_seconds: float, timeout_seconds: float) -> None:
+        self.interval_seconds = interval_seconds
+        self.timeout_seconds = timeout_seconds
+        self.postgrest = ProbeResult()
+        self.auth = ProbeResult()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.gather(
+                self._probe(self.postgrest, _probe_postgrest),
+                self._probe(self.auth, _probe_auth),
+            )
+            await asyncio.sleep(self.interval_seconds)
+
+    async def _probe(self, result: ProbeResult, fn) -> None:
+        started = time.perf_counter()
+        was_failing = result.consecutive_failures >= settings.READY_PROBE_FAILURES
+        try:
+            await asyncio.wait_for(asyncio.to_thread(fn, self.timeout_seconds), self.timeout_seconds)
+            result.ok, result.error, result.consecutive_failures = True, None, 0
+        except asyncio.TimeoutError:
+            result.ok, result.error = False, "timeout"
+            result.consecutive_failures += 1
+        except Exception as e:
+            result.ok, result.error = False, f"{type(e).__name__}: {e}"[:200]
+            result.consecutive_failures += 1
+        result.latency_ms = round((time.perf_counter() - started) * 1000, 1)
+        result.checked_at = time.time()
+        # Log transitions only, not every failed probe
+        if result.consecutive_failures == settings.READY_PROBE_FAILURES:
+            logger.warning("readiness probe %s failing: %s", fn.__name__, result.error)
+        elif was_failing and result.ok:
+            logger.info("readiness probe %s recovered", fn.__name__)
+
+    def report(self) -> Dict[str, Any]:
+        """Current readiness verdict from cached probe results and local gauges."""
+        now = time.time()
+        reasons: List[str] = []
+
+        def probe_view(name: str, r: ProbeResult) -> Dict[str, Any]:
+            age = None if r.checked_at is None else round(now - r.checked_at, 1)
+            if r.checked_at is None:
+                reasons.append(f"{name}: not probed yet")
+            elif age > settings.READY_MAX_PROBE_AGE_SECONDS:
+                reasons.append(f"{name}: last probe {age}s ago")
+            elif r.consecutive_failures >= settings.READY_PROBE_FAILURES:
+                reasons.append(f"{name}: {r.error}")
+            return {**asdict(r), "age_seconds": age}
+
+        checks: Dict[str, Any] = {
+            "postgrest": probe_view("postgrest", self.postgrest),
+            "auth": probe_view("auth", self.auth),
+        }
+
+        lag_ms = round(LOOP_LAG_LAST.value() * 1000, 1)
+        checks["event_loop_lag_ms"] = lag_ms
+        if lag_ms > settings.READY_MAX_LOOP_LAG_MS:
+            reasons.append(f"event loop lag {lag_ms}ms")
+
+        if settings.METRICS_ENABLED:
+            # Exclude the readiness request itself and open streams, which idle for
+            # as long as their clients stay connected
+            streams = int(HTTP_STREAMS_OPEN.value())
+            in_flight = max(0, int(HTTP_IN_FLIGHT.value()) - streams - 1)
+            checks["in_flight"] = in_flight
+            checks["streams_open"] = streams
+            if settings.READY_MAX_IN_FLIGHT and in_flight > settings.READY_MAX_IN_FLIGHT:
+                reasons.append(f"{in_flight} requests in flight")
+
+        pools = _thread_pools()
+        checks["thread_pools"] = pools
+        for name, p in pools.items():
+            if p.get("queued", 0) > settings.READY_MAX_POOL_QUEUE:
+                reasons.append(f"{name} pool has {p['queued']} queued tasks")
+            elif p.get("waiting", 0) > settings.READY_MAX_POOL_QUEUE:
+                reasons.append(f"{name} pool has {p['waiting']} waiting tasks")
+
+        return {"ready": not reasons, "reasons": reasons, "checks": checks}
+
+
+def _probe_postgrest(timeout: float) -> None:
+    # One indexed row through the shared client: exercises DNS, TLS, pooling and PostgREST
+    get_supabase_client().table("challenges").select("id").limit(1).execute()
+
+
+def _probe_auth(timeout: float) -> None:
+    key = settings.SUPABASE_SERVICE_ROLE_KEY or settings.SUPABASE_KEY
+    req = urllib.request.Request(f"{settings.SUPABASE_URL}/auth/v1/health")
+    req.add_header("apikey", key)
+    with urllib.request.urlopen(req, timeout=timeout) as resp:
+        json.loads(resp.read().decode("utf-8") or "{}")
+
+
+def _thread_pools() -> Dict[str, Dict[str, int]]:
+    """Occupancy of the asyncio default executor and anyio's threadpool (sync deps/routes)."""
+    pools: Dict[str, Dict[str, int]] = {}
+    loop = asyncio.get_running_loop()
+    executor = getattr(loop, "_default_executor", None)
+    if executor is not None:
+        pools["asyncio"] = {
+            "max_workers": executor._max_workers,
+            "threads": len(executor._threads),
+            "queued": executor._work_queue.qsize(),
+        }
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    pools["anyio"] = {
+        "max_workers": int(limiter.total_tokens),
+        "busy": limiter.borrowed_tokens,
+        "waiting": limiter.statistics().tasks_waiting,
+    }
+    return pools
+
+
+# Module-level singleton holder
+_monitor: Optional[ReadinessMonitor] = None
+
+
+def get_readiness_monitor() -> ReadinessMonitor:
+    """Return the process-wide ReadinessMonitor."""
+    global _monitor
+    if _monitor is None:
+        _monitor = ReadinessMonitor(
+            interval_seconds=settings.READY_PROBE_INTERVAL_SECONDS,
+            timeout_seconds=settings.READY_PROBE_TIMEOUT_SECONDS,
+        )
+    return _monitor
+
+
+__all__ = ["ReadinessMonitor", "get_readiness_monitor"]
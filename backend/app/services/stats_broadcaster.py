@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Set
+
+from app.core.config import settings
+from app.core.invalidation import FLUSH, get_invalidation_bus
+from app.models import ChallengeStats
+from app.models.adapters import ChallengeStatsListAdapter
+from .supabase import get_supabase_client
+
+logger = logging.getLogger(__name__)
+
+
+class StatsSubscription:
+    """One client's view of the broadcaster: latest stats per challenge, coalesced."""
+
+    def __init__(self, challenge_ids: Set[int]) -> None:
+        self.challenge_ids = challenge_ids
+        self._pending: Dict[int, ChallengeStats] = {}
+        self._event = asyncio.Event()
+
+    def offer(self, stats: ChallengeStats) -> None:
+        # Overwrite rather than queue: a slow client only ever sees the newest counters.
+        self._pending[stats.challenge_id] = stats
+        self._event.set()
+
+    async def next_batch(self, timeout: float) -> List[ChallengeStats]:
+        """Wait up to `timeout` seconds for updates; an empty list means nothing changed."""
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout)
+        except asyncio.TimeoutError:
+            return []
+        self._event.clear()
+        batch, self._pending = list(self._pending.values()), {}
+        return batch
+
+
+class StatsBroadcaster:
+    """Fans challenge counter updates out to all stream subscribers in this process.
+
+    Updates come from the commitment write path (`publish`) or from ids marked stale
+    (`mark_dirty`, e.g. by cross-worker notifications). Every tick the broadcaster
+    resolves all stale ids with one batched `challenge_stats` read and delivers only
+    counters that changed, so cost scales with watched challenges, not watchers.
+    Watched ids are also refreshed every `refresh_seconds` to catch writes made by
+    other workers.
+    """
+
+    def __init__(self, tick_seconds: float, refresh_seconds: float) -> None:
+        self.tick_seconds = tick_seconds
+        self.refresh_seconds = refresh_seconds
+        self._subscribers: Dict[int, Set[StatsSubscription]] = {}
+        self._last: Dict[int, ChallengeStats] = {}
+        self._published: Dict[int, ChallengeStats] = {}
+        self._dirty: Set[int] = set()
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._last_refresh = 0.0
+
+    # ---- producers (may be called from worker threads) ----
+    def publish(self, stats: ChallengeStats) -> None:
+        with self._lock:
+            self._published[stats.challenge_id] = stats
+
+    def mark_dirty(self, challenge_ids: Iterable[int]) -> None:
+        with self._lock:
+            self._dirty.update(challenge_ids)
+
+    # ---- consumers ----
+    def subscribe(self, challenge_ids: Iterable[int]) -> StatsSubscription:
+        sub = StatsSubscription(set(challenge_ids))
+        unknown: List[int] = []
+        for cid in sub.challenge_ids:
+            self._subscribers.setdefault(cid, set()).add(sub)
+            if cid in self._last:
+                sub.offer(self._last[cid])
+            else:
+                unknown.append(cid)
+        # First watcher of a challenge: fetch a snapshot on the next tick
+        self.mark_dirty(unknown)
+        self._ensure_running()
+        return sub
+
+    def unsubscribe(self, sub: StatsSubscription) -> None:
+        for cid in sub.challenge_ids:
+            watchers = self._subscribers.get(cid)
+            if not watchers:
+                continue
+            watchers.discard(sub)
+            if not watchers:
+                del self._subscribers[cid]
+                self._last.pop(cid, None)
+
+    def on_invalidation(self, payload: dict) -> None:
+        """InvalidationBus handler: a commitment changed somewhere, re-read its challenge."""
+        if payload.get("t") == FLUSH:
+            self.mark_dirty(list(self._subscribers))
+        elif payload.get("c") is not None:
+            self.mark_dirty([int(payload["c"])])
+
+    def watched_count(self) -> int:
+        return len(self._subscribers)
+
+    # ---- tick loop ----
+    def _ensure_running(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self) -> None:
+        while self._subscribers:
+            try:
+                await self._tick()
+            except Exception:
+                logger.exception("stats broadcaster tick failed")
+            await asyncio.sleep(self.tick_seconds)
+
+    async def _tick(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            published, self._published = self._published, {}
+            dirty, self._dirty = self._dirty, set()
+        if now - self._last_refresh >= self.refresh_seconds:
+            dirty.update(self._subscribers)
+            self._last_refresh = now
+
+        updates: Dict[int, ChallengeStats] = {cid: s for cid, s in published.items() if cid in self._subscribers}
+        to_read = sorted(cid for cid in dirty if cid in self._subscribers and cid not in updates)
+        if to_read:
+            for s in await asyncio.to_thread(_read_stats, to_read):
+                updates[s.challenge_id] = s
+
+        for cid, stats in updates.items():
+            if self._last.get(cid) == stats:
+                continue
+            self._last[cid] = stats
+            for sub in self._subscribers.get(cid, ()):
+                sub.offer(stats)
+
+
+def _read_stats(challenge_ids: List[int]) -> List[ChallengeStats]:
+    client = get_supabase_client()
+    rows = client.table("challenge_stats").select("*").in_("challenge_id", challenge_ids).execute().data or []
+    return ChallengeStatsListAdapter.validate_python(rows)
+
+
+# Module-level singleton holder
+_broadcaster: Optional[StatsBroadcaster] = None
+
+
+def get_stats_broadcaster() -> StatsBroadcaster:
+    """Return the process-wide StatsBroadcaster."""
+    global _broadcaster
+    if _broadcaster is None:
+        _broadcaster = StatsBroadcaster(
+            tick_seconds=settings.STATS_STREAM_TICK_SECONDS,
+            refresh_seconds=settings.STATS_STREAM_REFRESH_SECONDS,
+        )
+        get_invalidation_bus().subscribe("commitments", _broadcaster.on_invalidation)
+    return _broadcaster
+
+
+__all__ = ["StatsBroadcaster", "StatsSubscription", "get_stats_broadcaster"]
@@ -1,8 +1,181 @@
-from typing import Optional
+from __future__ import annotations
 
-from supabase import Client, create_client
+import copy
+import logging
+import time
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+import httpx
+from postgrest.exceptions import APIError
 
 from app.core.config import settings
+from app.core.metrics import REPLICA_READS, record_upstream_call
+from app.core.replicas import ReplicaRouter, get_replica_router
+from app.core.resilience import UpstreamUnavailable, get_upstream_policy
+
+if TYPE_CHECKING:
+    from supabase import Client
+
+logger = logging.getLogger(__name__)
+
+# Builder methods that decide the HTTP operation of a table query
+_OPERATIONS = frozenset({"select", "insert", "update", "upsert", "delete"})
+
+
+def _csv(value: str) -> frozenset:
+    return frozenset(v.strip() for v in value.split(",") if v.strip())
+
+
+# RPCs that only read and may be retried / hedged like selects
+_READ_RPCS = _csv(settings.UPSTREAM_READ_RPCS)
+_HEDGED = _csv(settings.UPSTREAM_HEDGED_TARGETS)
+
+
+class _TracedQuery:
+    """Wraps a postgrest request builder; `execute()` goes through the upstream policy.
+
+    Every builder method is forwarded; results that are themselves builders are
+    wrapped again so filters chained after `select()` stay traced. Each attempt
+    (retries and hedges included) is recorded in app.core.metrics. With read
+    replicas configured, eligible reads try a replica first (app.core.replicas).
+    """
+
+    __slots__ = ("_inner", "_target", "_operation", "_owner")
+
+    def __init__(self, inner: Any, target: str, operation: str, owner: "InstrumentedClient") -> None:
+        self._inner = inner
+        self._target = target
+        self._operation = operation
+        self._owner = owner
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._inner, name)
+        if name == "execute":
+            return self._execute
+        if not callable(attr):
+            # e.g. the `not_` property returns a builder
+            return _TracedQuery(attr, self._target, self._operation, self._owner) if hasattr(attr, "execute") else attr
+        # A write followed by select() (return=representation) is still a write
+        operation = name if name in _OPERATIONS and self._operation == "select" else self._operation
+
+        def call(*args: Any, **kwargs: Any) -> Any:
+            result = attr(*args, **kwargs)
+            if not hasattr(result, "execute"):
+                return result
+            self._owner.authorize(result)
+            return _TracedQuery(result, self._target, operation, self._owner)
+
+        return call
+
+    def _execute(self) -> Any:
+        idempotent = self._operation == "select" or (self._operation == "rpc" and self._target in _READ_RPCS)
+        router = self._owner.router
+        if router is not None:
+            if not idempotent:
+                router.note_write()
+            else:
+                replica = router.pick()
+                query = self._owner.on_replica(self._inner, replica) if replica is not None else None
+                if query is not None:
+                    name = router.names[replica]  # type: ignore[index]
+                    try:
+                        # One attempt: on failure the primary (with its retries) is faster than backing off here
+                        result = get_upstream_policy(name).call(lambda: self._attempt(query), idempotent=False)
+                        REPLICA_READS.inc(name, "ok")
+                        return result
+                    except UpstreamUnavailable as e:
+                        REPLICA_READS.inc(name, "fallback")
+                        logger.info("%s read of %s failed over to the primary: %s", name, self._target, e)
+        return get_upstream_policy("postgrest").call(
+            lambda: self._attempt(self._inner), idempotent=idempotent, hedge=self._target in _HEDGED
+        )
+
+    def _attempt(self, query: Any) -> Any:
+        if not settings.METRICS_ENABLED:
+            return query.execute()
+        started = time.perf_counter()
+        status = "ok"
+        rows: Optional[int] = None
+        try:
+            resp = query.execute()
+            data = getattr(resp, "data", None)
+            rows = len(data) if isinstance(data, list) else (0 if data is None else 1)
+            return resp
+        except APIError as e:
+            status = str(e.code or "error")
+            raise
+        except Exception:
+            status = "error"
+            raise
+        finally:
+            record_upstream_call(self._target, self._operation, status, time.perf_counter() - started, rows)
+
+
+class InstrumentedClient:
+    """Supabase client proxy adding metrics and failure handling to PostgREST calls.
+
+    `table()`, `from_()` and `rpc()` return traced builders; everything else
+    (auth, storage, postgrest) is the underlying client's attribute.
+
+    The shared client always runs as the configured key. `scoped(token)` gives a
+    view whose queries run as a caller (RLS): the token is set on each query's
+    own headers, never on the shared session, so concurrent requests (threads,
+    hedges, replica copies) cannot pick up each other's token.
+    """
+
+    def __init__(self, client: Client, router: Optional[ReplicaRouter] = None) -> None:
+        self._client = client
+        self.router = router
+        self._replica_sessions: Dict[int, httpx.Client] = {}
+        self._authorization: Optional[str] = None
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._client, name)
+
+    def scoped(self, access_token: str) -> "InstrumentedClient":
+        """View of this client whose PostgREST queries carry `access_token`."""
+        # Shares the client, router and replica sessions; copy.copy would recurse via __getattr__
+        view = object.__new__(InstrumentedClient)
+        view.__dict__.update(self.__dict__, _authorization=f"Bearer {access_token}")
+        return view
+
+    def authorize(self, builder: Any) -> None:
+        # postgrest-py sends the builder's headers over the session's, per request
+        if self._authorization is not None and hasattr(builder, "headers"):
+            builder.headers["Authorization"] = self._authorization
+
+    def table(self, table_name: str) -> Any:
+        return _TracedQuery(self._client.table(table_name), table_name, "select", self)
+
+    def from_(self, table_name: str) -> Any:
+        return _TracedQuery(self._client.from_(table_name), table_name, "select", self)
+
+    def rpc(self, fn: str, *args: Any, **kwargs: Any) -> Any:
+        builder = self._client.rpc(fn, *args, **kwargs)
+        self.authorize(builder)
+        return _TracedQuery(builder, fn, "rpc", self)
+
+    def on_replica(self, query: Any, replica: int) -> Optional[Any]:
+        """Copy of a built query that runs against `replica`, as the same caller.
+
+        None when the builder does not expose its session (e.g. a stand-in client).
+        """
+        primary = getattr(query, "session", None)
+        if not isinstance(primary, httpx.Client) or not hasattr(query, "headers") or self.router is None:
+            return None
+        session = self._replica_sessions.get(replica)
+        if session is None:
+            session = self._replica_sessions[replica] = httpx.Client(
+                base_url=f"{self.router.urls[replica]}/rest/v1",
+                headers=primary.headers,
+                timeout=primary.timeout,
+            )
+        routed = copy.copy(query)
+        routed.session = session
+        # The builder's own headers, captured when the query was built. A scoped query carries
+        # its caller's Authorization there; otherwise the replica session's key applies
+        routed.headers = httpx.Headers(query.headers)
+        return routed
 
 
 class SupabaseService:
@@ -11,18 +184,30 @@ class SupabaseService:
     configuration issues surface when the client is actually needed.
     """
 
-    def __init__(self, supabase_url: str, supabase_key: str) -> None:
+    def __init__(self, supabase_url: str, supabase_key: str, service_role: bool = False) -> None:
         if not supabase_url or not supabase_key:
             raise ValueError("SUPABASE_URL and a key must be provided")
         self._supabase_url: str = supabase_url
         self._supabase_key: str = supabase_key
+        # Whether unscoped queries bypass RLS (service role key) or see only public rows (anon key)
+        self.service_role = service_role
         self._client: Optional[Client] = None
 
     def get_client(self) -> Client:
-        """Return the Supabase client, creating it on first access."""
+        """Return the Supabase client, creating it on first access.
+
+        The client is wrapped in InstrumentedClient (metrics, retries, circuit
+        breaker, hedging); services use it exactly like a plain Client.
+        """
         if self._client is None:
-            self._client = create_client(self._supabase_url, self._supabase_key)
-        return self._client
+            # The SDK also imports its realtime, storage and auth clients (~150 ms). Deferred so
+            # processes that never build a real one skip it; servers build it in startup warm-up
+            from supabase import ClientOptions, create_client
+
+            options = ClientOptions(postgrest_client_timeout=settings.UPSTREAM_TIMEOUT_SECONDS)
+            client = create_client(self._supabase_url, self._supabase_key, options=options)
+            self._client = InstrumentedClient(client, get_replica_router())  # type: ignore[assignment]
+        return self._client  # type: ignore[return-value]
 
 
 # Module-level singleton holder
@@ -38,19 +223,51 @@ def get_supabase_service() -> SupabaseService:
     global _supabase_service
     if _supabase_service is None:
         key = settings.SUPABASE_SERVICE_ROLE_KEY or settings.SUPABASE_KEY
-        _supabase_service = SupabaseService(settings.SUPABASE_URL, key)
+        _supabase_service = SupabaseService(settings.SUPABASE_URL, key, service_role=bool(settings.SUPABASE_SERVICE_ROLE_KEY))
     return _supabase_service
 
 
-def get_supabase_client() -> Client:
-    """Convenience accessor to the singleton Supabase client."""
-    return get_supabase_service().get_client()
+def get_supabase_client(access_token: Optional[str] = None) -> Client:
+    """Convenience accessor to the singleton Supabase client.
+
+    With `access_token`, a view whose queries run as that caller (RLS); the
+    shared client itself is never switched to a user's token.
+    """
+    client = get_supabase_service().get_client()
+    return client.scoped(access_token) if access_token else client  # type: ignore[attr-defined]
+
+
+def get_service_client() -> Client:
+    """The shared client, for reads that must see every row (e.g. app.services.username_index).
+
+    Raises RuntimeError when only the anon key is configured: RLS would return a
+    partial view that looks complete.
+    """
+    service = get_supabase_service()
+    if not service.service_role:
+        raise RuntimeError("SUPABASE_SERVICE_ROLE_KEY is not set")
+    return service.get_client()
+
+
+def set_supabase_client(client: Any) -> None:
+    """Serve `get_supabase_client()` from `client` instead of a real connection.
+
+    Used by the benchmarks' in-memory stand-in; the client is wrapped in
+    InstrumentedClient like a real one, so metrics and policies still apply.
+    Without a token the stand-in acts as the service role.
+    """
+    service = get_supabase_service()
+    service._client = InstrumentedClient(client)  # type: ignore[assignment]
+    service.service_role = True
 
 
 __all__ = [
+    "InstrumentedClient",
     "SupabaseService",
     "get_supabase_service",
     "get_supabase_client",
+    "get_service_client",
+    "set_supabase_client",
 ]
 
 
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import base64
+from typing import Any, Dict, List, Optional, Set, Tuple
+from uuid import UUID
+
+from app.models import SyncResponse
+from app.models.adapters import (
+    ChallengeStatsListAdapter,
+    CommitmentOutListAdapter,
+    ConnectionOutListAdapter,
+    PostWithCountsListAdapter,
+)
+from .supabase import get_supabase_client
+
+_TOKEN_PREFIX = "v2:"
+# Tokens holding a bare change_log id; they get a full resync
+_LEGACY_PREFIX = "v1:"
+
+
+def encode_sync_token(xid: int, change_id: int = 0) -> str:
+    """Token for the change_log position (xid, id): changes after it come next."""
+    raw = f"{_TOKEN_PREFIX}{xid}:{change_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_sync_token(token: str) -> Optional[Tuple[int, int]]:
+    """Decode a token from `encode_sync_token`; None for a legacy token, ValueError when malformed."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8")
+        if raw.startswith(_LEGACY_PREFIX):
+            int(raw[len(_LEGACY_PREFIX):])
+            return None
+        if not raw.startswith(_TOKEN_PREFIX):
+            raise ValueError(raw)
+        xid, change_id = raw[len(_TOKEN_PREFIX):].split(":")
+        return int(xid), int(change_id)
+    except Exception as e:
+        raise ValueError("Invalid sync token") from e
+
+
+def _split(changes: List[Dict[str, Any]], entity: str) -> Tuple[List[int], List[int]]:
+    """Collapse a run of changes into (ids to re-read, ids deleted), latest op wins."""
+    last_op: Dict[int, str] = {}
+    for c in changes:
+        if c["entity"] == entity:
+            last_op[c["entity_id"]] = c["op"]
+    live = [i for i, op in last_op.items() if op != "D"]
+    deleted = [i for i, op in last_op.items() if op == "D"]
+    return live, deleted
+
+
+class SyncService:
+    """Delta sync over `public.change_log`, with the caller's token for RLS."""
+
+    def __init__(self, access_token: str) -> None:
+        self.client = get_supabase_client(access_token)
+
+    def changes_since(self, user_id: UUID, token: Optional[str], limit: int = 500) -> SyncResponse:
+        """Return changes after `token` visible to the caller.
+
+        Commitments are reported for the caller only (mirroring /commitments/me); other
+        users' commitments surface as `challenge_stats` updates for the affected challenges.
+
+        Changes are ordered by writing transaction, and `head` is the oldest transaction
+        still running when the RPC read the log. Everything before it has committed or
+        aborted, so advancing the token to the head cannot skip a late commit; changes of
+        newer transactions wait for the next sync.
+        """
+        after = decode_sync_token(token) if token else None
+        params = {"p_after_xid": after[0] if after else None, "p_after_id": after[1] if after else 0, "p_limit": limit}
+        resp = self.client.rpc("changes_since", params).execute()
+        data = resp.data or {}
+        head = int(data.get("head") or 0)
+        pruned = data.get("pruned")
+        # No (current) token, or rows after it were pruned: the client must reload in full.
+        if after is None or (pruned is not None and after[0] <= int(pruned)):
+            return SyncResponse(next_token=encode_sync_token(head), reset=True)
+
+        changes: List[Dict[str, Any]] = data.get("changes") or []
+        has_more = len(changes) > limit
+        changes = changes[:limit]
+        if has_more:
+            position = (int(changes[-1]["xid"]), int(changes[-1]["id"]))
+        elif head > after[0]:
+            # Rows below the head the caller cannot see are skipped with it
+            position = (head, 0)
+        else:
+            position = after
+
+        out = SyncResponse(next_token=encode_sync_token(*position), has_more=has_more)
+        post_ids, out.deleted_post_ids = _split(changes, "post")
+        own = [c for c in changes if c["entity"] == "commitment" and c["actor_id"] == str(user_id)]
+        commitment_ids, out.deleted_commitment_ids = _split(own, "commitment")
+        connection_ids, out.deleted_connection_ids = _split(changes, "connection")
+
+        # Re-read current rows; RLS drops anything no longer visible. posts_with_counts and
+        # challenge_stats are not security_invoker, so their ids are checked on the tables first.
+        if post_ids:
+            post_ids = self._visible_ids("posts", "id", post_ids)
+        if post_ids:
+            rows = self.client.table("posts_with_counts").select("*").in_("id", post_ids).execute().data or []
+            out.posts = PostWithCountsListAdapter.validate_python(rows)
+        if commitment_ids:
+            rows = self.client.table("commitments").select("*").in_("id", commitment_ids).execute().data or []
+            out.commitments = CommitmentOutListAdapter.validate_python(rows)
+        challenge_ids: Set[int] = {c["challenge_id"] for c in changes if c["entity"] == "commitment" and c.get("challenge_id")}
+        visible_challenges = self._visible_ids("challenges", "id", sorted(challenge_ids)) if challenge_ids else []
+        if visible_challenges:
+            rows = (
+                self.client.table("challenge_stats").select("*").in_("challenge_id", visible_challenges).execute().data
+                or []
+            )
+            out.challenge_stats = ChallengeStatsListAdapter.validate_python(rows)
+        if connection_ids:
+            rows = self.client.table("connections").select("*").in_("id", connection_ids).execute().data or []
+            out.connections = ConnectionOutListAdapter.validate_python(rows)
+        return out
+
+    def _visible_ids(self, table: str, column: str, ids: List[Any]) -> List[Any]:
+        """The subset of `ids` the caller can read from `table` under RLS."""
+        rows = self.client.table(table).select(column).in_(column, ids).execute().data or []
+        return [r[column] for r in rows]
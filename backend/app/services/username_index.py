@@ -0,0 +1,328 @@
+"""
+Username index: prefix search and availability checks without a database read.
+
+Each worker holds every `profiles.username` in memory:
+- a sorted array of `(casefolded, exact)` names, searched with bisect; the names
+  starting with a prefix are one contiguous run
+- a Bloom filter of the exact names. Most names checked while typing are free,
+  and the filter answers those with a few hashes; a hit is confirmed with a
+  bisect lookup, so answers are exact for what the index holds.
+
+The index is loaded from PostgREST in keyset pages when the worker starts (on a
+replica when configured) and reloaded every USERNAME_INDEX_REFRESH_SECONDS.
+Between reloads:
+- `ProfileService.upsert_profile` applies this worker's writes immediately
+- `profiles` NOTIFYs (with DATABASE_URL) queue the changed users, whose rows are
+  read again from the primary
+
+Availability is advisory: `profiles.username` stays unique in Postgres, and a
+write can still lose a race for a name reported as free. Loading reads through
+`get_service_client()`, the shared client that is never scoped to a caller.
+It needs the service role key: with the anon key RLS would hide other users'
+rows and free names would be reported for taken ones, so the load fails
+instead and the routes answer 503.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import math
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.core.invalidation import FLUSH, Payload, get_invalidation_bus, payload_user_ids
+from app.core.metrics import USERNAME_INDEX_ENTRIES
+from app.core.replicas import read_only
+from .supabase import get_service_client
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings: no false negatives, about
+    `error_rate` false positives once `capacity` items are added.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.01) -> None:
+        self.capacity = max(1, capacity)
+        self.size = max(64, math.ceil(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / self.capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str) -> Iterator[int]:
+        # Double hashing: k positions from the two halves of one digest
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, item: str) -> None:
+        for pos in self._positions(item):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        bits = self._bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+
+def _key(username: str) -> Tuple[str, str]:
+    return (username.casefold(), username)
+
+
+@read_only
+def _fetch_usernames(page_size: int) -> List[Tuple[str, str]]:
+    """(user_id, username) of every profile with a username, in user_id pages."""
+    client = get_service_client()
+    rows: List[Tuple[str, str]] = []
+    after: Optional[str] = None
+    while True:
+        query = client.table("profiles").select("user_id,username").order("user_id").limit(page_size)
+        if after is not None:
+            query = query.gt("user_id", after)
+        page = query.execute().data or []
+        # Stop on an empty page: PostgREST's max-rows may cap pages below page_size
+        if not page:
+            return rows
+        rows.extend((str(r["user_id"]), r["username"]) for r in page if r.get("username"))
+        after = str(page[-1]["user_id"])
+
+
+def _fetch_users(user_ids: List[str]) -> Dict[str, Optional[str]]:
+    """Current username of each user (None when unset or deleted), read from the primary."""
+    resp = get_service_client().table("profiles").select("user_id,username").in_("user_id", user_ids).execute()
+    found = {str(r["user_id"]): r.get("username") for r in resp.data or []}
+    return {uid: found.get(uid) for uid in user_ids}
+
+
+class UsernameIndex:
+    """In-memory usernames of all profiles; see the module docstring.
+
+    Reads and writes take a lock, so the index can be used from the event loop
+    and from threadpool routes alike. The background task started by `start()`
+    does the loading.
+    """
+
+    def __init__(self, refresh_seconds: float, page_size: int) -> None:
+        self.refresh_seconds = refresh_seconds
+        self.page_size = page_size
+        self.loaded_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._keys: List[Tuple[str, str]] = []
+        self._ids: List[str] = []  # aligned with _keys
+        self._by_user: Dict[str, str] = {}
+        self._bloom = BloomFilter(1)
+        # Writes seen while a load is running, replayed over its (older) snapshot
+        self._journal: Optional[Dict[str, Optional[str]]] = None
+        self._dirty: Set[str] = set()
+        self._flushed_at = 0.0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._attempted: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.loaded_at is not None
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    # ---- queries ----
+
+    def search(self, prefix: str, limit: int) -> List[Tuple[str, str]]:
+        """(username, user_id) of up to `limit` usernames starting with `prefix`, ignoring case."""
+        folded = prefix.casefold()
+        matches: List[Tuple[str, str]] = []
+        with self._lock:
+            keys = self._keys
+            i = bisect_left(keys, (folded,))
+            while i < len(keys) and len(matches) < limit and keys[i][0].startswith(folded):
+                matches.append((keys[i][1], self._ids[i]))
+                i += 1
+        return matches
+
+    def owner(self, username: str) -> Optional[str]:
+        """User id holding exactly `username` (as the unique constraint compares), or None when free."""
+        key = _key(username)
+        with self._lock:
+            if username not in self._bloom:
+                return None
+            i = bisect_left(self._keys, key)
+            if i < len(self._keys) and self._keys[i] == key:
+                return self._ids[i]
+        return None
+
+    # ---- updates ----
+
+    def put(self, user_id: str, username: Optional[str]) -> None:
+        """Record `user_id`'s current username (None: no username or no profile)."""
+        with self._lock:
+            if self._journal is not None:
+                self._journal[user_id] = username
+            self._apply(user_id, username)
+        USERNAME_INDEX_ENTRIES.set(len(self._keys))
+
+    def _apply(self, user_id: str, username: Optional[str]) -> None:
+        old = self._by_user.get(user_id)
+        if old == username:
+            return
+        if old is not None:
+            old_key = _key(old)
+            i = bisect_left(self._keys, old_key)
+            if i < len(self._keys) and self._keys[i] == old_key and self._ids[i] == user_id:
+                del self._keys[i]
+                del self._ids[i]
+            del self._by_user[user_id]
+        if not username:
+            return
+        key = _key(username)
+        i = bisect_left(self._keys, key)
+        if i < len(self._keys) and self._keys[i] == key:
+            # Usernames are unique, so the previous holder's entry is outdated
+            self._by_user.pop(self._ids[i], None)
+            self._ids[i] = user_id
+        else:
+            self._keys.insert(i, key)
+            self._ids.insert(i, user_id)
+        self._by_user[user_id] = username
+        # Renamed-away names stay in the filter (a false positive, caught by the lookup)
+        # until the next reload rebuilds it
+        self._bloom.add(username)
+
+    def replace(self, rows: Iterable[Tuple[str, str]]) -> None:
+        """Swap in a full snapshot of (user_id, username) rows."""
+        holders: Dict[str, str] = {}
+        for user_id, username in rows:
+            if username:
+                holders[username] = user_id
+        by_user = {user_id: username for username, user_id in holders.items()}
+        ordered = sorted((_key(username), user_id) for user_id, username in by_user.items())
+        # Headroom for names added before the next reload
+        bloom = BloomFilter(2 * len(by_user) + 1024)
+        for username in by_user.values():
+            bloom.add(username)
+        with self._lock:
+            self._keys = [key for key, _ in ordered]
+            self._ids = [user_id for _, user_id in ordered]
+            self._by_user = by_user
+            self._bloom = bloom
+            journal, self._journal = self._journal or {}, None
+            for user_id, username in journal.items():
+                self._apply(user_id, username)
+            self.loaded_at = time.time()
+        USERNAME_INDEX_ENTRIES.set(len(self._keys))
+
+    def load(self) -> int:
+        """Read every username from PostgREST and replace the index; returns the count."""
+        with self._lock:
+            self._journal = {}
+        try:
+            rows = _fetch_usernames(self.page_size)
+        except Exception:
+            with self._lock:
+                self._journal = None
+            raise
+        self.replace(rows)
+        return len(self._keys)
+
+    def refresh_users(self, user_ids: Iterable[str]) -> None:
+        """Read the given users' usernames again from the primary."""
+        ids = sorted(set(user_ids))
+        for start in range(0, len(ids), 100):
+            for user_id, username in _fetch_users(ids[start:start + 100]).items():
+                self.put(user_id, username)
+
+    # ---- invalidation and background loading ----
+
+    def on_invalidate(self, payload: Payload) -> None:
+        """Invalidation bus handler for `profiles`: queue changed users; reload on flush."""
+        if payload.get("t") == FLUSH:
+            self._flushed_at = time.monotonic()
+        else:
+            self._dirty.update(payload_user_ids(payload))
+        if self._loop is not None and self._wake is not None:
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._loop = asyncio.get_running_loop()
+            self._wake = asyncio.Event()
+            self._attempted = asyncio.Event()
+            self._task = self._loop.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def wait_loaded(self) -> None:
+        """Wait for the first load attempt; raises if it failed."""
+        if self._attempted is not None:
+            await self._attempted.wait()
+        if not self.ready:
+            raise RuntimeError("username index not loaded")
+
+    async def _run(self) -> None:
+        assert self._wake is not None and self._attempted is not None
+        next_load = 0.0
+        load_started = 0.0
+        while True:
+            self._wake.clear()
+            now = time.monotonic()
+            if now >= next_load or self._flushed_at > load_started:
+                load_started = now
+                try:
+                    count = await asyncio.to_thread(self.load)
+                    logger.info("username index loaded %d names in %.0f ms", count, (time.monotonic() - now) * 1000)
+                    next_load = now + self.refresh_seconds
+                except Exception as e:
+                    logger.warning("username index load failed: %s", f"{type(e).__name__}: {e}"[:200])
+                    next_load = now + min(self.refresh_seconds, 5.0)
+                self._attempted.set()
+            if self._dirty and self.ready:
+                user_ids, self._dirty = self._dirty, set()
+                try:
+                    await asyncio.to_thread(self.refresh_users, user_ids)
+                except Exception as e:
+                    # The next reload picks these users up
+                    logger.warning("username index refresh failed: %s", f"{type(e).__name__}: {e}"[:200])
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=max(0.0, next_load - time.monotonic()))
+            except asyncio.TimeoutError:
+                pass
+
+
+# Module-level singleton holder
+_index: Optional[UsernameIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_username_index() -> Optional[UsernameIndex]:
+    """Return the process-wide UsernameIndex, or None when USERNAME_INDEX_ENABLED is off."""
+    global _index
+    if not settings.USERNAME_INDEX_ENABLED:
+        return None
+    with _index_lock:
+        if _index is None:
+            _index = UsernameIndex(
+                refresh_seconds=settings.USERNAME_INDEX_REFRESH_SECONDS,
+                page_size=settings.USERNAME_INDEX_PAGE_SIZE,
+            )
+            get_invalidation_bus().subscribe("profiles", _index.on_invalidate)
+        return _index
+
+
+__all__ = ["BloomFilter", "UsernameIndex", "get_username_index"]
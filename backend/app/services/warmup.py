@@ -0,0 +1,193 @@
+"""
+Startup warm-up: pay for first-request work before a worker takes traffic.
+
+Runs in the lifespan, so uvicorn does not accept connections until it is done
+(or until WARMUP_TIMEOUT_SECONDS, after which the rest finishes in the
+background). Steps, in order:
+
+- client: build the Supabase client (importing the SDK, see
+  app.services.supabase) on the threadpool. This also loads anyio's thread
+  backend and starts a worker thread, which the first sync route would do.
+- routes: send one unmatched request through the router. FastAPI builds each
+  route's dependencies and response-model fields on first match; the unmatched
+  path visits every route once. Then fill FastAPI's per-endpoint source-location
+  cache, which it otherwise fills on each endpoint's first call.
+- postgrest: one probe query through the shared client, then one per read
+  replica, so pooled connections (DNS, TCP, TLS) are open and each upstream
+  policy has seen a call.
+- auth: Supabase Auth health check. Tokens are checked against
+  `/auth/v1/user` (no signing keys to fetch), so this resolves and reaches
+  Auth once before the first authenticated request.
+- usernames: wait for the username index's first load (app.services.username_index),
+  so search and availability do not answer 503 on this worker.
+
+A failed step is logged and skipped; startup never fails because of warm-up.
+The per-step timings are kept on `report` and logged.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional
+
+import anyio.to_thread
+import fastapi.routing
+from starlette.types import ASGIApp, Message
+
+from app.core.config import settings
+from app.core.replicas import get_replica_router, read_only
+from .readiness import _probe_auth, _probe_postgrest
+from .supabase import get_supabase_client
+from .username_index import get_username_index
+
+logger = logging.getLogger(__name__)
+
+
+async def _warm_client(app: ASGIApp) -> None:
+    await anyio.to_thread.run_sync(get_supabase_client)
+
+
+def _endpoints(router: Any) -> Iterator[Callable[..., Any]]:
+    for route in getattr(router, "routes", ()):
+        if hasattr(route, "endpoint"):
+            yield route.endpoint
+        # Included routers are kept as wrappers around the original router
+        included = getattr(route, "original_router", None)
+        if included is not None:
+            yield from _endpoints(included)
+
+
+async def _warm_routes(app: ASGIApp) -> None:
+    router = getattr(app, "router", app)
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/__warmup__",
+        "raw_path": b"/__warmup__",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [],
+        "client": None,
+        "server": None,
+    }
+
+    async def receive() -> Message:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: Message) -> None:
+        pass
+
+    # Straight to the router: middleware (metrics, compression) never sees this request
+    await router(scope, receive, send)
+
+    # Source file and line of each endpoint (inspect.getsourcelines), read on its first call;
+    # private to FastAPI, so skipped on versions without it
+    extract = getattr(fastapi.routing, "_extract_endpoint_context", None)
+    if extract is not None:
+        for endpoint in _endpoints(router):
+            extract(endpoint)
+
+
+@read_only
+def _probe_replicas(timeout: float) -> None:
+    # Replicas are picked round-robin, so one probe per replica reaches each healthy one
+    router = get_replica_router()
+    for _ in router.urls if router is not None else ():
+        _probe_postgrest(timeout)
+
+
+async def _warm_postgrest(app: ASGIApp) -> None:
+    timeout = settings.READY_PROBE_TIMEOUT_SECONDS
+    await anyio.to_thread.run_sync(_probe_postgrest, timeout)
+    await anyio.to_thread.run_sync(_probe_replicas, timeout)
+
+
+async def _warm_auth(app: ASGIApp) -> None:
+    await anyio.to_thread.run_sync(_probe_auth, settings.READY_PROBE_TIMEOUT_SECONDS)
+
+
+async def _warm_usernames(app: ASGIApp) -> None:
+    index = get_username_index()
+    if index is not None:
+        await index.wait_loaded()
+
+
+_STEPS: Dict[str, Callable[[ASGIApp], Awaitable[None]]] = {
+    "client": _warm_client,
+    "routes": _warm_routes,
+    "postgrest": _warm_postgrest,
+    "auth": _warm_auth,
+    "usernames": _warm_usernames,
+}
+
+
+class StartupWarmup:
+    """Runs the warm-up steps once per worker and records how long each took."""
+
+    def __init__(self, timeout_seconds: float) -> None:
+        self.timeout_seconds = timeout_seconds
+        self.report: Dict[str, Any] = {"done": False, "total_ms": None, "steps": {}}
+        self._task: Optional[asyncio.Task] = None
+
+    async def run(self, app: ASGIApp) -> None:
+        """Warm up, waiting at most `timeout_seconds` before letting startup continue."""
+        self._task = asyncio.get_running_loop().create_task(self._run(app))
+        done, _ = await asyncio.wait({self._task}, timeout=self.timeout_seconds)
+        if not done:
+            logger.warning(
+                "startup warm-up still running after %gs; serving anyway (done: %s)",
+                self.timeout_seconds, self._summary(),
+            )
+
+    async def stop(self) -> None:
+        if self._task is None or self._task.done():
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+    async def _run(self, app: ASGIApp) -> None:
+        started = time.perf_counter()
+        for name, step in _STEPS.items():
+            step_started = time.perf_counter()
+            try:
+                await step(app)
+                error = None
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"[:200]
+                logger.warning("startup warm-up step %s failed: %s", name, error)
+            self.report["steps"][name] = {
+                "ms": round((time.perf_counter() - step_started) * 1000, 1),
+                "error": error,
+            }
+        self.report["total_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        self.report["done"] = True
+        logger.info("startup warm-up finished in %.0f ms (%s)", self.report["total_ms"], self._summary())
+
+    def _summary(self) -> str:
+        return ", ".join(
+            f"{name}={step['ms']:.0f}ms" + (" failed" if step["error"] else "")
+            for name, step in self.report["steps"].items()
+        ) or "none"
+
+
+# Module-level singleton holder
+_warmup: Optional[StartupWarmup] = None
+
+
+def get_startup_warmup() -> Optional[StartupWarmup]:
+    """Return the process-wide StartupWarmup, or None when WARMUP_ENABLED is off."""
+    global _warmup
+    if _warmup is None and settings.WARMUP_ENABLED:
+        _warmup = StartupWarmup(timeout_seconds=settings.WARMUP_TIMEOUT_SECONDS)
+    return _warmup
+
+
+__all__ = ["StartupWarmup", "get_startup_warmup"]
@@ -7,13 +7,19 @@ either SUPABASE_SERVICE_ROLE_KEY or SUPABASE_KEY to validate the token via
 
 from __future__ import annotations
 
+import base64
+import binascii
+import hashlib
+import hmac
 import json
+import time
 import urllib.request
 from typing import Any, Dict, Optional
 
 from fastapi import HTTPException, status
 
 from app.core.config import settings
+from app.core.resilience import UpstreamUnavailable, get_upstream_policy
 
 
 def extract_bearer_token(authorization: Optional[str]) -> str:
@@ -23,6 +29,24 @@ def extract_bearer_token(authorization: Optional[str]) -> str:
     return authorization.split(" ", 1)[1].strip()
 
 
+def _b64decode(segment: str) -> bytes:
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
+
+def unverified_subject(access_token: str) -> Optional[str]:
+    """Read the `sub` claim of a JWT without verifying it.
+
+    Only for routing hints such as read-your-writes pins; never for authorization
+    or for rate-limit keys, which a forged `sub` could multiply.
+    """
+    try:
+        claims = json.loads(_b64decode(access_token.split(".")[1]))
+    except (IndexError, ValueError, binascii.Error):
+        return None
+    sub = claims.get("sub") if isinstance(claims, dict) else None
+    return sub if isinstance(sub, str) else None
+
+
 def get_supabase_user_from_token(access_token: str) -> Dict[str, Any]:
     """Call Supabase Auth `/auth/v1/user` to get the user payload for a token."""
     if not settings.SUPABASE_URL:
@@ -35,9 +59,17 @@ def get_supabase_user_from_token(access_token: str) -> Dict[str, Any]:
     req = urllib.request.Request(url)
     req.add_header("Authorization", f"Bearer {access_token}")
     req.add_header("apikey", api_key)
+
+
+    def fetch() -> Any:
+        with urllib.request.urlopen(req, timeout=settings.AUTH_TIMEOUT_SECONDS) as resp:
+            return json.loads(resp.read().decode("utf-8"))
+
     try:
-        with urllib.request.urlopen(req, timeout=10) as resp:
-            payload = json.loads(resp.read().decode("utf-8"))
+        # Retried on transient errors; fails fast with UpstreamUnavailable (503) while Auth is down
+        payload = get_upstream_policy("auth").call(fetch, idempotent=True)
+    except UpstreamUnavailable:
+        raise
     except urllib.error.HTTPError as e:
         if e.code == 401:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid or expired token") from e
@@ -49,3 +81,36 @@ def get_supabase_user_from_token(access_token: str) -> Dict[str, Any]:
         raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail="Unexpected auth response")
     return payload
 
+
+def _verify_hs256(access_token: str, secret: str) -> Dict[str, Any]:
+    """Check an HS256 JWT's signature and expiry locally; return its claims."""
+    invalid = HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid or expired token")
+    try:
+        header_b64, claims_b64, signature_b64 = access_token.split(".")
+        header = json.loads(_b64decode(header_b64))
+        claims = json.loads(_b64decode(claims_b64))
+        signature = _b64decode(signature_b64)
+    except (ValueError, binascii.Error):
+        raise invalid
+    if not isinstance(header, dict) or header.get("alg") != "HS256" or not isinstance(claims, dict):
+        raise invalid
+    expected = hmac.new(secret.encode("utf-8"), f"{header_b64}.{claims_b64}".encode("ascii"), hashlib.sha256).digest()
+    if not hmac.compare_digest(expected, signature):
+        raise invalid
+    exp = claims.get("exp")
+    if not isinstance(exp, (int, float)) or exp <= time.time() or not isinstance(claims.get("sub"), str):
+        raise invalid
+    return claims
+
+
+def verify_access_token(access_token: str) -> Dict[str, Any]:
+    """Return the verified JWT claims of an access token (at least `sub` and `role`).
+
+    With SUPABASE_JWT_SECRET set the HS256 signature is checked locally; otherwise
+    the token is checked with Supabase Auth and the claims are rebuilt from the user.
+    Claims from this function may be handed to Postgres as `request.jwt.claims`.
+    """
+    if settings.SUPABASE_JWT_SECRET:
+        return _verify_hs256(access_token, settings.SUPABASE_JWT_SECRET)
+    user = get_supabase_user_from_token(access_token)
+    return {"sub": user["id"], "role": user.get("role") or "authenticated", "email": user.get("email")}
@@ -0,0 +1,126 @@
+"""
+Micro-benchmark: CPU cost of turning a 100-row feed page into a JSON response.
+
+Compares the previous path (fresh TypeAdapter per call, then FastAPI's
+response_model validation + jsonable serialization + JSONResponse) with the
+current one (prebuilt adapters + `model_response`, validated once). Also
+reports stdlib vs orjson rendering for dict payloads and the on-the-wire size
+of the page with each negotiated content encoding.
+
+Run from backend/:
+    python -m benchmarks.bench_feed_page [--items 100] [--rounds 2000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List
+from uuid import uuid4
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from pydantic import TypeAdapter
+
+from app.api.responses import FastJSONResponse, model_response
+from app.core.compression import CompressionMiddleware, brotli
+from app.models import FeedResponse, PostWithCounts
+from app.models.adapters import FeedResponseAdapter, PostWithCountsListAdapter
+
+
+def make_rows(n: int) -> List[Dict[str, Any]]:
+    """Rows shaped like the `get_feed` RPC reply (strings for uuids/timestamps)."""
+    now = datetime.now(timezone.utc)
+    return [
+        {
+            "id": i + 1,
+            "challenge_id": 1000 + i,
+            "author_id": str(uuid4()),
+            "caption": f"caption {i}",
+            "media_url": f"posts/{uuid4()}/{i}/front.jpg",
+            "created_at": (now - timedelta(minutes=i)).isoformat(),
+            "for_count": i % 7,
+            "against_count": i % 3,
+            "for_amount_cents": (i % 7) * 500,
+            "against_amount_cents": (i % 3) * 500,
+        }
+        for i in range(n)
+    ]
+
+
+_response_field = create_model_field(name="Response_get_feed", type_=FeedResponse, mode="serialization")
+
+
+def before(rows: List[Dict[str, Any]]) -> bytes:
+    items = TypeAdapter(List[PostWithCounts]).validate_python(rows)
+    resp = FeedResponse(items=items, next_cursor=items[-1].created_at if items else None)
+    content = asyncio.run(serialize_response(field=_response_field, response_content=resp))
+    return JSONResponse(content=content).body
+
+
+def after(rows: List[Dict[str, Any]]) -> bytes:
+    items = PostWithCountsListAdapter.validate_python(rows)
+    resp = FeedResponse(items=items, next_cursor=items[-1].created_at if items else None)
+    return model_response(FeedResponseAdapter, resp).body
+
+
+def _run_loop_overhead(rounds: int) -> float:
+    async def noop() -> None:
+        return None
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        asyncio.run(noop())
+    return time.perf_counter() - start
+
+
+def measure(fn: Callable[[List[Dict[str, Any]]], bytes], rows: List[Dict[str, Any]], rounds: int) -> float:
+    fn(rows)  # warm-up
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn(rows)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=2000)
+    args = parser.parse_args()
+
+    rows = make_rows(args.items)
+    # `before` drives FastAPI's coroutine through asyncio.run; subtract that harness cost.
+    loop_cost = _run_loop_overhead(args.rounds)
+    t_before = measure(before, rows, args.rounds) - loop_cost
+    t_after = measure(after, rows, args.rounds)
+
+    per_item = lambda t: t / args.rounds / args.items * 1e6  # noqa: E731
+    per_page = lambda t: t / args.rounds * 1e3  # noqa: E731
+    print(f"feed page of {args.items} items, {args.rounds} rounds")
+    print(f"  before: {per_page(t_before):8.3f} ms/page  {per_item(t_before):7.2f} us/item")
+    print(f"  after:  {per_page(t_after):8.3f} ms/page  {per_item(t_after):7.2f} us/item")
+    print(f"  speedup: {t_before / t_after:.2f}x")
+
+    payload = after(rows)
+    as_dict = FeedResponseAdapter.dump_python(FeedResponseAdapter.validate_json(payload), mode="json")
+    t_std = measure(lambda _: JSONResponse(content=as_dict).body, rows, args.rounds)
+    t_fast = measure(lambda _: FastJSONResponse(content=as_dict).body, rows, args.rounds)
+    print("dict rendering (routes without a fast path)")
+    print(f"  JSONResponse:     {per_page(t_std):8.3f} ms/page")
+    print(f"  FastJSONResponse: {per_page(t_fast):8.3f} ms/page")
+
+    compressor = CompressionMiddleware(app=None)  # type: ignore[arg-type]
+    print("payload size")
+    print(f"  identity: {len(payload):7d} bytes")
+    for enc in ("gzip", "br") if brotli is not None else ("gzip",):
+        start = time.perf_counter()
+        size = len(compressor.compress(payload, enc))
+        took = (time.perf_counter() - start) * 1e3
+        print(f"  {enc + ':':9s} {size:7d} bytes  ({took:.3f} ms to compress)")
+
+
+if __name__ == "__main__":
+    main()
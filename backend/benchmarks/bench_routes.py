@@ -0,0 +1,362 @@
+"""
+Route benchmark: every API route driven through the ASGI app against the in-memory Supabase stand-in.
+
+No network and no Supabase project are needed:
+- PostgREST, Storage and RLS come from `benchmarks.fake_supabase`.
+- Token checks go to a local fake Auth server.
+
+For each route it reports:
+- throughput
+- p50 / p99 latency
+- non-2xx responses
+- upstream calls per request (PostgREST + Storage, and Auth separately)
+- time spent inside the stand-in, so its own overhead can be subtracted
+
+Requests are issued through httpx's ASGI transport, in the same event loop as
+the app. Routes run their sync Supabase calls in the threadpool as they do
+under uvicorn, so any call still made on the loop serializes here too. Raise
+`--latency-ms` and `--concurrency` together to see which routes serialize.
+
+Not covered:
+- `/challenges/stats/stream` (long-lived SSE)
+- `/ready` (needs the lifespan probes)
+- `/metrics` and `/admin/*`
+
+Run from backend/:
+    python -m benchmarks.bench_routes [--requests 200] [--concurrency 1] [--latency-ms 0]
+                                      [--auth-latency-ms 0] [--users 200] [--only feed,home] [--json out.json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, List
+
+import httpx
+
+from benchmarks.fake_supabase import FakeAuthServer, FakeSupabase, make_token, seed_dataset
+
+Request = Dict[str, Any]
+
+
+@dataclass
+class Result:
+    route: str
+    requests: int
+    seconds: float
+    rps: float
+    p50_ms: float
+    p99_ms: float
+    mean_ms: float
+    errors: int
+    statuses: Dict[str, int] = field(default_factory=dict)
+    upstream_per_request: float = 0.0
+    auth_per_request: float = 0.0
+    fake_ms_per_request: float = 0.0
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100.0 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[rank]
+
+
+class Workload:
+    """Picks users and rows from the seeded dataset to build realistic requests."""
+
+    def __init__(self, fake: FakeSupabase, seed: int) -> None:
+        self.fake = fake
+        self.rng = random.Random(seed)
+        self.user_ids = sorted(fake.users)
+        self.tokens = {uid: make_token(uid) for uid in self.user_ids}
+        self._pools: Dict[str, List[Any]] = {}
+
+    def user(self) -> str:
+        return self.rng.choice(self.user_ids)
+
+    def headers(self, uid: str) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.tokens[uid]}"}
+
+    def own_challenge(self, uid: str) -> Dict[str, Any]:
+        rows = self.fake.lookup("challenges", "owner_id", uid)
+        return self.rng.choice(rows) if rows else self.fake.add_row(
+            "challenges", {"owner_id": uid, "title": "bench", "amount_cents": 500}
+        )
+
+    def visible_challenge(self, uid: str) -> Dict[str, Any]:
+        network = sorted(self.fake.network_of(uid)) or [uid]
+        return self.own_challenge(self.rng.choice(network))
+
+    def committed_challenge(self, uid: str) -> int:
+        rows = self.fake.lookup("commitments", "user_id", uid)
+        return self.rng.choice(rows)["challenge_id"] if rows else self.own_challenge(uid)["id"]
+
+    def own_post(self, uid: str) -> Dict[str, Any]:
+        rows = self.fake.lookup("posts", "author_id", uid)
+        if rows:
+            return self.rng.choice(rows)
+        ch = self.own_challenge(uid)
+        return self.fake.add_row("posts", {"challenge_id": ch["id"], "author_id": uid})
+
+    def pool(self, name: str, make: Callable[[], Any]) -> Any:
+        """Pop a pre-made fixture (e.g. a post to delete); `prepare` fills pools before timing."""
+        items = self._pools.setdefault(name, [])
+        return items.pop() if items else make()
+
+    def prepare(self, name: str, count: int, make: Callable[[], Any]) -> None:
+        self._pools[name] = [make() for _ in range(count)]
+
+
+def _get(path: str) -> Callable[[Workload], Request]:
+    def build(w: Workload) -> Request:
+        return {"method": "GET", "url": path}
+
+    return build
+
+
+def _authed(method: str, fn: Callable[[Workload, str], Request]) -> Callable[[Workload], Request]:
+    def build(w: Workload) -> Request:
+        uid = w.user()
+        req = fn(w, uid)
+        req.setdefault("method", method)
+        req["headers"] = {**w.headers(uid), **req.get("headers", {})}
+        return req
+
+    return build
+
+
+def _fresh_pair(w: Workload) -> tuple:
+    """A (requester, addressee) pair that is not connected yet."""
+    while True:
+        a, b = w.user(), w.user()
+        if a != b and b not in w.fake.network_of(a):
+            return a, b
+
+
+def _unfollow_fixture(w: Workload) -> tuple:
+    a, b = _fresh_pair(w)
+    w.fake.add_row("connections", {"requester_id": a, "addressee_id": b, "status": "accepted"})
+    return a, b
+
+
+def _delete_fixture(w: Workload) -> tuple:
+    uid = w.user()
+    ch = w.own_challenge(uid)
+    post = w.fake.add_row("posts", {"challenge_id": ch["id"], "author_id": uid, "caption": "to delete"})
+    return uid, post["id"]
+
+
+def _unfollow(w: Workload) -> Request:
+    a, b = w.pool("unfollow", lambda: _unfollow_fixture(w))
+    return {"method": "DELETE", "url": f"/api/v1/network/follow/{b}", "headers": w.headers(a)}
+
+
+def _delete_post(w: Workload) -> Request:
+    uid, post_id = w.pool("delete_post", lambda: _delete_fixture(w))
+    return {"method": "DELETE", "url": f"/api/v1/posts/{post_id}", "headers": w.headers(uid)}
+
+
+def _sync(w: Workload, uid: str) -> Request:
+    from app.services.sync import encode_sync_token
+
+    head = max(w.fake.rows["change_log"] or [0])
+    # Fake change_log rows use their id as xid
+    return {"url": "/api/v1/sync", "params": {"token": encode_sync_token(max(0, head - 200))}}
+
+
+def _phones(w: Workload, n: int = 10) -> List[str]:
+    return [w.fake.users[w.user()]["phone"] for _ in range(n)] + ["+44 20 7946 0000"]
+
+
+SCENARIOS: Dict[str, Callable[[Workload], Request]] = {
+    "GET /health": _get("/api/v1/health"),
+    "GET /ping": _get("/api/v1/ping"),
+    "GET /me": _authed("GET", lambda w, u: {"url": "/api/v1/me"}),
+    "PATCH /me": _authed("PATCH", lambda w, u: {"url": "/api/v1/me", "json": {"full_name": f"Bench {w.rng.randrange(1000)}"}}),
+    "GET /me/summary": _authed("GET", lambda w, u: {"url": "/api/v1/me/summary"}),
+    "POST /profiles": _authed("POST", lambda w, u: {"url": "/api/v1/profiles", "json": {"full_name": "Bench"}}),
+    "GET /profiles/batch": _authed("GET", lambda w, u: {
+        "url": "/api/v1/profiles/batch", "params": {"ids": sorted(w.fake.network_of(u))[:20] or [u]},
+    }),
+    "GET /profiles/search": _authed("GET", lambda w, u: {"url": "/api/v1/profiles/search", "params": {"q": f"user{w.rng.randrange(20)}"}}),
+    "GET /usernames/availability": _authed("GET", lambda w, u: {
+        "url": "/api/v1/usernames/availability", "params": {"username": w.rng.choice(["user", "new_"]) + str(w.rng.randrange(400))},
+    }),
+    "GET /home": _authed("GET", lambda w, u: {"url": "/api/v1/home"}),
+    "GET /feed": _authed("GET", lambda w, u: {"url": "/api/v1/feed", "params": {"limit": 20}}),
+    "GET /feed/challenges/trending": _authed("GET", lambda w, u: {"url": "/api/v1/feed/challenges/trending"}),
+    "GET /users/{id}/posts": _authed("GET", lambda w, u: {"url": f"/api/v1/users/{w.rng.choice(sorted(w.fake.network_of(u)) or [u])}/posts"}),
+    "GET /challenges/search": _authed("GET", lambda w, u: {"url": "/api/v1/challenges/search", "params": {"q": w.rng.choice(["run", "daily", "5k"])}}),
+    "GET /challenges": _authed("GET", lambda w, u: {"url": "/api/v1/challenges", "params": {"limit": 20}}),
+    "POST /challenges": _authed("POST", lambda w, u: {"url": "/api/v1/challenges", "json": {"title": "bench", "amount_cents": 500}}),
+    "GET /challenges/batch": _authed("GET", lambda w, u: {
+        "url": "/api/v1/challenges/batch", "params": {"ids": [w.visible_challenge(u)["id"] for _ in range(10)]},
+    }),
+    "GET /challenges/{id}": _authed("GET", lambda w, u: {"url": f"/api/v1/challenges/{w.visible_challenge(u)['id']}"}),
+    "PATCH /challenges/{id}": _authed("PATCH", lambda w, u: {"url": f"/api/v1/challenges/{w.own_challenge(u)['id']}", "json": {"title": "renamed"}}),
+    "GET /challenges/{id}/posts": _authed("GET", lambda w, u: {"url": f"/api/v1/challenges/{w.visible_challenge(u)['id']}/posts"}),
+    "GET /challenges/{id}/stats": _authed("GET", lambda w, u: {"url": f"/api/v1/challenges/{w.visible_challenge(u)['id']}/stats"}),
+    "POST /challenges/{id}/commitments": _authed("POST", lambda w, u: {
+        "url": f"/api/v1/challenges/{w.visible_challenge(u)['id']}/commitments", "json": {"direction": w.rng.choice(["for", "against"])},
+    }),
+    "GET /challenges/{id}/commitments/me": _authed("GET", lambda w, u: {"url": f"/api/v1/challenges/{w.committed_challenge(u)}/commitments/me"}),
+    "GET /challenges/{id}/commitments": _authed("GET", lambda w, u: {
+        "url": f"/api/v1/challenges/{w.visible_challenge(u)['id']}/commitments", "params": {"expand": ["challenge", "profile"]},
+    }),
+    "GET /commitments/me": _authed("GET", lambda w, u: {"url": "/api/v1/commitments/me", "params": {"limit": 50}}),
+    "POST /posts": _authed("POST", lambda w, u: {"url": "/api/v1/posts", "json": {"challenge_id": w.own_challenge(u)["id"], "caption": "bench"}}),
+    "GET /posts/batch": _authed("GET", lambda w, u: {
+        "url": "/api/v1/posts/batch", "params": {"ids": [w.own_post(w.rng.choice(sorted(w.fake.network_of(u)) or [u]))["id"] for _ in range(10)]},
+    }),
+    "GET /posts/{id}": _authed("GET", lambda w, u: {"url": f"/api/v1/posts/{w.own_post(w.rng.choice(sorted(w.fake.network_of(u)) or [u]))['id']}"}),
+    "PATCH /posts/{id}/media": _authed("PATCH", lambda w, u: {"url": f"/api/v1/posts/{w.own_post(u)['id']}/media", "json": {"media_url": f"posts/{u}/bench.jpg"}}),
+    "DELETE /posts/{id}": _delete_post,
+    "POST /network/import-contacts": _authed("POST", lambda w, u: {"url": "/api/v1/network/import-contacts", "json": {"phones": _phones(w)}}),
+    "POST /network/import-and-follow": _authed("POST", lambda w, u: {"url": "/api/v1/network/import-and-follow", "json": {"phones": _phones(w, 3)}}),
+    "POST /network/follow": _authed("POST", lambda w, u: {"url": "/api/v1/network/follow", "json": {"target_user_id": w.user()}}),
+    "DELETE /network/follow/{id}": _unfollow,
+    "GET /network": _authed("GET", lambda w, u: {"url": "/api/v1/network"}),
+    "GET /sync": _authed("GET", _sync),
+    "POST /uploads/presign": _authed("POST", lambda w, u: {"url": "/api/v1/uploads/presign", "json": {"post_id": w.own_post(u)["id"], "file_ext": "jpg"}}),
+    "POST /uploads/direct": _authed("POST", lambda w, u: {
+        "url": "/api/v1/uploads/direct", "data": {"post_id": str(w.own_post(u)["id"])},
+        "files": {"file": ("front.jpg", b"\xff\xd8" + os.urandom(16 * 1024), "image/jpeg")},
+    }),
+}
+
+# Routes that consume a fixture per request; filled before the timed run
+FIXTURES = {"DELETE /posts/{id}": ("delete_post", _delete_fixture), "DELETE /network/follow/{id}": ("unfollow", _unfollow_fixture)}
+
+
+async def run_route(
+    client: httpx.AsyncClient, fake: FakeSupabase, auth: FakeAuthServer, w: Workload,
+    name: str, requests: int, concurrency: int, warmup: int,
+) -> Result:
+    build = SCENARIOS[name]
+    if name in FIXTURES:
+        pool, make = FIXTURES[name]
+        w.prepare(pool, requests + warmup, lambda: make(w))
+    for req in [build(w) for _ in range(warmup)]:
+        await client.request(**req)
+
+    # Built up front so request construction is not timed
+    queue = [build(w) for _ in range(requests)]
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    fake.reset_counters()
+    auth.calls = 0
+
+    async def worker() -> None:
+        while queue:
+            req = queue.pop()
+            started = time.perf_counter()
+            resp = await client.request(**req)
+            latencies.append((time.perf_counter() - started) * 1000)
+            statuses[str(resp.status_code)] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return Result(
+        route=name,
+        requests=requests,
+        seconds=round(elapsed, 3),
+        rps=round(requests / elapsed, 1) if elapsed else 0.0,
+        p50_ms=round(percentile(latencies, 50), 2),
+        p99_ms=round(percentile(latencies, 99), 2),
+        mean_ms=round(sum(latencies) / len(latencies), 2) if latencies else 0.0,
+        errors=sum(n for code, n in statuses.items() if not code.startswith(("2", "3"))),
+        statuses=dict(statuses),
+        upstream_per_request=round(fake.calls / requests, 2),
+        auth_per_request=round(auth.calls / requests, 2),
+        fake_ms_per_request=round(fake.busy_seconds * 1000 / requests, 3),
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200, help="timed requests per route")
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="injected PostgREST/Storage latency per call")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="extra uniform random latency per call")
+    parser.add_argument("--auth-latency-ms", type=float, default=0.0)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--only", default="", help="comma-separated substrings of route names to run")
+    parser.add_argument("--rate-limits", action="store_true", help="keep RATE_LIMITS enforced (off by default)")
+    parser.add_argument("--json", dest="json_path", default="", help="also write results to this file")
+    args = parser.parse_args()
+
+    fake = seed_dataset(users=args.users, seed=args.seed, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms)
+    auth = FakeAuthServer(fake, latency_ms=args.auth_latency_ms).start()
+
+    # Settings are read at import time, so the environment is set before the app is imported
+    os.environ["SUPABASE_URL"] = auth.url
+    os.environ["SUPABASE_KEY"] = "bench"
+    os.environ["SUPABASE_SERVICE_ROLE_KEY"] = ""
+    os.environ["DATABASE_URL"] = ""
+    os.environ.setdefault("PROFILER_ENABLED", "false")
+    if not args.rate_limits:
+        os.environ["RATE_LIMIT_ENABLED"] = "false"
+
+    from app.main import app
+    from app.services.supabase import set_supabase_client
+    from app.services.username_index import get_username_index
+
+    set_supabase_client(fake)
+    # The lifespan does not run here; load the username index it would start
+    usernames = get_username_index()
+    if usernames is not None:
+        usernames.load()
+    w = Workload(fake, args.seed)
+    wanted = [s.strip() for s in args.only.split(",") if s.strip()]
+    names = [n for n in SCENARIOS if not wanted or any(s in n for s in wanted)]
+
+    async def run_all() -> List[Result]:
+        # Unhandled exceptions become 500s and are counted, as under uvicorn
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            return [
+                await run_route(client, fake, auth, w, name, args.requests, args.concurrency, args.warmup)
+                for name in names
+            ]
+
+    results = asyncio.run(run_all())
+    auth.stop()
+
+    print(
+        f"{len(fake.users)} users, {len(fake.rows['challenges'])} challenges, {len(fake.rows['commitments'])} commitments; "
+        f"{args.requests} requests/route at concurrency {args.concurrency}, "
+        f"upstream latency {args.latency_ms:g}+{args.jitter_ms:g} ms, auth {args.auth_latency_ms:g} ms"
+    )
+    header = f"{'route':38s} {'req/s':>8s} {'p50 ms':>8s} {'p99 ms':>8s} {'errors':>6s} {'calls':>6s} {'auth':>5s} {'fake ms':>8s}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(
+            f"{r.route:38s} {r.rps:8.1f} {r.p50_ms:8.2f} {r.p99_ms:8.2f} {r.errors:6d} "
+            f"{r.upstream_per_request:6.2f} {r.auth_per_request:5.2f} {r.fake_ms_per_request:8.3f}"
+        )
+    failing = {r.route: r.statuses for r in results if r.errors}
+    if failing:
+        print("non-2xx status counts:")
+        for route, statuses in failing.items():
+            print(f"  {route}: {statuses}")
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump({"config": vars(args), "results": [asdict(r) for r in results]}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+"""
+Worker scaling: throughput of the production server at 1..N workers.
+
+Starts gunicorn with the production config (gunicorn.conf.py: preloaded app,
+uvloop + httptools workers) at each worker count in `--workers`. The app is
+backed by `benchmarks.fake_supabase`. Each server is driven closed-loop by
+`--clients` load processes for `--seconds`, using a mix of read routes from
+`benchmarks.bench_routes.SCENARIOS`.
+
+For each worker count it reports:
+- req/s and p50 / p99 latency
+- errors
+- scaling efficiency = req/s / (workers x req/s at the first count)
+
+The load processes share the machine with the workers. Keep
+workers + clients <= CPUs (or pin them apart with taskset); otherwise the
+curve flattens because of the load generator, not the server. Add
+`--latency-ms` to model PostgREST round trips. The sync Supabase calls block
+each worker's event loop for that long, so throughput then scales with
+workers even past the CPU count.
+
+Run from backend/:
+    python -m benchmarks.bench_workers [--workers 1,2,4] [--clients 4] [--concurrency 16]
+                                       [--seconds 10] [--latency-ms 0] [--json workers.json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import signal
+import subprocess
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from benchmarks.bench_routes import SCENARIOS, Workload, percentile
+from benchmarks.fake_supabase import FakeAuthServer, seed_dataset
+from benchmarks.loadtest import _free_port, _git_commit
+
+DEFAULT_MIX = "GET /feed,GET /challenges/{id}/posts,GET /posts/{id},GET /me"
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def bench_app() -> Any:
+    """Gunicorn app factory (`benchmarks.bench_workers:bench_app()`): the app on a seeded fake.
+
+    Runs once in the gunicorn master when preloading, so workers fork with the
+    dataset already built. Same seed as the driver, so ids and tokens match.
+    """
+    from app.main import app
+    from app.services.supabase import set_supabase_client
+
+    fake = seed_dataset(
+        users=int(os.environ["BENCH_USERS"]),
+        seed=int(os.environ["BENCH_SEED"]),
+        latency_ms=float(os.environ["BENCH_LATENCY_MS"]),
+    )
+    set_supabase_client(fake)
+    return app
+
+
+async def _drive(target: str, requests: List[Dict[str, Any]], seconds: float, warmup: float, concurrency: int) -> Dict[str, Any]:
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    started = time.perf_counter()
+    measure_from = started + warmup
+    stop_at = measure_from + seconds
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=target, limits=limits, timeout=30) as client:
+
+        async def loop(offset: int) -> None:
+            i = offset
+            while True:
+                now = time.perf_counter()
+                if now >= stop_at:
+                    return
+                req = dict(requests[i % len(requests)])
+                i += concurrency
+                try:
+                    resp = await client.request(req.pop("method"), req.pop("url"), **req)
+                    status = str(resp.status_code)
+                except httpx.TransportError as e:
+                    status = type(e).__name__
+                if now >= measure_from:
+                    latencies.append(time.perf_counter() - now)
+                    statuses[status] += 1
+
+        await asyncio.gather(*(loop(k) for k in range(concurrency)))
+    return {"latencies": latencies, "statuses": dict(statuses)}
+
+
+def _client(job: Tuple[str, List[Dict[str, Any]], float, float, int]) -> Dict[str, Any]:
+    return asyncio.run(_drive(*job))
+
+
+def _start_server(args: argparse.Namespace, workers: int, auth_url: str) -> Tuple[subprocess.Popen, str]:
+    port = _free_port()
+    env = dict(
+        os.environ,
+        SUPABASE_URL=auth_url, SUPABASE_KEY="bench", SUPABASE_SERVICE_ROLE_KEY="", DATABASE_URL="",
+        RATE_LIMIT_ENABLED="false", PROFILER_ENABLED="false", DEBUG="false",
+        WEB_CONCURRENCY=str(workers), SERVER_BIND=f"127.0.0.1:{port}",
+        BENCH_USERS=str(args.users), BENCH_SEED=str(args.seed), BENCH_LATENCY_MS=str(args.latency_ms),
+    )
+    cmd = [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "--log-level", "warning",
+           "benchmarks.bench_workers:bench_app()"]
+    proc = subprocess.Popen(cmd, cwd=BACKEND, env=env, stdout=subprocess.DEVNULL)
+    target = f"http://127.0.0.1:{port}"
+    give_up = time.monotonic() + 60
+    while time.monotonic() < give_up:
+        if proc.poll() is not None:
+            raise SystemExit(f"gunicorn exited with {proc.returncode}")
+        try:
+            if httpx.get(f"{target}/api/v1/ping", timeout=1).status_code == 200:
+                # Give the remaining workers time to boot before the clock starts
+                time.sleep(0.5 + 0.1 * workers)
+                return proc, target
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+    proc.terminate()
+    raise SystemExit("gunicorn did not start within 60 s")
+
+
+def run_step(args: argparse.Namespace, workers: int, auth_url: str, requests: List[Dict[str, Any]]) -> Dict[str, Any]:
+    proc, target = _start_server(args, workers, auth_url)
+    try:
+        share = [requests[k::args.clients] for k in range(args.clients)]
+        jobs = [(target, share[k], args.seconds, args.warmup, args.concurrency) for k in range(args.clients)]
+        with multiprocessing.get_context("spawn").Pool(args.clients) as pool:
+            results = pool.map(_client, jobs)
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        proc.wait(timeout=60)
+    latencies = sorted(x for r in results for x in r["latencies"])
+    statuses: Counter = Counter()
+    for r in results:
+        statuses.update(r["statuses"])
+    errors = sum(n for s, n in statuses.items() if not s.startswith("2"))
+    return {
+        "workers": workers,
+        "requests": len(latencies),
+        "rps": round(len(latencies) / args.seconds, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "errors": errors,
+        "statuses": dict(statuses),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", default="", help="comma-separated worker counts (default: 1, 2, 4, ... up to the CPU count)")
+    parser.add_argument("--clients", type=int, default=2, help="load generator processes")
+    parser.add_argument("--concurrency", type=int, default=16, help="connections per load process")
+    parser.add_argument("--seconds", type=float, default=10.0, help="measured duration per worker count")
+    parser.add_argument("--warmup", type=float, default=2.0)
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"comma-separated bench_routes scenarios (default: {DEFAULT_MIX})")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="injected PostgREST latency")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", dest="json_path", default="", help="write results as JSON")
+    args = parser.parse_args()
+
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+    if args.workers:
+        counts = [int(n) for n in args.workers.split(",") if n.strip()]
+    else:
+        counts = [1]
+        while counts[-1] * 2 <= cpus:
+            counts.append(counts[-1] * 2)
+    names = [n.strip() for n in args.mix.split(",") if n.strip()]
+    unknown = [n for n in names if n not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}")
+
+    fake = seed_dataset(users=args.users, seed=args.seed)
+    auth = FakeAuthServer(fake).start()
+    w = Workload(fake, args.seed)
+    rng = random.Random(args.seed)
+    requests = [{"method": "GET", **SCENARIOS[rng.choice(names)](w)} for _ in range(4000)]
+
+    print(f"{cpus} CPUs; mix: {', '.join(names)}; {args.clients}x{args.concurrency} connections, "
+          f"{args.seconds:.0f}s per step, upstream latency {args.latency_ms} ms")
+    print(f"{'workers':>7} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7} {'efficiency':>10}")
+    steps: List[Dict[str, Any]] = []
+    base: Optional[float] = None
+    try:
+        for n in counts:
+            step = run_step(args, n, auth.url, requests)
+            base = base or step["rps"] / n
+            step["efficiency"] = round(step["rps"] / (n * base), 2) if base else 0.0
+            steps.append(step)
+            print(f"{n:>7} {step['rps']:>9.1f} {step['p50_ms']:>8.2f} {step['p99_ms']:>8.2f} {step['errors']:>7} {step['efficiency']:>10.2f}", flush=True)
+    finally:
+        auth.stop()
+
+    if args.json_path:
+        report = {
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "git_commit": _git_commit(),
+            "cpus": cpus,
+            "config": vars(args),
+            "steps": steps,
+        }
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"results written to {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
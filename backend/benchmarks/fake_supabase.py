@@ -0,0 +1,921 @@
+"""
+In-memory stand-in for the part of the Supabase client the services use.
+
+    fake = seed_dataset(users=500, latency_ms=20)
+    set_supabase_client(fake)            # app.services.supabase
+
+Covered:
+- Tables and views:
+  - `table()` / `from_()` over the tables in supabase/migrations.
+  - The views `challenge_stats`, `challenge_versions`, `posts_with_counts` and
+    `profiles_with_auth`.
+  - Rows look like PostgREST replies: uuids and timestamps are strings.
+- Builder shapes follow postgrest-py:
+  - `select()` returns a filterable, orderable and limitable builder.
+  - `update()` and `delete()` return filter builders.
+  - `insert()` and `upsert()` return builders that can only execute.
+  - Chains that fail against real PostgREST fail here too.
+- Filters:
+  - `eq`, `neq`, `gt`, `gte`, `lt`, `lte`, `in_`, `ilike`, `like`, `is_`.
+  - `or_()` with nested `and()` and quoted values.
+  - `order`, `limit`, and `select(count="exact")`.
+- RPCs: `get_feed`, `commit_to_challenge`,
+  `create_post_with_optional_challenge` and `changes_since`.
+- Storage: `storage.from_(bucket)` with `upload` and
+  `create_signed_upload_url`.
+- RLS:
+  - A query whose `headers` carry `Authorization: Bearer <token>` (set by
+    `get_supabase_client(token)`) runs with the table policies from the
+    migrations for the token's `sub`.
+  - `postgrest.auth(token)` sets a client-wide default, as on the real client.
+  - Views are not filtered; they run as their owner, as in Postgres.
+    `challenge_versions` is the exception: it is security_invoker, so
+    challenge policies apply.
+  - Without a token the client acts as the service role.
+
+Each execute / rpc / storage call is counted and then sleeps for the injected
+latency. The sleep happens on the calling thread, as the real synchronous client
+blocks it. Time spent inside the fake itself is tracked in `busy_seconds`, so
+its overhead can be told apart from the app's.
+"""
+
+from __future__ import annotations
+
+import base64
+import itertools
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from postgrest.exceptions import APIError
+
+Row = Dict[str, Any]
+Predicate = Callable[[Row], bool]
+
+# table -> primary key column
+_TABLES = {
+    "profiles": "user_id",
+    "connections": "id",
+    "challenges": "id",
+    "posts": "id",
+    "commitments": "id",
+    "change_log": "id",
+}
+# Secondary indexes used to narrow eq()/in_() lookups
+_INDEXED = {
+    "connections": ("requester_id", "addressee_id"),
+    "challenges": ("owner_id",),
+    "posts": ("author_id", "challenge_id"),
+    "commitments": ("user_id", "challenge_id"),
+}
+_VIEWS = ("challenge_stats", "challenge_versions", "posts_with_counts", "profiles_with_auth")
+
+
+def make_token(user_id: str) -> str:
+    """A JWT-shaped bearer token whose `sub` is `user_id` (unsigned; the fake auth server accepts it)."""
+    claims = json.dumps({"sub": user_id, "role": "authenticated"}).encode("utf-8")
+    return "bench." + base64.urlsafe_b64encode(claims).decode("ascii").rstrip("=") + ".sig"
+
+
+def token_subject(token: str) -> Optional[str]:
+    try:
+        segment = token.split(".")[1]
+        return json.loads(base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))).get("sub")
+    except (IndexError, ValueError, AttributeError):
+        return None
+
+
+def _iso(dt: datetime) -> str:
+    return dt.isoformat()
+
+
+def _norm(value: Any) -> Any:
+    """Make filter and row values comparable: ISO timestamps become datetimes, uuids strings."""
+    if isinstance(value, str) and len(value) >= 19 and value[4:5] == "-" and value[10:11] in ("T", " "):
+        try:
+            return datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return value
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def _coerce(row_value: Any, filter_value: Any) -> Tuple[Any, Any]:
+    a = _norm(row_value) if isinstance(filter_value, datetime) else row_value
+    b = filter_value
+    if isinstance(a, (int, float)) and not isinstance(a, bool) and isinstance(b, str):
+        try:
+            b = float(b)
+        except ValueError:
+            a = str(a)
+    elif isinstance(a, str) and not isinstance(b, str):
+        b = str(b)
+    return a, b
+
+
+def _like(pattern: str, ignore_case: bool) -> "re.Pattern[str]":
+    parts = [".*" if ch in "%*" else re.escape(ch) for ch in pattern]
+    return re.compile("".join(parts), re.IGNORECASE | re.DOTALL if ignore_case else re.DOTALL)
+
+
+def _predicate(column: str, op: str, value: Any) -> Predicate:
+    if op in ("ilike", "like"):
+        rx = _like(str(value), op == "ilike")
+        return lambda row: row.get(column) is not None and rx.fullmatch(str(row.get(column))) is not None
+    if op == "in":
+        wanted = {str(_norm(v)) for v in value}
+        return lambda row: row.get(column) is not None and str(row.get(column)) in wanted
+    if op == "is":
+        target = None if value in (None, "null") else (str(value).lower() == "true")
+        return lambda row: row.get(column) is target
+    target = _norm(value)
+
+    def check(row: Row) -> bool:
+        raw = row.get(column)
+        if raw is None or target is None:
+            return (op == "neq") == (raw is not target)
+        a, b = _coerce(raw, target)
+        try:
+            if op == "eq":
+                return a == b
+            if op == "neq":
+                return a != b
+            if op == "gt":
+                return a > b
+            if op == "gte":
+                return a >= b
+            if op == "lt":
+                return a < b
+            if op == "lte":
+                return a <= b
+        except TypeError:
+            return False
+        raise ValueError(f"unsupported operator {op}")
+
+    return check
+
+
+def _split_top(expr: str) -> List[str]:
+    """Split a PostgREST logic expression on top-level commas (outside parens and quotes)."""
+    out, depth, quoted, cur = [], 0, False, []
+    for ch in expr:
+        if ch == '"':
+            quoted = not quoted
+        elif not quoted and ch == "(":
+            depth += 1
+        elif not quoted and ch == ")":
+            depth -= 1
+        elif not quoted and depth == 0 and ch == ",":
+            out.append("".join(cur))
+            cur = []
+            continue
+        cur.append(ch)
+    if cur:
+        out.append("".join(cur))
+    return [t.strip() for t in out if t.strip()]
+
+
+def _parse_logic(term: str) -> Predicate:
+    for name, combine in (("and(", all), ("or(", any)):
+        if term.startswith(name) and term.endswith(")"):
+            preds = [_parse_logic(t) for t in _split_top(term[len(name):-1])]
+            return lambda row, preds=preds, combine=combine: combine(p(row) for p in preds)
+    column, op, value = term.split(".", 2)
+    if op == "in":
+        return _predicate(column, "in", [v.strip().strip('"') for v in value.strip("()").split(",")])
+    return _predicate(column, op, value.strip('"'))
+
+
+@dataclass
+class FakeResponse:
+    data: Any
+    count: Optional[int] = None
+
+
+class _Builder:
+    """State shared by the three builder shapes; only `execute()` is public here."""
+
+    def __init__(self, db: "FakeSupabase", table: str, op: str = "select", payload: Any = None, on_conflict: str = "") -> None:
+        self._db = db
+        self._table = table
+        self._op = op
+        self._payload = payload
+        self._on_conflict = on_conflict
+        self._columns: Optional[List[str]] = None
+        self._count: Optional[str] = None
+        self._filters: List[Tuple[str, str, Any]] = []
+        self._logic: List[Predicate] = []
+        self._order: List[Tuple[str, bool]] = []
+        self._limit: Optional[int] = None
+        self.headers: Dict[str, str] = {}
+
+    def execute(self) -> FakeResponse:
+        return self._db._run(self._op, lambda: self._db._execute_query(self), self.headers)
+
+
+class _FilterBuilder(_Builder):
+    def _add(self, column: str, op: str, value: Any) -> Any:
+        self._filters.append((column, op, value))
+        return self
+
+    def eq(self, column: str, value: Any) -> Any:
+        return self._add(column, "eq", value)
+
+    def neq(self, column: str, value: Any) -> Any:
+        return self._add(column, "neq", value)
+
+    def gt(self, column: str, value: Any) -> Any:
+        return self._add(column, "gt", value)
+
+    def gte(self, column: str, value: Any) -> Any:
+        return self._add(column, "gte", value)
+
+    def lt(self, column: str, value: Any) -> Any:
+        return self._add(column, "lt", value)
+
+    def lte(self, column: str, value: Any) -> Any:
+        return self._add(column, "lte", value)
+
+    def in_(self, column: str, values: Iterable[Any]) -> Any:
+        return self._add(column, "in", list(values))
+
+    def ilike(self, column: str, pattern: str) -> Any:
+        return self._add(column, "ilike", pattern)
+
+    def like(self, column: str, pattern: str) -> Any:
+        return self._add(column, "like", pattern)
+
+    def is_(self, column: str, value: Any) -> Any:
+        return self._add(column, "is", value)
+
+    def or_(self, filters: str, reference_table: Optional[str] = None) -> Any:
+        self._logic.append(_parse_logic(f"or({filters})"))
+        return self
+
+
+class _SelectBuilder(_FilterBuilder):
+    def order(self, column: str, *, desc: bool = False, nullsfirst: Optional[bool] = None, foreign_table: Optional[str] = None) -> Any:
+        self._order.append((column, desc))
+        return self
+
+    def limit(self, size: int, *, foreign_table: Optional[str] = None) -> Any:
+        self._limit = size
+        return self
+
+
+class _Table:
+    def __init__(self, db: "FakeSupabase", name: str) -> None:
+        self._db = db
+        self._name = name
+
+    def select(self, *columns: str, count: Optional[str] = None, head: Optional[bool] = None) -> _SelectBuilder:
+        b = _SelectBuilder(self._db, self._name)
+        spec = ",".join(columns) if columns else "*"
+        b._columns = None if spec.strip() == "*" else [c.strip() for c in spec.split(",") if c.strip()]
+        b._count = count
+        return b
+
+    def insert(self, json: Any, **kwargs: Any) -> _Builder:
+        return _Builder(self._db, self._name, "insert", json)
+
+    def upsert(self, json: Any, *, on_conflict: str = "", **kwargs: Any) -> _Builder:
+        return _Builder(self._db, self._name, "upsert", json, on_conflict=on_conflict)
+
+    def update(self, json: Any, **kwargs: Any) -> _FilterBuilder:
+        return _FilterBuilder(self._db, self._name, "update", json)
+
+    def delete(self, **kwargs: Any) -> _FilterBuilder:
+        return _FilterBuilder(self._db, self._name, "delete")
+
+
+class _Rpc:
+    def __init__(self, db: "FakeSupabase", fn: str, params: Dict[str, Any]) -> None:
+        self._db = db
+        self._fn = fn
+        self._params = params or {}
+        self.headers: Dict[str, str] = {}
+
+    def execute(self) -> FakeResponse:
+        return self._db._run("rpc", lambda: self._db._execute_rpc(self._fn, self._params), self.headers)
+
+
+class _Postgrest:
+    def __init__(self, db: "FakeSupabase") -> None:
+        self._db = db
+
+    def auth(self, token: Optional[str]) -> None:
+        # Shared client state, exactly like the real client
+        self._db.auth_user = token_subject(token) if token else None
+
+
+class _Bucket:
+    def __init__(self, db: "FakeSupabase", bucket: str) -> None:
+        self._db = db
+        self._bucket = bucket
+
+    def upload(self, path: str, file: bytes, file_options: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+        def run() -> Dict[str, str]:
+            self._db.objects[f"{self._bucket}/{path}"] = len(file)
+            return {"Key": f"{self._bucket}/{path}"}
+
+        return self._db._run("storage", run)
+
+    def create_signed_upload_url(self, path: str) -> Dict[str, str]:
+        def run() -> Dict[str, str]:
+            token = uuid.uuid4().hex
+            return {
+                "signed_url": f"http://fake-storage/object/upload/sign/{self._bucket}/{path}?token={token}",
+                "token": token,
+                "path": path,
+            }
+
+        return self._db._run("storage", run)
+
+
+class _Storage:
+    def __init__(self, db: "FakeSupabase") -> None:
+        self._db = db
+
+    def from_(self, bucket: str) -> _Bucket:
+        return _Bucket(self._db, bucket)
+
+
+class FakeSupabase:
+    """In-memory Supabase client; see the module docstring for what is covered."""
+
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0, seed: int = 0) -> None:
+        self.latency = latency_ms / 1000.0
+        self.jitter = jitter_ms / 1000.0
+        self._rng = random.Random(seed)
+        self.rows: Dict[str, Dict[Any, Row]] = {name: {} for name in _TABLES}
+        self._index: Dict[Tuple[str, str], Dict[Any, Set[Any]]] = {
+            (t, c): {} for t, cols in _INDEXED.items() for c in cols
+        }
+        self._ids = {name: itertools.count(1) for name in _TABLES}
+        # auth.users: id -> {email, phone}
+        self.users: Dict[str, Dict[str, Any]] = {}
+        self.objects: Dict[str, int] = {}
+        self.auth_user: Optional[str] = None
+        self.calls = 0
+        self.calls_by_kind: Dict[str, int] = {}
+        self.busy_seconds = 0.0
+        self._lock = threading.RLock()
+        self.postgrest = _Postgrest(self)
+        self.storage = _Storage(self)
+
+    # ---- client surface ----
+    def table(self, name: str) -> _Table:
+        if name not in _TABLES and name not in _VIEWS:
+            raise ValueError(f"unknown table {name}")
+        return _Table(self, name)
+
+    def from_(self, name: str) -> _Table:
+        return self.table(name)
+
+    def rpc(self, fn: str, params: Optional[Dict[str, Any]] = None, **kwargs: Any) -> _Rpc:
+        return _Rpc(self, fn, params or {})
+
+    def reset_counters(self) -> None:
+        with self._lock:
+            self.calls = 0
+            self.calls_by_kind = {}
+            self.busy_seconds = 0.0
+
+    # ---- seeding helpers (no latency, not counted) ----
+    def add_user(self, user_id: str, email: str, phone: str) -> None:
+        self.users[user_id] = {"id": user_id, "email": email, "phone": phone}
+
+    def add_row(self, table: str, row: Row) -> Row:
+        with self._lock:
+            return self._insert_locked(table, dict(row), log=False)
+
+    # ---- execution ----
+    def _run(self, kind: str, fn: Callable[[], Any], headers: Optional[Dict[str, str]] = None) -> Any:
+        auth = (headers or {}).get("Authorization", "")
+        with self._lock:
+            started = time.perf_counter()
+            self.calls += 1
+            self.calls_by_kind[kind] = self.calls_by_kind.get(kind, 0) + 1
+            # A per-query token wins over the client-wide one for this call only
+            default_user = self.auth_user
+            if auth.startswith("Bearer "):
+                self.auth_user = token_subject(auth[len("Bearer "):])
+            try:
+                result = fn()
+            finally:
+                self.auth_user = default_user
+                self.busy_seconds += time.perf_counter() - started
+            delay = self.latency + (self._rng.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay > 0:
+            time.sleep(delay)
+        return result
+
+    def _execute_query(self, b: _Builder) -> FakeResponse:
+        if b._op == "select":
+            rows = self._select_locked(b._table, b._filters, b._logic)
+            count = len(rows) if b._count else None
+            for column, desc in reversed(b._order):
+                present = [r for r in rows if r.get(column) is not None]
+                missing = [r for r in rows if r.get(column) is None]
+                present.sort(key=lambda r: _norm(r[column]), reverse=desc)
+                # PostgREST: nulls last ascending, first descending
+                rows = missing + present if desc else present + missing
+            if b._limit is not None:
+                rows = rows[: b._limit]
+            if b._columns is not None:
+                rows = [{c: r.get(c) for c in b._columns} for r in rows]
+            else:
+                rows = [dict(r) for r in rows]
+            return FakeResponse(data=rows, count=count)
+        if b._table not in _TABLES:
+            raise APIError({"code": "42809", "message": f"cannot write to view {b._table}"})
+        self._require_write(b._table)
+        if b._op in ("insert", "upsert"):
+            payload = b._payload if isinstance(b._payload, list) else [b._payload]
+            written = [self._write_locked(b._table, dict(p), b._op == "upsert", b._on_conflict) for p in payload]
+            return FakeResponse(data=[dict(r) for r in written])
+        targets = self._select_locked(b._table, b._filters, b._logic)
+        pk = _TABLES[b._table]
+        out: List[Row] = []
+        for row in targets:
+            if b._op == "update":
+                out.append(dict(self._update_locked(b._table, row[pk], b._payload)))
+            else:
+                out.append(dict(self._delete_locked(b._table, row[pk])))
+        return FakeResponse(data=out)
+
+    # ---- reads ----
+    def _connected(self, a: str, b: str) -> bool:
+        for x, y in ((a, b), (b, a)):
+            for cid in self._index[("connections", "requester_id")].get(x, ()):
+                c = self.rows["connections"][cid]
+                if c["addressee_id"] == y and c["status"] == "accepted":
+                    return True
+        return False
+
+    def lookup(self, table: str, column: str, value: Any) -> List[Row]:
+        """Rows of a base table by primary key or indexed column (seeding/benchmark helper, not counted)."""
+        with self._lock:
+            if column == _TABLES[table]:
+                row = self.rows[table].get(self._pk_value(table, value))
+                return [row] if row is not None else []
+            return [self.rows[table][k] for k in self._index[(table, column)].get(str(value), ())]
+
+    def network_of(self, user_id: str) -> Set[str]:
+        """Users with an accepted connection to `user_id` in either direction."""
+        out: Set[str] = set()
+        for col, other in (("requester_id", "addressee_id"), ("addressee_id", "requester_id")):
+            for cid in self._index[("connections", col)].get(user_id, ()):
+                c = self.rows["connections"][cid]
+                if c["status"] == "accepted":
+                    out.add(c[other])
+        return out
+
+    def _visible(self, table: str, row: Row) -> bool:
+        u = self.auth_user
+        if u is not None and table == "challenge_versions":
+            return self._visible("challenges", row)
+        if u is None or table in _VIEWS:
+            return True
+        if table == "profiles":
+            return row["user_id"] == u or self._connected(row["user_id"], u)
+        if table == "connections":
+            return u in (row["requester_id"], row["addressee_id"])
+        if table == "challenges":
+            return row["owner_id"] == u or self._connected(row["owner_id"], u)
+        if table == "posts":
+            return row["author_id"] == u or self._connected(row["author_id"], u)
+        if table == "commitments":
+            if row["user_id"] == u:
+                return True
+            ch = self.rows["challenges"].get(row["challenge_id"])
+            return ch is not None and self._visible("challenges", ch)
+        return False
+
+    def _candidates(self, base: str, filters: List[Tuple[str, str, Any]], column_map: Dict[str, str]) -> Optional[Set[Any]]:
+        """Primary keys of `base` matching the most selective indexed eq()/in_() filter, or None to scan."""
+        best: Optional[Set[Any]] = None
+        pk = _TABLES[base]
+        for column, op, value in filters:
+            col = column_map.get(column, column)
+            if op not in ("eq", "in"):
+                continue
+            values = value if op == "in" else [value]
+            if col == pk:
+                keys = {self._pk_value(base, v) for v in values}
+                keys = {k for k in keys if k in self.rows[base]}
+            elif (base, col) in self._index:
+                idx = self._index[(base, col)]
+                keys = set().union(*(idx.get(str(v), set()) for v in values)) if values else set()
+            else:
+                continue
+            if best is None or len(keys) < len(best):
+                best = keys
+        return best
+
+    @staticmethod
+    def _pk_value(table: str, value: Any) -> Any:
+        if _TABLES[table] == "id":
+            try:
+                return int(value)
+            except (TypeError, ValueError):
+                return value
+        return str(value)
+
+    def _base_rows(self, table: str, filters: List[Tuple[str, str, Any]]) -> Iterable[Row]:
+        if table in _TABLES:
+            keys = self._candidates(table, filters, {})
+            return self.rows[table].values() if keys is None else (self.rows[table][k] for k in keys)
+        if table == "challenge_stats":
+            keys = self._candidates("challenges", filters, {"challenge_id": "id"})
+            chs = self.rows["challenges"].values() if keys is None else (self.rows["challenges"][k] for k in keys)
+            return (self._stats_row(ch) for ch in chs)
+        if table == "challenge_versions":
+            keys = self._candidates("challenges", filters, {})
+            chs = self.rows["challenges"].values() if keys is None else (self.rows["challenges"][k] for k in keys)
+            return (self._version_row(ch) for ch in chs)
+        if table == "posts_with_counts":
+            keys = self._candidates("posts", filters, {})
+            posts = self.rows["posts"].values() if keys is None else (self.rows["posts"][k] for k in keys)
+            return (self._post_with_counts(p) for p in posts)
+        if table == "profiles_with_auth":
+            return (
+                {**p, "email": self.users.get(p["user_id"], {}).get("email"), "phone_e164": self.users.get(p["user_id"], {}).get("phone")}
+                for p in self.rows["profiles"].values()
+            )
+        raise ValueError(table)
+
+    def _select_locked(self, table: str, filters: List[Tuple[str, str, Any]], logic: List[Predicate]) -> List[Row]:
+        preds = [_predicate(c, op, v) for c, op, v in filters] + logic
+        return [r for r in self._base_rows(table, filters) if all(p(r) for p in preds) and self._visible(table, r)]
+
+    def _stats_row(self, ch: Row) -> Row:
+        for_count = against_count = 0
+        for cid in self._index[("commitments", "challenge_id")].get(str(ch["id"]), ()):
+            if self.rows["commitments"][cid]["side"] == "for":
+                for_count += 1
+            else:
+                against_count += 1
+        amount = ch["amount_cents"]
+        return {
+            "challenge_id": ch["id"],
+            "amount_cents": amount,
+            "for_count": for_count,
+            "against_count": against_count,
+            "for_amount_cents": for_count * amount,
+            "against_amount_cents": against_count * amount,
+        }
+
+    def _version_row(self, ch: Row) -> Row:
+        cids = self._index[("commitments", "challenge_id")].get(str(ch["id"]), ())
+        created = [self.rows["commitments"][cid]["created_at"] for cid in cids]
+        return {**ch, "commitment_count": len(created), "last_commitment_at": max(created, default=None)}
+
+    def _post_with_counts(self, post: Row) -> Row:
+        st = self._stats_row(self.rows["challenges"][post["challenge_id"]])
+        return {
+            **post,
+            "for_count": st["for_count"],
+            "against_count": st["against_count"],
+            "for_amount_cents": st["for_amount_cents"],
+            "against_amount_cents": st["against_amount_cents"],
+        }
+
+    # ---- writes ----
+    def _require_write(self, table: str) -> None:
+        if table == "change_log" and self.auth_user is not None:
+            raise APIError({"code": "42501", "message": "permission denied for table change_log"})
+
+    def _index_add(self, table: str, row: Row) -> None:
+        pk = row[_TABLES[table]]
+        for col in _INDEXED.get(table, ()):
+            self._index[(table, col)].setdefault(str(row.get(col)), set()).add(pk)
+
+    def _index_remove(self, table: str, row: Row) -> None:
+        pk = row[_TABLES[table]]
+        for col in _INDEXED.get(table, ()):
+            self._index[(table, col)].get(str(row.get(col)), set()).discard(pk)
+
+    def _log(self, table: str, row: Row, op: str) -> None:
+        entity = {"posts": "post", "commitments": "commitment", "connections": "connection"}.get(table)
+        if entity is None:
+            return
+        entry: Row = {"entity": entity, "entity_id": row["id"], "op": op, "changed_at": _iso(datetime.now(timezone.utc))}
+        if entity == "post":
+            entry.update(actor_id=row["author_id"], subject_id=None, challenge_id=row["challenge_id"])
+        elif entity == "commitment":
+            owner = self.rows["challenges"].get(row["challenge_id"], {}).get("owner_id")
+            entry.update(actor_id=row["user_id"], subject_id=owner, challenge_id=row["challenge_id"])
+        else:
+            entry.update(actor_id=row["requester_id"], subject_id=row["addressee_id"], challenge_id=None)
+        entry = self._insert_locked("change_log", entry, log=False)
+        # Every fake write is its own transaction, committed at once
+        entry["xid"] = entry["id"]
+
+    def _insert_locked(self, table: str, row: Row, log: bool = True) -> Row:
+        pk = _TABLES[table]
+        now = _iso(datetime.now(timezone.utc))
+        if pk == "id" and row.get("id") is None:
+            row["id"] = next(self._ids[table])
+        if pk == "id":
+            row["id"] = int(row["id"])
+        else:
+            row[pk] = str(row[pk])
+        row.setdefault("created_at", now)
+        if table == "profiles":
+            row.setdefault("updated_at", row["created_at"])
+            for col in ("username", "full_name", "avatar_url"):
+                row.setdefault(col, None)
+        elif table == "challenges":
+            row.setdefault("updated_at", row["created_at"])
+            for col in ("description", "starts_at", "ends_at"):
+                row.setdefault(col, None)
+        elif table == "posts":
+            row.setdefault("caption", None)
+            row.setdefault("media_url", None)
+        elif table == "connections":
+            row.setdefault("status", "pending")
+        if row[pk] in self.rows[table]:
+            raise APIError({"code": "23505", "message": f"duplicate key value violates unique constraint on {table}"})
+        self.rows[table][row[pk]] = row
+        self._index_add(table, row)
+        if log:
+            self._log(table, row, "I")
+        return row
+
+    def _write_locked(self, table: str, row: Row, upsert: bool, on_conflict: str) -> Row:
+        if table == "profiles" and self.auth_user is not None and str(row.get("user_id")) != self.auth_user:
+            raise APIError({"code": "42501", "message": "new row violates row-level security policy for table \"profiles\""})
+        if upsert:
+            keys = [k.strip() for k in (on_conflict or _TABLES[table]).split(",") if k.strip()]
+            existing = self._select_locked(table, [(k, "eq", row.get(k)) for k in keys], [])
+            if existing:
+                return self._update_locked(table, existing[0][_TABLES[table]], row)
+        return self._insert_locked(table, row)
+
+    def _update_locked(self, table: str, pk: Any, patch: Dict[str, Any]) -> Row:
+        row = self.rows[table][pk]
+        self._index_remove(table, row)
+        row.update({k: v for k, v in patch.items() if k != _TABLES[table]})
+        if table in ("profiles", "challenges") and "updated_at" not in patch:
+            row["updated_at"] = _iso(datetime.now(timezone.utc))
+        self._index_add(table, row)
+        self._log(table, row, "U")
+        return row
+
+    def _delete_locked(self, table: str, pk: Any) -> Row:
+        row = self.rows[table].pop(pk)
+        self._index_remove(table, row)
+        self._log(table, row, "D")
+        return row
+
+    # ---- RPCs ----
+    def _execute_rpc(self, fn: str, params: Dict[str, Any]) -> FakeResponse:
+        handler = getattr(self, f"_rpc_{fn}", None)
+        if handler is None:
+            raise APIError({"code": "PGRST202", "message": f"Could not find the function public.{fn}"})
+        return FakeResponse(data=handler(**params))
+
+    def _rpc_get_feed(self, p_after: Optional[str] = None, p_limit: int = 50) -> List[Row]:
+        u = self.auth_user
+        authors = {u} | self.network_of(u) if u else set()
+        after = _norm(p_after) if p_after else None
+        posts = [
+            self.rows["posts"][pid]
+            for a in authors
+            for pid in self._index[("posts", "author_id")].get(a, ())
+        ]
+        if after is not None:
+            posts = [p for p in posts if _norm(p["created_at"]) < after]
+        posts.sort(key=lambda p: _norm(p["created_at"]), reverse=True)
+        return [self._post_with_counts(p) for p in posts[: max(1, min(int(p_limit), 100))]]
+
+    def _rpc_commit_to_challenge(self, p_challenge_id: int, p_side: str) -> Row:
+        u = self.auth_user
+        ch = self.rows["challenges"].get(int(p_challenge_id))
+        existing = [
+            self.rows["commitments"][cid]
+            for cid in self._index[("commitments", "user_id")].get(str(u), ())
+            if self.rows["commitments"][cid]["challenge_id"] == int(p_challenge_id)
+        ]
+        if existing:
+            row, created = existing[0], False
+        elif u is None or ch is None or not self._visible("challenges", ch):
+            raise APIError({"code": "42501", "message": "Commitment not allowed"})
+        else:
+            row = self._insert_locked("commitments", {"user_id": u, "challenge_id": ch["id"], "side": p_side})
+            created = True
+        return {**row, "created": created, "stats": self._stats_row(self.rows["challenges"][row["challenge_id"]])}
+
+    def _rpc_create_post_with_optional_challenge(
+        self,
+        p_actor_id: Optional[str] = None,
+        p_challenge_id: Optional[int] = None,
+        p_title: Optional[str] = None,
+        p_description: Optional[str] = None,
+        p_amount_cents: Optional[int] = None,
+        p_starts_at: Optional[str] = None,
+        p_ends_at: Optional[str] = None,
+        p_caption: Optional[str] = None,
+        p_media_url: Optional[str] = None,
+    ) -> Row:
+        u = self.auth_user or p_actor_id
+        if p_challenge_id is not None:
+            ch = self.rows["challenges"].get(int(p_challenge_id))
+            if ch is None or ch["owner_id"] != u:
+                raise APIError({"code": "42501", "message": "Not the owner of the target challenge"})
+            challenge_id = ch["id"]
+        else:
+            if p_title is None or p_amount_cents is None:
+                raise APIError({"code": "22023", "message": "Missing new challenge fields: title and amount_cents are required"})
+            challenge_id = self._insert_locked("challenges", {
+                "owner_id": u, "title": p_title, "description": p_description, "amount_cents": p_amount_cents,
+                "starts_at": p_starts_at, "ends_at": p_ends_at,
+            })["id"]
+        post = self._insert_locked("posts", {"challenge_id": challenge_id, "author_id": u, "caption": p_caption, "media_url": p_media_url})
+        return self._post_with_counts(post)
+
+    def _rpc_changes_since(self, p_after_xid: Optional[int] = None, p_after_id: int = 0, p_limit: int = 500) -> Row:
+        log = self.rows["change_log"]
+        # No transaction is ever in flight, so the snapshot xmin is the next xid
+        head = max(log) + 1 if log else 1
+        changes: List[Row] = []
+        if p_after_xid is not None:
+            u = self.auth_user
+            cap = max(1, min(int(p_limit), 1000)) + 1
+            after = (int(p_after_xid), int(p_after_id or 0))
+            for lid in sorted(k for k in log if (log[k]["xid"], k) > after):
+                c = log[lid]
+                if c["entity"] == "post":
+                    ok = c["actor_id"] == u or self._connected(c["actor_id"], u)
+                elif c["entity"] == "commitment":
+                    ok = u in (c["actor_id"], c["subject_id"]) or (c["subject_id"] is not None and self._connected(c["subject_id"], u))
+                else:
+                    ok = u in (c["actor_id"], c["subject_id"])
+                if ok:
+                    changes.append(dict(c))
+                    if len(changes) >= cap:
+                        break
+        return {"head": head, "pruned": None, "changes": changes}
+
+
+def seed_dataset(
+    users: int = 200,
+    follows_per_user: int = 15,
+    challenges_per_user: int = 3,
+    commitments_per_challenge: int = 6,
+    seed: int = 42,
+    latency_ms: float = 0.0,
+    jitter_ms: float = 0.0,
+) -> FakeSupabase:
+    """Build a FakeSupabase with a deterministic social graph.
+
+    Follows are skewed toward low user indexes (a few popular accounts), every
+    challenge gets one post, and commitments come from the owner's network.
+    """
+    rng = random.Random(seed)
+    fake = FakeSupabase(latency_ms=latency_ms, jitter_ms=jitter_ms, seed=seed)
+    now = datetime.now(timezone.utc)
+    ids = [str(uuid.UUID(int=rng.getrandbits(128), version=4)) for _ in range(users)]
+
+    for i, uid in enumerate(ids):
+        fake.add_user(uid, email=f"user{i}@example.com", phone=f"1555{i:07d}")
+        created = _iso(now - timedelta(days=365, minutes=i))
+        fake.add_row("profiles", {
+            "user_id": uid, "username": f"user{i}", "full_name": f"User {i}",
+            "avatar_url": f"avatars/{uid}.jpg", "created_at": created, "updated_at": created,
+        })
+
+    for i, uid in enumerate(ids):
+        targets: Set[str] = set()
+        for _ in range(min(follows_per_user, users - 1) * 2):
+            # Half the follows go to a small set of popular accounts, half are uniform
+            if rng.random() < 0.5:
+                j = min(users - 1, int(rng.paretovariate(1.2)) - 1 + rng.randrange(max(1, users // 20)))
+            else:
+                j = rng.randrange(users)
+            if j != i:
+                targets.add(ids[j])
+            if len(targets) >= follows_per_user:
+                break
+        for target in targets:
+            fake.add_row("connections", {
+                "requester_id": uid, "addressee_id": target, "status": "accepted",
+                "created_at": _iso(now - timedelta(days=rng.randrange(1, 300))),
+            })
+
+    minute = 0
+    for uid in ids:
+        network = sorted(fake.network_of(uid))
+        for k in range(challenges_per_user):
+            minute += rng.randrange(1, 30)
+            created = now - timedelta(minutes=minute)
+            ch = fake.add_row("challenges", {
+                "owner_id": uid, "title": f"challenge {uid[:8]}-{k} run {rng.choice(['5k', '10k', 'daily', 'weekly'])}",
+                "description": rng.choice([None, "no sugar for a month", "wake up at 6", "read 20 pages"]),
+                "amount_cents": rng.choice([500, 1000, 2500]),
+                "starts_at": _iso(created), "ends_at": _iso(created + timedelta(days=rng.randrange(1, 60))),
+                "created_at": _iso(created),
+            })
+            fake.add_row("posts", {
+                "challenge_id": ch["id"], "author_id": uid, "caption": f"day one of {ch['title']}",
+                "media_url": f"posts/{uid}/{ch['id']}/front.jpg", "created_at": _iso(created + timedelta(seconds=5)),
+            })
+            for committer in rng.sample(network, min(commitments_per_challenge, len(network))):
+                fake.add_row("commitments", {
+                    "user_id": committer, "challenge_id": ch["id"], "side": rng.choice(["for", "for", "against"]),
+                    "created_at": _iso(created + timedelta(minutes=rng.randrange(1, 600))),
+                })
+    return fake
+
+
+class FakeAuthServer:
+    """Local HTTP stand-in for Supabase Auth (`/auth/v1/user`, `/auth/v1/token`, `/auth/v1/health`).
+
+    The app verifies tokens with urllib against SUPABASE_URL, so this runs a real
+    socket: point SUPABASE_URL at `url` before importing the app. Tokens from
+    `make_token` for users in `fake.users` are accepted after `latency_ms`.
+    Password sign-in accepts any password for a known email.
+    """
+
+    def __init__(self, fake: FakeSupabase, latency_ms: float = 0.0) -> None:
+        self.fake = fake
+        self.latency = latency_ms / 1000.0
+        self.calls = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self) -> None:  # noqa: N802
+                server.calls += 1
+                if server.latency:
+                    time.sleep(server.latency)
+                status, body = 404, {"msg": "not found"}
+                if self.path.startswith("/auth/v1/health"):
+                    status, body = 200, {"name": "GoTrue", "description": "fake"}
+                elif self.path.startswith("/auth/v1/user"):
+                    auth = self.headers.get("Authorization", "")
+                    sub = token_subject(auth.split(" ", 1)[1]) if " " in auth else None
+                    user = server.fake.users.get(sub or "")
+                    if user is None:
+                        status, body = 401, {"msg": "invalid JWT"}
+                    else:
+                        status, body = 200, {"id": user["id"], "email": user["email"], "phone": user["phone"], "role": "authenticated"}
+                self._reply(status, body)
+
+            def do_POST(self) -> None:  # noqa: N802
+                server.calls += 1
+                if server.latency:
+                    time.sleep(server.latency)
+                length = int(self.headers.get("Content-Length") or 0)
+                try:
+                    email = json.loads(self.rfile.read(length) or b"{}").get("email")
+                except ValueError:
+                    email = None
+                status, body = 400, {"error": "invalid_grant", "error_description": "Invalid login credentials"}
+                if self.path.startswith("/auth/v1/token"):
+                    user = next((u for u in server.fake.users.values() if u["email"] == email), None)
+                    if user is not None:
+                        status, body = 200, {
+                            "access_token": make_token(user["id"]),
+                            "token_type": "bearer",
+                            "expires_in": 3600,
+                            "user": {"id": user["id"], "email": user["email"], "role": "authenticated"},
+                        }
+                self._reply(status, body)
+
+            def _reply(self, status: int, body: Dict[str, Any]) -> None:
+                raw = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(raw)))
+                self.end_headers()
+                self.wfile.write(raw)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._httpd.server_address[1]}"
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="fake-auth", daemon=True)
+
+    def start(self) -> "FakeAuthServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+__all__ = ["FakeAuthServer", "FakeResponse", "FakeSupabase", "make_token", "seed_dataset", "token_subject"]
@@ -0,0 +1,118 @@
+"""
+Import-time report and budget check for `import app.main`.
+
+Imports the app in `--runs` fresh interpreters under `python -X importtime`
+(after one untimed run that writes bytecode caches) and reports:
+- the wall time of `import app.main`, median and best of the runs
+- the slowest modules by cumulative and by self time, from the median run
+- self time summed per top-level package, to show which dependency is heavy
+
+Exits with status 1 when the median exceeds `--budget-ms`, so CI can reject a
+change that makes the import slower: a new eager heavy dependency, or startup
+work done at import. Work that needs the network or the event loop belongs in
+the lifespan (app.services.warmup); dependencies only some processes need can
+be imported where they are used (see app.services.supabase).
+
+Run from backend/:
+    python -m benchmarks.import_time [--runs 5] [--budget-ms 800] [--top 15] [--json imports.json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Tuple
+
+from benchmarks.loadtest import _git_commit
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_SNIPPET = "import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+
+
+def _import_once(module: str) -> Tuple[float, List[Tuple[str, int, int, int]]]:
+    """Import `module` in a fresh interpreter; (wall seconds, [(name, depth, self_us, cumulative_us)])."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _SNIPPET.format(module=module)],
+        cwd=BACKEND, capture_output=True, text=True, check=False,
+    )
+    if proc.returncode != 0:
+        raise SystemExit(f"import {module} failed:\n{proc.stderr[-2000:]}")
+    modules: List[Tuple[str, int, int, int]] = []
+    for line in proc.stderr.splitlines():
+        # "import time:       self [us] |  cumulative | imported package"
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip(" "))) // 2
+        modules.append((name.strip(), depth, int(self_us), int(cumulative_us)))
+    return float(proc.stdout.strip().splitlines()[-1]), modules
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=800.0, help="fail when the median import exceeds this (0 = report only)")
+    parser.add_argument("--top", type=int, default=15, help="rows per table")
+    parser.add_argument("--json", dest="json_path", default="", help="write results as JSON")
+    args = parser.parse_args()
+
+    _import_once(args.module)
+    runs = sorted((_import_once(args.module) for _ in range(max(1, args.runs))), key=lambda r: r[0])
+    wall_ms = [r[0] * 1000 for r in runs]
+    median_ms = statistics.median(wall_ms)
+    modules = runs[len(runs) // 2][1]
+
+    by_package: Dict[str, int] = defaultdict(int)
+    for name, _, self_us, _ in modules:
+        by_package[name.split(".")[0]] += self_us
+    slowest_cumulative = sorted(modules, key=lambda m: m[3], reverse=True)[: args.top]
+    slowest_self = sorted(modules, key=lambda m: m[2], reverse=True)[: args.top]
+    packages = sorted(by_package.items(), key=lambda kv: kv[1], reverse=True)[: args.top]
+
+    print(f"import {args.module}: median {median_ms:.0f} ms, best {wall_ms[0]:.0f} ms "
+          f"({len(runs)} runs, {len(modules)} modules)")
+    print(f"\n{'cumulative ms':>13}  module")
+    for name, depth, _, cumulative_us in slowest_cumulative:
+        print(f"{cumulative_us / 1000:>13.1f}  {'  ' * depth}{name}")
+    print(f"\n{'self ms':>13}  module")
+    for name, _, self_us, _ in slowest_self:
+        print(f"{self_us / 1000:>13.1f}  {name}")
+    print(f"\n{'self ms':>13}  top-level package")
+    for package, self_us in packages:
+        print(f"{self_us / 1000:>13.1f}  {package}")
+
+    over = args.budget_ms > 0 and median_ms > args.budget_ms
+    if args.json_path:
+        report: Dict[str, Any] = {
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "git_commit": _git_commit(),
+            "config": vars(args),
+            "wall_ms": [round(ms, 1) for ms in wall_ms],
+            "median_ms": round(median_ms, 1),
+            "over_budget": over,
+            "packages_ms": {package: round(us / 1000, 1) for package, us in packages},
+            "modules": [
+                {"name": name, "depth": depth, "self_ms": round(s / 1000, 2), "cumulative_ms": round(c / 1000, 2)}
+                for name, depth, s, c in modules
+            ],
+        }
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nresults written to {args.json_path}")
+
+    if over:
+        print(f"\nFAIL: median {median_ms:.0f} ms is over the {args.budget_ms:.0f} ms budget")
+        raise SystemExit(1)
+    if args.budget_ms > 0:
+        print(f"\nOK: median {median_ms:.0f} ms is within the {args.budget_ms:.0f} ms budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,469 @@
+"""
+Load test: how many concurrent app users one worker sustains.
+
+Replays the client flows in `frontend/lib/api/*` as sessions:
+
+    login (Supabase Auth) -> GET /me -> scroll /feed (a few pages) -> open a challenge
+    -> GET .../commitments/me -> POST .../commitments -> [create post -> presign -> PATCH media]
+
+The upload leg runs for `--upload-ratio` of sessions. The file itself would go
+to Storage, so it is not sent. Sessions arrive open-loop (Poisson) at each
+rate in `--rates` (sessions/s) for `--step-seconds`, with exponential think
+times between calls. A slow server therefore builds a backlog instead of
+quietly lowering the offered load.
+
+Target:
+- default: one uvicorn worker in a subprocess, backed by `benchmarks.fake_supabase`
+  (seeded dataset, injected `--latency-ms`) and its fake Auth server.
+- `--target URL --accounts FILE`: any running server, e.g. the app pointed at a
+  local Postgres + PostgREST/GoTrue stack. FILE is JSON:
+  {"auth_url": "http://127.0.0.1:54321", "apikey": "<anon key>",
+   "accounts": [{"email": "...", "password": "..."}, ...]}
+
+For each step the JSON report has:
+- throughput
+- latency percentiles, overall and per call
+- error rates and status counts
+- completed and dropped sessions
+- worker CPU use (built-in server only)
+
+It also records the first step that broke the SLO (`saturation`), so runs can
+be compared over time.
+
+Run from backend/:
+    python -m benchmarks.loadtest [--rates 1,2,4,8,16] [--step-seconds 20] [--latency-ms 5]
+                                  [--slo-p99-ms 500] [--out loadtest.json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from benchmarks.bench_routes import percentile
+
+API = "/api/v1"
+
+
+@dataclass
+class Step:
+    """Measurements for requests sent while one arrival rate was offered."""
+
+    rate: float
+    started_at: float = 0.0
+    seconds: float = 0.0
+    sessions_started: int = 0
+    sessions_completed: int = 0
+    sessions_dropped: int = 0
+    latencies: Dict[str, List[float]] = field(default_factory=lambda: defaultdict(list))
+    statuses: Dict[str, Counter] = field(default_factory=lambda: defaultdict(Counter))
+    errors: Counter = field(default_factory=Counter)
+    in_flight_at_end: int = 0
+    cpu_seconds: Optional[float] = None
+
+    def record(self, call: str, ms: float, status: str, ok: bool) -> None:
+        self.latencies[call].append(ms)
+        self.statuses[call][status] += 1
+        if not ok:
+            self.errors[call] += 1
+
+    def summary(self) -> Dict[str, Any]:
+        every = sorted(ms for values in self.latencies.values() for ms in values)
+        requests = len(every)
+        errors = sum(self.errors.values())
+        calls = {}
+        for call in sorted(self.latencies):
+            values = sorted(self.latencies[call])
+            calls[call] = {
+                "requests": len(values),
+                "p50_ms": round(percentile(values, 50), 2),
+                "p90_ms": round(percentile(values, 90), 2),
+                "p99_ms": round(percentile(values, 99), 2),
+                "error_rate": round(self.errors[call] / len(values), 4),
+                "statuses": dict(self.statuses[call]),
+            }
+        return {
+            "offered_sessions_per_s": self.rate,
+            "seconds": round(self.seconds, 2),
+            "sessions_started": self.sessions_started,
+            "sessions_completed": self.sessions_completed,
+            "sessions_dropped": self.sessions_dropped,
+            "sessions_in_flight_at_end": self.in_flight_at_end,
+            "requests": requests,
+            "throughput_rps": round(requests / self.seconds, 1) if self.seconds else 0.0,
+            "ok_rps": round((requests - errors) / self.seconds, 1) if self.seconds else 0.0,
+            "error_rate": round(errors / requests, 4) if requests else 0.0,
+            "p50_ms": round(percentile(every, 50), 2),
+            "p90_ms": round(percentile(every, 90), 2),
+            "p99_ms": round(percentile(every, 99), 2),
+            "max_ms": round(every[-1], 2) if every else 0.0,
+            "worker_cpu_percent": (
+                round(100.0 * self.cpu_seconds / self.seconds, 1)
+                if self.cpu_seconds is not None and self.seconds else None
+            ),
+            "calls": calls,
+        }
+
+
+class Run:
+    """Shared state of a load run: the step currently being offered and the HTTP clients."""
+
+    def __init__(self, args: argparse.Namespace, api: httpx.AsyncClient, auth: httpx.AsyncClient, accounts: List[Dict[str, str]], apikey: str) -> None:
+        self.args = args
+        self.api = api
+        self.auth = auth
+        self.accounts = accounts
+        self.apikey = apikey
+        self.rng = random.Random(args.seed)
+        self.step: Step = Step(rate=0.0)
+        self.tasks: set = set()
+
+    async def think(self) -> None:
+        if self.args.think_ms > 0:
+            await asyncio.sleep(self.rng.expovariate(1000.0 / self.args.think_ms))
+
+    async def call(
+        self, name: str, client: httpx.AsyncClient, method: str, url: str, ok: tuple = (200, 201), **kwargs: Any
+    ) -> Optional[Any]:
+        # Attributed to the step being offered when the request is sent
+        step = self.step
+        started = time.perf_counter()
+        try:
+            resp = await client.request(method, url, **kwargs)
+            status, good = str(resp.status_code), resp.status_code in ok
+        except httpx.TimeoutException:
+            resp, status, good = None, "timeout", False
+        except httpx.TransportError as e:
+            resp, status, good = None, type(e).__name__, False
+        step.record(name, (time.perf_counter() - started) * 1000, status, good)
+        if resp is None or not good or resp.status_code == 404:
+            return None
+        try:
+            return resp.json() if resp.content else {}
+        except ValueError:
+            return None
+
+    async def session(self, account: Dict[str, str]) -> None:
+        step = self.step
+        await self._session(account)
+        step.sessions_completed += 1
+
+    async def _session(self, account: Dict[str, str]) -> None:
+        rng = self.rng
+        login = await self.call(
+            "login", self.auth, "POST", "/auth/v1/token", params={"grant_type": "password"},
+            json={"email": account["email"], "password": account["password"]},
+            headers={"apikey": self.apikey} if self.apikey else None,
+        )
+        if not login:
+            return
+        headers = {"Authorization": f"Bearer {login['access_token']}"}
+        user_id = (login.get("user") or {}).get("id")
+        await self.think()
+        await self.call("GET /me", self.api, "GET", f"{API}/me", headers=headers)
+
+        items: List[Dict[str, Any]] = []
+        cursor = None
+        for _ in range(rng.randint(1, self.args.feed_pages)):
+            await self.think()
+            params = {"limit": 20, **({"cursor": cursor} if cursor else {})}
+            page = await self.call("GET /feed", self.api, "GET", f"{API}/feed", headers=headers, params=params)
+            if not page:
+                break
+            items.extend(page.get("items") or [])
+            cursor = page.get("next_cursor")
+            if not cursor:
+                break
+
+        if items:
+            challenge_id = rng.choice(items)["challenge_id"]
+            await self.think()
+            await self.call("GET /challenges/{id}", self.api, "GET", f"{API}/challenges/{challenge_id}", headers=headers)
+            await self.think()
+            # 404 is the normal "not committed yet" answer
+            await self.call(
+                "GET /challenges/{id}/commitments/me", self.api, "GET",
+                f"{API}/challenges/{challenge_id}/commitments/me", ok=(200, 404), headers=headers,
+            )
+            await self.think()
+            await self.call(
+                "POST /challenges/{id}/commitments", self.api, "POST", f"{API}/challenges/{challenge_id}/commitments",
+                headers=headers, json={"direction": rng.choice(["for", "against"]), "idempotency_key": os.urandom(8).hex()},
+            )
+
+        if rng.random() < self.args.upload_ratio:
+            await self.think()
+            # Posts go under the caller's own challenges; POST /posts rejects anyone else's
+            mine = await self.call(
+                "GET /challenges", self.api, "GET", f"{API}/challenges", headers=headers,
+                params={"creator_id": user_id} if user_id else None,
+            )
+            if mine is None:
+                return
+            await self.think()
+            target = (
+                {"challenge_id": rng.choice(mine)["id"]}
+                if mine
+                else {"new_challenge": {"title": "load test", "amount_cents": 500}}
+            )
+            post = await self.call(
+                "POST /posts", self.api, "POST", f"{API}/posts", headers=headers,
+                json={**target, "caption": "load test"},
+            )
+            if not post:
+                return
+            presign = await self.call(
+                "POST /uploads/presign", self.api, "POST", f"{API}/uploads/presign", headers=headers,
+                json={"post_id": post["id"], "file_ext": "jpg", "content_type": "image/jpeg"},
+            )
+            if not presign:
+                return
+            await self.call(
+                "PATCH /posts/{id}/media", self.api, "PATCH", f"{API}/posts/{post['id']}/media", headers=headers,
+                json={"media_url": presign["path"]},
+            )
+
+    async def offer(self, rate: float, seconds: float) -> Step:
+        """Start sessions as a Poisson process at `rate`/s for `seconds`."""
+        step = self.step = Step(rate=rate, started_at=time.perf_counter())
+        deadline = step.started_at + seconds
+        next_arrival = step.started_at
+        while True:
+            next_arrival += self.rng.expovariate(rate)
+            if next_arrival >= deadline:
+                break
+            await asyncio.sleep(max(0.0, next_arrival - time.perf_counter()))
+            if len(self.tasks) >= self.args.max_sessions:
+                step.sessions_dropped += 1
+                continue
+            step.sessions_started += 1
+            task = asyncio.get_running_loop().create_task(self.session(self.rng.choice(self.accounts)))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+        await asyncio.sleep(max(0.0, deadline - time.perf_counter()))
+        step.seconds = time.perf_counter() - step.started_at
+        step.in_flight_at_end = len(self.tasks)
+        return step
+
+    async def drain(self, seconds: float) -> int:
+        """Wait up to `seconds` for running sessions, then cancel the rest; returns how many were cancelled."""
+        if self.tasks:
+            await asyncio.wait(set(self.tasks), timeout=seconds)
+        leftover = list(self.tasks)
+        for task in leftover:
+            task.cancel()
+        await asyncio.gather(*leftover, return_exceptions=True)
+        return len(leftover)
+
+
+def saturation_reasons(summary: Dict[str, Any], baseline_error_rate: float, args: argparse.Namespace) -> List[str]:
+    """Why a step counts as saturated; empty when the worker kept up.
+
+    Errors are judged against the first (lightest) step, so failures that happen
+    at any load (bad fixtures, broken routes) do not read as saturation.
+    """
+    reasons = []
+    if summary["p99_ms"] > args.slo_p99_ms:
+        reasons.append(f"p99 {summary['p99_ms']} ms > {args.slo_p99_ms:g} ms")
+    if summary["error_rate"] > baseline_error_rate + args.max_error_rate:
+        reasons.append(
+            f"error rate {summary['error_rate']:.2%} > baseline {baseline_error_rate:.2%} + {args.max_error_rate:.2%}"
+        )
+    if summary["sessions_dropped"]:
+        reasons.append(f"{summary['sessions_dropped']} sessions dropped at --max-sessions")
+    return reasons
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def serve(args: argparse.Namespace) -> None:
+    """Child process: one uvicorn worker on the fake Supabase; writes the accounts file when ready."""
+    from benchmarks.fake_supabase import FakeAuthServer, seed_dataset
+
+    fake = seed_dataset(users=args.users, seed=args.seed, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms)
+    auth = FakeAuthServer(fake, latency_ms=args.auth_latency_ms).start()
+    os.environ["SUPABASE_URL"] = auth.url
+    os.environ["SUPABASE_KEY"] = "bench"
+    os.environ["SUPABASE_SERVICE_ROLE_KEY"] = ""
+    os.environ["DATABASE_URL"] = ""
+    os.environ.setdefault("PROFILER_ENABLED", "false")
+    if not args.rate_limits:
+        os.environ["RATE_LIMIT_ENABLED"] = "false"
+
+    import uvicorn
+
+    from app.main import app
+    from app.services.supabase import set_supabase_client
+
+    set_supabase_client(fake)
+    accounts = [{"email": u["email"], "password": "bench"} for u in fake.users.values()]
+    with open(args.accounts, "w", encoding="utf-8") as f:
+        json.dump({"auth_url": auth.url, "accounts": accounts}, f)
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning", access_log=False)
+
+
+def _cpu_seconds(pid: int) -> Optional[float]:
+    """utime + stime of `pid` from /proc (Linux); None elsewhere."""
+    try:
+        with open(f"/proc/{pid}/stat", encoding="ascii") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+def _start_worker(args: argparse.Namespace) -> tuple:
+    port = _free_port()
+    accounts = os.path.join(tempfile.mkdtemp(prefix="loadtest-"), "accounts.json")
+    cmd = [
+        sys.executable, "-m", "benchmarks.loadtest", "--serve", "--port", str(port), "--accounts", accounts,
+        "--users", str(args.users), "--seed", str(args.seed), "--latency-ms", str(args.latency_ms),
+        "--jitter-ms", str(args.jitter_ms), "--auth-latency-ms", str(args.auth_latency_ms),
+    ] + (["--rate-limits"] if args.rate_limits else [])
+    proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL)
+    target = f"http://127.0.0.1:{port}"
+    give_up = time.monotonic() + 60
+    while time.monotonic() < give_up:
+        if proc.poll() is not None:
+            raise SystemExit(f"worker exited with {proc.returncode}")
+        try:
+            if httpx.get(f"{target}{API}/ping", timeout=1).status_code == 200 and os.path.exists(accounts):
+                return proc, target, accounts
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+    proc.terminate()
+    raise SystemExit("worker did not start within 60 s")
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rates", default="1,2,4,8,16", help="comma-separated session arrival rates (sessions/s)")
+    parser.add_argument("--step-seconds", type=float, default=20.0)
+    parser.add_argument("--drain-seconds", type=float, default=10.0, help="wait for in-flight sessions after the last step")
+    parser.add_argument("--think-ms", type=float, default=300.0, help="mean think time between calls in a session")
+    parser.add_argument("--feed-pages", type=int, default=3, help="max feed pages scrolled per session")
+    parser.add_argument("--upload-ratio", type=float, default=0.2, help="share of sessions that post and upload")
+    parser.add_argument("--max-sessions", type=int, default=2000, help="in-flight session cap; arrivals beyond it are dropped")
+    parser.add_argument("--timeout", type=float, default=10.0, help="per-request timeout (s)")
+    parser.add_argument("--slo-p99-ms", type=float, default=500.0)
+    parser.add_argument("--max-error-rate", type=float, default=0.01, help="allowed error rate above the first step's")
+    parser.add_argument("--stop-at-saturation", action="store_true", help="skip the remaining rates once saturated")
+    parser.add_argument("--target", default="", help="base URL of a running server (default: start one on the fake)")
+    parser.add_argument("--accounts", default="", help="accounts JSON for --target (see above)")
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="fake PostgREST/Storage latency per call")
+    parser.add_argument("--jitter-ms", type=float, default=2.0)
+    parser.add_argument("--auth-latency-ms", type=float, default=5.0)
+    parser.add_argument("--rate-limits", action="store_true", help="keep RATE_LIMITS enforced (off by default)")
+    parser.add_argument("--out", default="", help="JSON report path (default: loadtest-<timestamp>.json)")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, default=0, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args)
+        return
+
+    proc = None
+    if args.target:
+        if not args.accounts:
+            parser.error("--target needs --accounts")
+        target, accounts_path = args.target.rstrip("/"), args.accounts
+    else:
+        proc, target, accounts_path = _start_worker(args)
+    with open(accounts_path, encoding="utf-8") as f:
+        spec = json.load(f)
+
+    rates = [float(r) for r in args.rates.split(",") if r.strip()]
+    started_at = datetime.now(timezone.utc)
+    offered: List[Step] = []
+    cancelled = 0
+
+    def _line(summary: Dict[str, Any], reasons: List[str]) -> str:
+        cpu = summary["worker_cpu_percent"]
+        return (
+            f"{summary['offered_sessions_per_s']:6g} sess/s  {summary['throughput_rps']:8.1f} req/s  "
+            f"p50 {summary['p50_ms']:8.1f} ms  p99 {summary['p99_ms']:8.1f} ms  errors {summary['error_rate']:6.2%}  "
+            f"cpu {'-' if cpu is None else cpu}%" + (f"  SATURATED: {'; '.join(reasons)}" if reasons else "")
+        )
+
+    async def run_all() -> None:
+        nonlocal cancelled
+        limits = httpx.Limits(max_connections=args.max_sessions, max_keepalive_connections=args.max_sessions)
+        async with httpx.AsyncClient(base_url=target, timeout=args.timeout, limits=limits) as api, \
+                httpx.AsyncClient(base_url=spec["auth_url"], timeout=args.timeout, limits=limits) as auth:
+            run = Run(args, api, auth, spec["accounts"], spec.get("apikey", ""))
+            for rate in rates:
+                cpu_before = _cpu_seconds(proc.pid) if proc else None
+                step = await run.offer(rate, args.step_seconds)
+                cpu_after = _cpu_seconds(proc.pid) if proc else None
+                if cpu_before is not None and cpu_after is not None:
+                    step.cpu_seconds = cpu_after - cpu_before
+                offered.append(step)
+                # Provisional: requests still in flight are added to this step when they finish
+                summary = step.summary()
+                reasons = saturation_reasons(summary, offered[0].summary()["error_rate"], args)
+                print(_line(summary, reasons), flush=True)
+                if reasons and args.stop_at_saturation:
+                    break
+            cancelled = await run.drain(args.drain_seconds)
+
+    try:
+        asyncio.run(run_all())
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait(timeout=10)
+
+    steps = [step.summary() for step in offered]
+    saturation: Optional[Dict[str, Any]] = None
+    for summary in steps:
+        summary["saturated"] = saturation_reasons(summary, steps[0]["error_rate"], args)
+        if summary["saturated"] and saturation is None:
+            saturation = {"rate": summary["offered_sessions_per_s"], "reasons": summary["saturated"]}
+    sustained = [s["offered_sessions_per_s"] for s in steps if not s["saturated"]]
+    report = {
+        "started_at": started_at.isoformat(),
+        "git_commit": _git_commit(),
+        "target": args.target or "built-in worker on benchmarks.fake_supabase",
+        "config": {k: v for k, v in vars(args).items() if k not in ("serve", "port")},
+        "steps": steps,
+        "sessions_cancelled_after_drain": cancelled,
+        "saturation": saturation,
+        "max_sustained_sessions_per_s": max(sustained) if sustained else None,
+    }
+    out = args.out or f"loadtest-{started_at.strftime('%Y%m%d-%H%M%S')}.json"
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"report written to {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Production server: gunicorn supervising uvicorn workers (uvloop + httptools).
+
+    gunicorn -c gunicorn.conf.py            # from backend/; serves app.main:app
+
+Tunables are SERVER_* / WEB_CONCURRENCY settings (app/core/config.py).
+
+Preloading (SERVER_PRELOAD, default on): the master imports the app once and
+forks workers from it. Imported modules are shared copy-on-write, workers
+start faster, and a broken build fails before any old worker is stopped.
+Startup work that must not be shared across a fork (connections, threads,
+the event loop) runs in the lifespan, once per worker.
+
+Reloads without dropping connections (the listening socket stays open
+throughout, so new connections wait in the backlog instead of being refused):
+- `kill -HUP <master>`: new workers start, then old ones finish in-flight
+  requests (up to SERVER_GRACEFUL_TIMEOUT_SECONDS) and exit. This reloads
+  configuration; with preloading, code is not re-imported.
+- New code with preloading: `kill -USR2 <master>` starts a new master with
+  the new code next to the old one. Once it is healthy, `kill -TERM <old master>`.
+  Or set SERVER_PRELOAD=false and use HUP.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.core.config import settings  # noqa: E402
+
+
+def _available_cpus() -> int:
+    # Respects CPU affinity and cgroup-pinned containers, unlike os.cpu_count()
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+wsgi_app = "app.main:app"
+worker_class = "app.core.server.ProductionWorker"
+workers = settings.WEB_CONCURRENCY or _available_cpus()
+bind = [settings.SERVER_BIND]
+backlog = settings.SERVER_BACKLOG
+keepalive = settings.SERVER_KEEPALIVE_SECONDS
+max_requests = settings.SERVER_MAX_REQUESTS
+max_requests_jitter = settings.SERVER_MAX_REQUESTS_JITTER
+graceful_timeout = settings.SERVER_GRACEFUL_TIMEOUT_SECONDS
+timeout = settings.SERVER_WORKER_TIMEOUT_SECONDS
+preload_app = settings.SERVER_PRELOAD
+forwarded_allow_ips = settings.FORWARDED_ALLOW_IPS
+proxy_allow_ips = settings.FORWARDED_ALLOW_IPS
+accesslog = None
+errorlog = "-"
+loglevel = "debug" if settings.DEBUG else "info"
+
+if preload_app:
+    # The app imports the Supabase SDK on first client build (in each worker's warm-up);
+    # importing it here as well lets preloaded workers share it copy-on-write
+    import supabase  # noqa: E402,F401
@@ -0,0 +1,46 @@
+"""
+`import app.main` stays within its startup budget.
+
+Each measurement imports the app in a fresh interpreter, after one untimed run
+that writes bytecode caches. IMPORT_BUDGET_MS overrides the budget on slower CI
+machines; `python -m benchmarks.import_time` shows where the time goes.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", "800"))
+RUNS = 3
+
+_SNIPPET = (
+    "import json, sys, time; t = time.perf_counter(); import app.main; "
+    "print(json.dumps({'ms': (time.perf_counter() - t) * 1000, 'modules': sorted(sys.modules)}))"
+)
+
+
+def _import_app() -> dict:
+    proc = subprocess.run([sys.executable, "-c", _SNIPPET], cwd=BACKEND, capture_output=True, text=True, check=False)
+    assert proc.returncode == 0, f"import app.main failed:\n{proc.stderr[-2000:]}"
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def test_import_within_budget() -> None:
+    _import_app()
+    median_ms = statistics.median(_import_app()["ms"] for _ in range(RUNS))
+    assert median_ms <= BUDGET_MS, (
+        f"import app.main took {median_ms:.0f} ms (median of {RUNS}), over the {BUDGET_MS:.0f} ms budget; "
+        "run `python -m benchmarks.import_time` to find the slow modules"
+    )
+
+
+def test_lazy_dependencies_not_imported() -> None:
+    # Imported where they are used (app.services.supabase, the SQLite rate-limit backend)
+    modules = set(_import_app()["modules"])
+    assert "supabase" not in modules
+    assert "sqlite3" not in modules
@@ -1,5 +1,5 @@
 import { API_URL } from '../config';
-import type { CommitmentOut, CommitmentRequest } from '../types';
+import type { CommitmentCreated, CommitmentItem, CommitmentOut, CommitmentPage, CommitmentRequest } from '../types';
 
 /**
  * Create a commitment for a challenge
@@ -7,13 +7,14 @@ import type { CommitmentOut, CommitmentRequest } from '../types';
  * @param challengeId - Challenge ID
  * @param direction - 'for' or 'against'
  * @param idempotencyKey - Optional idempotency key
+ * @returns The commitment plus the challenge counters after the write
  */
 export async function createCommitment(
   token: string,
   challengeId: number,
   direction: 'for' | 'against',
   idempotencyKey?: string
-): Promise<CommitmentOut> {
+): Promise<CommitmentCreated> {
   const body: CommitmentRequest = {
     direction,
     idempotency_key: idempotencyKey,
@@ -58,15 +59,28 @@ export async function getMyCommitment(
 /**
  * Get all commitments for the current user
  * @param token - Access token
- * @returns List of user's commitments
+ * @param expand - Related entities to embed ('challenge', 'profile')
+ * @returns List of user's commitments, following next_cursor across pages
  */
 export async function getMyCommitments(
-  token: string
-): Promise<CommitmentOut[]> {
-  const r = await fetch(`${API_URL}/commitments/me`, {
-    headers: { Authorization: `Bearer ${token}` },
-  });
-  
-  if (!r.ok) throw new Error(await r.text());
-  return r.json();
+  token: string,
+  expand: Array<'challenge' | 'profile'> = ['challenge']
+): Promise<CommitmentItem[]> {
+  const items: CommitmentItem[] = [];
+  let cursor: string | null = null;
+  do {
+    const params = new URLSearchParams({ limit: '100' });
+    expand.forEach((e) => params.append('expand', e));
+    if (cursor) params.set('cursor', cursor);
+
+    const r = await fetch(`${API_URL}/commitments/me?${params.toString()}`, {
+      headers: { Authorization: `Bearer ${token}` },
+    });
+
+    if (!r.ok) throw new Error(await r.text());
+    const page: CommitmentPage = await r.json();
+    items.push(...page.items);
+    cursor = page.next_cursor;
+  } while (cursor);
+  return items;
 }
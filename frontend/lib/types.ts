@@ -74,6 +74,22 @@ export type ChallengeOut = {
   created_at: string;
 };
 
+export type ChallengeDetail = ChallengeOut & {
+  for_count: number;
+  against_count: number;
+  for_amount_cents: number;
+  against_amount_cents: number;
+};
+
+export type ChallengeStats = {
+  challenge_id: number;
+  amount_cents: number;
+  for_count: number;
+  against_count: number;
+  for_amount_cents: number;
+  against_amount_cents: number;
+};
+
 export type CommitmentSide = 'for' | 'against';
 
 export type CommitmentRequest = {
@@ -89,3 +105,18 @@ export type CommitmentOut = {
   created_at: string;
 };
 
+export type CommitmentItem = CommitmentOut & {
+  challenge?: ChallengeDetail | null;
+  profile?: ProfileOut | null;
+};
+
+export type CommitmentPage = {
+  items: CommitmentItem[];
+  next_cursor: string | null;
+};
+
+export type CommitmentCreated = CommitmentOut & {
+  created: boolean;
+  stats: ChallengeStats | null;
+};
+
@@ -148,16 +148,16 @@ export default function CommitmentsScreen({ navigation }: Props) {
         // Enrich each commitment with challenge and post data
         const enrichedCommitments: Commitment[] = [];
 
+        // Fetch post/feed data for counts once, not per commitment
+        const feedResponse = await getFeed(session.access_token);
+
         for (const commitment of dbCommitments) {
           try {
-            // Fetch challenge details
-            const challenge = await getChallenge(
-              session.access_token,
-              commitment.challenge_id
-            );
+            // Challenge details are embedded by the listing; fall back for older servers
+            const challenge =
+              commitment.challenge ??
+              (await getChallenge(session.access_token, commitment.challenge_id));
 
-            // Fetch post/feed data for counts
-            const feedResponse = await getFeed(session.access_token);
             const post = feedResponse.items.find(
               (p) => p.challenge_id === commitment.challenge_id
             );
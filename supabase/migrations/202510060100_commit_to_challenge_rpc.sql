@@ -0,0 +1,34 @@
+-- ==========================================================
+--  COMMITMENTS RPC: single-statement idempotent insert
+-- ==========================================================
+-- Inserts the caller's commitment, or returns the existing one when the
+-- (user_id, challenge_id) unique constraint already holds a row. The reply
+-- carries the challenge counters after the write so clients don't have to
+-- refetch /challenges/{id}/stats.
+create or replace function public.commit_to_challenge(
+        p_challenge_id bigint,
+        p_side commitment_side
+    ) returns jsonb language plpgsql security invoker
+set search_path = public as $$
+declare v_row public.commitments %rowtype;
+v_created boolean := true;
+v_stats jsonb;
+begin
+insert into public.commitments(user_id, challenge_id, side)
+values (auth.uid(), p_challenge_id, p_side) on conflict (user_id, challenge_id) do nothing
+returning * into v_row;
+if v_row.id is null then v_created := false;
+select c.* into v_row
+from public.commitments c
+where c.user_id = auth.uid()
+    and c.challenge_id = p_challenge_id;
+end if;
+if v_row.id is null then raise exception 'Commitment not allowed' using errcode = '42501';
+end if;
+select to_jsonb(cs) into v_stats
+from public.challenge_stats cs
+where cs.challenge_id = p_challenge_id;
+return to_jsonb(v_row) || jsonb_build_object('created', v_created, 'stats', v_stats);
+end;
+$$;
+grant execute on function public.commit_to_challenge(bigint, commitment_side) to authenticated;
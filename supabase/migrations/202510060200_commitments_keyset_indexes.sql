@@ -0,0 +1,9 @@
+-- ==========================================================
+--  COMMITMENTS: keyset pagination indexes
+-- ==========================================================
+-- Listings page by (created_at, id) desc within a challenge or a user;
+-- these replace the single-column indexes for those lookups.
+create index if not exists idx_commitments_challenge_keyset on public.commitments(challenge_id, created_at desc, id desc);
+create index if not exists idx_commitments_user_keyset on public.commitments(user_id, created_at desc, id desc);
+drop index if exists public.idx_commitments_challenge;
+drop index if exists public.idx_commitments_user;
@@ -0,0 +1,36 @@
+-- ==========================================================
+--  CHALLENGES: version columns for conditional GETs (ETags)
+-- ==========================================================
+-- updated_at tracks metadata edits; stats_version is bumped by every
+-- commitment insert/delete so the API can answer If-None-Match on
+-- /challenges/{id} and /challenges/{id}/stats without running the
+-- challenge_stats aggregate.
+alter table public.challenges
+add column if not exists updated_at timestamptz not null default now();
+alter table public.challenges
+add column if not exists stats_version bigint not null default 0;
+-- Only metadata columns touch updated_at; stats_version bumps do not.
+drop trigger if exists trg_challenges_updated_at on public.challenges;
+create trigger trg_challenges_updated_at before
+update of title,
+    description,
+    amount_cents,
+    starts_at,
+    ends_at on public.challenges for each row execute function public.touch_updated_at();
+-- Commitments are inserted by non-owners, who cannot update challenges under
+-- RLS; run the bump as the function owner.
+create or replace function public.bump_challenge_stats_version() returns trigger language plpgsql security definer
+set search_path = public as $$ begin
+update public.challenges
+set stats_version = stats_version + 1
+where id = case
+        when tg_op = 'DELETE' then old.challenge_id
+        else new.challenge_id
+    end;
+return null;
+end $$;
+drop trigger if exists trg_commitments_stats_version on public.commitments;
+create trigger trg_commitments_stats_version
+after
+insert
+    or delete on public.commitments for each row execute function public.bump_challenge_stats_version();
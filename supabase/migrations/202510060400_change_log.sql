@@ -0,0 +1,150 @@
+-- ==========================================================
+--  CHANGE LOG: delta sync ("changes since") support
+-- ==========================================================
+-- Append-only log of row changes the app mirrors locally. Triggers record
+-- only ids and the users involved; the API re-reads current rows under RLS.
+create table if not exists public.change_log (
+    id bigserial primary key,
+    entity text not null check (entity in ('post', 'commitment', 'connection')),
+    entity_id bigint not null,
+    op char(1) not null check (op in ('I', 'U', 'D')),
+    -- post author, committer, or connection requester
+    actor_id uuid not null,
+    -- challenge owner (commitments) or connection addressee
+    subject_id uuid,
+    challenge_id bigint,
+    changed_at timestamptz not null default now()
+);
+create index if not exists idx_change_log_changed_at on public.change_log(changed_at);
+-- Clients never read the log directly; they go through changes_since().
+alter table public.change_log enable row level security;
+revoke all on public.change_log
+from anon,
+    authenticated;
+create or replace function public.log_change() returns trigger language plpgsql security definer
+set search_path = public as $$
+declare r record;
+v_op char(1) := left(tg_op, 1);
+begin if tg_op = 'DELETE' then r := old;
+else r := new;
+end if;
+if tg_table_name = 'posts' then
+insert into public.change_log(entity, entity_id, op, actor_id, challenge_id)
+values ('post', r.id, v_op, r.author_id, r.challenge_id);
+elsif tg_table_name = 'commitments' then
+insert into public.change_log(
+        entity,
+        entity_id,
+        op,
+        actor_id,
+        subject_id,
+        challenge_id
+    )
+select 'commitment',
+    r.id,
+    v_op,
+    r.user_id,
+    ch.owner_id,
+    r.challenge_id
+from public.challenges ch
+where ch.id = r.challenge_id;
+elsif tg_table_name = 'connections' then
+insert into public.change_log(entity, entity_id, op, actor_id, subject_id)
+values (
+        'connection',
+        r.id,
+        v_op,
+        r.requester_id,
+        r.addressee_id
+    );
+end if;
+return null;
+end $$;
+drop trigger if exists trg_posts_change_log on public.posts;
+create trigger trg_posts_change_log
+after
+insert
+    or
+update
+    or delete on public.posts for each row execute function public.log_change();
+drop trigger if exists trg_commitments_change_log on public.commitments;
+create trigger trg_commitments_change_log
+after
+insert
+    or delete on public.commitments for each row execute function public.log_change();
+drop trigger if exists trg_connections_change_log on public.connections;
+create trigger trg_connections_change_log
+after
+insert
+    or
+update
+    or delete on public.connections for each row execute function public.log_change();
+-- Visible changes after p_after for the caller, plus the log head so the next
+-- token can skip past rows the caller cannot see. With p_after null only the
+-- head is returned (initial sync after a full load).
+create or replace function public.changes_since(p_after bigint default null, p_limit int default 500) returns jsonb language sql stable security definer
+set search_path = public as $$ with bounds as (
+        select coalesce(max(id), 0) as head,
+            coalesce(min(id), 1) as oldest
+        from public.change_log
+    ),
+    visible as (
+        select l.*
+        from public.change_log l
+        where p_after is not null
+            and l.id > p_after
+            and (
+                (
+                    l.entity = 'post'
+                    and (
+                        l.actor_id = auth.uid()
+                        or public.is_connected(l.actor_id, auth.uid())
+                    )
+                )
+                or (
+                    l.entity = 'commitment'
+                    and (
+                        l.actor_id = auth.uid()
+                        or l.subject_id = auth.uid()
+                        or public.is_connected(l.subject_id, auth.uid())
+                    )
+                )
+                or (
+                    l.entity = 'connection'
+                    and auth.uid() in (l.actor_id, l.subject_id)
+                )
+            )
+        order by l.id
+        limit greatest(1, least(p_limit, 1000)) + 1
+    )
+select jsonb_build_object(
+        'head',
+        b.head,
+        'oldest',
+        b.oldest,
+        'changes',
+        coalesce(
+            (
+                select jsonb_agg(to_jsonb(v) order by v.id)
+                from visible v
+            ),
+            '[]'::jsonb
+        )
+    )
+from bounds b;
+$$;
+grant execute on function public.changes_since(bigint, int) to authenticated;
+-- Retention: tokens older than the oldest retained row trigger a full resync.
+create or replace function public.prune_change_log(p_keep interval default interval '30 days') returns bigint language sql security definer
+set search_path = public as $$ with gone as (
+        delete from public.change_log
+        where changed_at < now() - p_keep
+        returning 1
+    )
+select count(*)
+from gone;
+$$;
+revoke all on function public.prune_change_log(interval)
+from public,
+    anon,
+    authenticated;
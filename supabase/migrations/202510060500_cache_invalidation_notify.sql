@@ -0,0 +1,75 @@
+-- ==========================================================
+--  CACHE INVALIDATION: NOTIFY on row changes
+-- ==========================================================
+-- Every API worker LISTENs on `cache_invalidation` and evicts matching keys
+-- from its in-process caches. Payloads stay compact:
+--   {"t": table, "op": "I"|"U"|"D", "id": pk, "c": challenge_id, "u": [user ids]}
+-- Identical payloads within one transaction are delivered once.
+create or replace function public.notify_cache_invalidation() returns trigger language plpgsql as $$
+declare r record;
+v_payload jsonb;
+begin if tg_op = 'DELETE' then r := old;
+else r := new;
+end if;
+v_payload := jsonb_build_object('t', tg_table_name, 'op', left(tg_op, 1));
+if tg_table_name = 'profiles' then v_payload := v_payload || jsonb_build_object('u', jsonb_build_array(r.user_id));
+elsif tg_table_name = 'challenges' then v_payload := v_payload || jsonb_build_object('id', r.id, 'c', r.id, 'u', jsonb_build_array(r.owner_id));
+elsif tg_table_name = 'posts' then v_payload := v_payload || jsonb_build_object(
+    'id',
+    r.id,
+    'c',
+    r.challenge_id,
+    'u',
+    jsonb_build_array(r.author_id)
+);
+elsif tg_table_name = 'commitments' then v_payload := v_payload || jsonb_build_object(
+    'id',
+    r.id,
+    'c',
+    r.challenge_id,
+    'u',
+    jsonb_build_array(r.user_id)
+);
+elsif tg_table_name = 'connections' then v_payload := v_payload || jsonb_build_object(
+    'id',
+    r.id,
+    'u',
+    jsonb_build_array(r.requester_id, r.addressee_id)
+);
+end if;
+perform pg_notify('cache_invalidation', v_payload::text);
+return null;
+end $$;
+drop trigger if exists trg_profiles_cache_invalidation on public.profiles;
+create trigger trg_profiles_cache_invalidation
+after
+insert
+    or
+update
+    or delete on public.profiles for each row execute function public.notify_cache_invalidation();
+drop trigger if exists trg_challenges_cache_invalidation on public.challenges;
+create trigger trg_challenges_cache_invalidation
+after
+insert
+    or
+update
+    or delete on public.challenges for each row execute function public.notify_cache_invalidation();
+drop trigger if exists trg_posts_cache_invalidation on public.posts;
+create trigger trg_posts_cache_invalidation
+after
+insert
+    or
+update
+    or delete on public.posts for each row execute function public.notify_cache_invalidation();
+drop trigger if exists trg_commitments_cache_invalidation on public.commitments;
+create trigger trg_commitments_cache_invalidation
+after
+insert
+    or delete on public.commitments for each row execute function public.notify_cache_invalidation();
+drop trigger if exists trg_connections_cache_invalidation on public.connections;
+create trigger trg_connections_cache_invalidation
+after
+insert
+    or
+update
+    or delete on public.connections for each row execute function public.notify_cache_invalidation();
@@ -0,0 +1,8 @@
+-- ==========================================================
+--  Allow users to create their own profile row
+-- ==========================================================
+-- PATCH /me and POST /profiles upsert as the caller; INSERT ... ON CONFLICT
+-- checks insert policies even when the row exists and is updated
+drop policy if exists "profiles_self_insert" on public.profiles;
+create policy "profiles_self_insert" on public.profiles for
+insert to authenticated with check (user_id = auth.uid());
@@ -0,0 +1,32 @@
+-- ==========================================================
+--  CHALLENGES: stats version from the commitments themselves
+-- ==========================================================
+-- Bumping challenges.stats_version from a commitments row trigger made every
+-- commitment update the parent row: a viral challenge serialized on that row
+-- lock and fired a challenges NOTIFY per commitment. Commitments are immutable,
+-- so (count, max(created_at)) changes whenever one is added or removed; it is
+-- an index-only read of idx_commitments_challenge_keyset.
+drop trigger if exists trg_commitments_stats_version on public.commitments;
+drop function if exists public.bump_challenge_stats_version();
+alter table public.challenges drop column if exists stats_version;
+-- Runs as its owner, like challenge_stats: the counters are not row-filtered,
+-- and per-row commitments policies would make the count expensive.
+create or replace function public.challenge_commitments_version(
+        p_challenge_id bigint,
+        out commitment_count bigint,
+        out last_commitment_at timestamptz
+    ) language sql stable security definer
+set search_path = public as $$
+select count(*),
+    max(created_at)
+from public.commitments
+where challenge_id = p_challenge_id $$;
+-- The challenge row plus its version columns; /challenges/{id} and
+-- /challenges/{id}/stats derive their ETags from it. Challenges RLS applies.
+create or replace view public.challenge_versions with (security_invoker = true) as
+select ch.*,
+    v.commitment_count,
+    v.last_commitment_at
+from public.challenges ch
+    cross join lateral public.challenge_commitments_version(ch.id) v;
+grant execute on function public.challenge_commitments_version(bigint) to authenticated;
@@ -0,0 +1,114 @@
+-- ==========================================================
+--  CHANGE LOG: sync tokens that never skip late commits
+-- ==========================================================
+-- change_log.id is taken from the sequence at insert time, not at commit, so
+-- a lower id can become visible after higher ones. A token that jumped to
+-- max(id) skipped it for good. Each row now records its writing transaction,
+-- and changes_since only returns rows of transactions older than the current
+-- snapshot's xmin: those have all finished, so nothing below the returned
+-- horizon can still appear. Tokens are (xid, id) positions in that order.
+alter table public.change_log
+add column if not exists xid xid8 not null default pg_current_xact_id();
+create index if not exists idx_change_log_xid on public.change_log(xid, id);
+-- Highest transaction whose rows prune_change_log removed; tokens at or below
+-- it may have missed rows and get a full resync.
+create table if not exists public.change_log_pruned (
+    singleton boolean primary key default true check (singleton),
+    max_xid xid8 not null
+);
+alter table public.change_log_pruned enable row level security;
+revoke all on public.change_log_pruned
+from anon,
+    authenticated;
+create or replace function public.prune_change_log(p_keep interval default interval '30 days') returns bigint language sql security definer
+set search_path = public as $$ with gone as (
+        delete from public.change_log
+        where changed_at < now() - p_keep
+        returning xid
+    ),
+    mark as (
+        insert into public.change_log_pruned(singleton, max_xid)
+        select true,
+            max(xid)
+        from gone
+        having count(*) > 0 on conflict (singleton) do
+        update
+        set max_xid = greatest(change_log_pruned.max_xid, excluded.max_xid)
+    )
+select count(*)
+from gone;
+$$;
+revoke all on function public.prune_change_log(interval)
+from public,
+    anon,
+    authenticated;
+-- Visible changes after the (p_after_xid, p_after_id) position for the caller.
+-- `head` is the snapshot xmin: every change of an older transaction is either
+-- in `changes` or hidden from the caller. With p_after_xid null only the head is
+-- returned (initial sync after a full load).
+drop function if exists public.changes_since(bigint, int);
+create or replace function public.changes_since(
+        p_after_xid bigint default null,
+        p_after_id bigint default 0,
+        p_limit int default 500
+    ) returns jsonb language sql stable security definer
+set search_path = public as $$ with bounds as (
+        select pg_snapshot_xmin(pg_current_snapshot()) as head,
+            (
+                select max_xid
+                from public.change_log_pruned
+            ) as pruned
+    ),
+    visible as (
+        select l.*
+        from public.change_log l,
+            bounds b
+        where p_after_xid is not null
+            and (l.xid, l.id) > (p_after_xid::text::xid8, coalesce(p_after_id, 0))
+            and l.xid < b.head
+            and (
+                (
+                    l.entity = 'post'
+                    and (
+                        l.actor_id = auth.uid()
+                        or public.is_connected(l.actor_id, auth.uid())
+                    )
+                )
+                or (
+                    l.entity = 'commitment'
+                    and (
+                        l.actor_id = auth.uid()
+                        or l.subject_id = auth.uid()
+                        or public.is_connected(l.subject_id, auth.uid())
+                    )
+                )
+                or (
+                    l.entity = 'connection'
+                    and auth.uid() in (l.actor_id, l.subject_id)
+                )
+            )
+        order by l.xid,
+            l.id
+        limit greatest(1, least(p_limit, 1000)) + 1
+    )
+select jsonb_build_object(
+        'head',
+        b.head::text::bigint,
+        'pruned',
+        b.pruned::text::bigint,
+        'changes',
+        coalesce(
+            (
+                select jsonb_agg(
+                        to_jsonb(v) || jsonb_build_object('xid', v.xid::text::bigint)
+                        order by v.xid,
+                            v.id
+                    )
+                from visible v
+            ),
+            '[]'::jsonb
+        )
+    )
+from bounds b;
+$$;
+grant execute on function public.changes_since(bigint, bigint, int) to authenticated;
@@ -0,0 +1,90 @@
+-- ==========================================================
+--  CHALLENGES: stored commitment counters for the stats version
+-- ==========================================================
+-- challenge_commitments_version counted a challenge's commitments on every
+-- conditional GET, so a 304 saved no database work and grew with the
+-- challenge's popularity. Counters are now kept by a commitments trigger,
+-- split into 16 shards by committer so concurrent commitments to one challenge
+-- rarely wait on the same row. The version is a primary-key read of at most
+-- 16 rows. Every insert raises a count and last_commitment_at (created_at is
+-- the insert time); every delete lowers a count, so the pair changes on both.
+create table if not exists public.challenge_commitment_counters (
+    challenge_id bigint not null references public.challenges(id) on delete cascade,
+    shard smallint not null,
+    commitment_count bigint not null default 0,
+    last_commitment_at timestamptz,
+    primary key (challenge_id, shard)
+);
+alter table public.challenge_commitment_counters enable row level security;
+revoke all on public.challenge_commitment_counters
+from anon,
+    authenticated;
+-- Commitments are inserted by non-owners; run as the function owner.
+create or replace function public.count_challenge_commitment() returns trigger language plpgsql security definer
+set search_path = public as $$ begin
+if tg_op = 'INSERT' then
+insert into public.challenge_commitment_counters as c (
+        challenge_id,
+        shard,
+        commitment_count,
+        last_commitment_at
+    )
+values (
+        new.challenge_id,
+        hashtext(new.user_id::text) & 15,
+        1,
+        new.created_at
+    ) on conflict (challenge_id, shard) do
+update
+set commitment_count = c.commitment_count + 1,
+    last_commitment_at = greatest(c.last_commitment_at, excluded.last_commitment_at);
+else
+update public.challenge_commitment_counters
+set commitment_count = commitment_count - 1
+where challenge_id = old.challenge_id
+    and shard = hashtext(old.user_id::text) & 15;
+end if;
+return null;
+end $$;
+drop trigger if exists trg_commitments_counters on public.commitments;
+create trigger trg_commitments_counters
+after
+insert
+    or delete on public.commitments for each row execute function public.count_challenge_commitment();
+-- Rebuilds every counter from commitments. For loads that bypass triggers
+-- (benchmarks.pg_seed) and for this migration's backfill.
+create or replace function public.refresh_challenge_commitment_counters() returns void language sql security definer
+set search_path = public as $$
+delete from public.challenge_commitment_counters;
+insert into public.challenge_commitment_counters (
+        challenge_id,
+        shard,
+        commitment_count,
+        last_commitment_at
+    )
+select challenge_id,
+    hashtext(user_id::text) & 15,
+    count(*),
+    max(created_at)
+from public.commitments
+group by 1,
+    2;
+$$;
+revoke all on function public.refresh_challenge_commitment_counters()
+from public,
+    anon,
+    authenticated;
+-- No commitment may land between the backfill and the trigger taking over
+lock table public.commitments in share mode;
+select public.refresh_challenge_commitment_counters();
+-- Same signature as before, so challenge_versions picks it up unchanged.
+create or replace function public.challenge_commitments_version(
+        p_challenge_id bigint,
+        out commitment_count bigint,
+        out last_commitment_at timestamptz
+    ) language sql stable security definer
+set search_path = public as $$
+select coalesce(sum(c.commitment_count), 0)::bigint,
+    max(c.last_commitment_at)
+from public.challenge_commitment_counters c
+where c.challenge_id = p_challenge_id $$;